@@ -0,0 +1,98 @@
+"""
+Shared helpers for the benchmarks.
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import time
+from typing import Any, Callable, Optional
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".inputs")
+
+
+def generate_video(
+    duration: float = 60,
+    size: str = "1280x720",
+    rate: float = 25,
+    cut_interval: float = 2,
+    pix_fmt: str = "yuv420p",
+    ffmpeg_path: str = "ffmpeg",
+    gop: Optional[int] = None,
+) -> str:
+    """
+    Generate a synthetic test video with hard cuts using ffmpeg's lavfi sources.
+
+    The video alternates between a normal and a negated test pattern every
+    `cut_interval` seconds. Generated files are reused across runs.
+
+    Args:
+        duration (float): Duration in seconds
+        size (str): Frame size
+        rate (float): Frame rate
+        cut_interval (float): Seconds between two cuts
+        pix_fmt (str): Pixel format, e.g. yuv420p10le for HDR-like inputs
+        ffmpeg_path (str): Path to ffmpeg executable
+        gop (int, optional): Keyframe interval in frames. Defaults to one keyframe per cut.
+
+    Returns:
+        str: the path to the generated video
+    """
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    output_file = os.path.join(
+        CACHE_DIR,
+        f"synthetic_{duration:g}s_{size}_{rate:g}fps_{cut_interval:g}_{pix_fmt}"
+        + (f"_g{gop}" if gop is not None else "")
+        + ".mp4",
+    )
+    if os.path.isfile(output_file):
+        return output_file
+
+    source = (
+        f"testsrc2=size={size}:rate={rate}:duration={duration},"
+        f"negate=enable='lt(mod(t\\,{2 * cut_interval:g})\\,{cut_interval:g})',"
+        f"format={pix_fmt}"
+    )
+    subprocess.run(
+        [
+            ffmpeg_path,
+            "-nostdin",
+            "-loglevel",
+            "error",
+            "-y",
+            "-f",
+            "lavfi",
+            "-i",
+            source,
+            "-c:v",
+            "libx264",
+            "-preset",
+            "ultrafast",
+            "-g",
+            str(gop if gop is not None else int(rate * cut_interval)),
+            output_file,
+        ],
+        check=True,
+    )
+    return output_file
+
+
+def measure(func: Callable[[], Any], repeat: int = 1) -> tuple[float, Any]:
+    """
+    Measure the best wall time of a function over several runs.
+
+    Args:
+        func (Callable): the function to run
+        repeat (int): Number of runs
+
+    Returns:
+        tuple[float, Any]: the best wall time in seconds and the last return value
+    """
+    best = float("inf")
+    ret = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        ret = func()
+        best = min(best, time.perf_counter() - start)
+    return best, ret
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Compare the speed and accuracy of the NumPy scoring backends with ffmpeg's scene score.
+
+A cut counts as found if it is at the same frame as a cut found with the
+`ffmpeg` backend. The scoring time of the NumPy backends is the CPU time spent
+in NumPy, while ffmpeg decodes and downscales the frames.
+
+Usage: python benchmarks/bench_backends.py [--duration 30] [--size 1280x720] [--threshold 0.3]
+"""
+
+import argparse
+from typing import Optional
+
+from _common import generate_video, measure
+from bench_profiles import match_cuts
+
+from scenecut_extractor import BACKENDS, ScenecutExtractor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--size", default="1280x720")
+    parser.add_argument("--pix-fmt", default="yuv420p")
+    parser.add_argument("--threshold", type=float, default=0.3)
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    input_file = generate_video(
+        duration=args.duration, size=args.size, pix_fmt=args.pix_fmt
+    )
+    print(f"input: {input_file}")
+
+    reference: Optional[list[int]] = None
+    for backend in BACKENDS:
+
+        def run(backend=backend):
+            se = ScenecutExtractor(input_file)
+            se.calculate_scenecuts(args.threshold, backend=backend)
+            return se
+
+        elapsed, se = measure(run, args.repeat)
+        cuts = [s["frame"] for s in se.get_scenecuts()]
+        if reference is None:
+            reference = cuts
+
+        frames = len(se.timeline) if se.timeline is not None else 0
+        score_time = se.stats.stages.get("score", {}).get("wall_time", 0.0)
+        recall, precision = match_cuts(reference, cuts, 0)
+        print(
+            f"{backend:<16} {elapsed:7.2f} s  {frames / elapsed:7.0f} frames/s  "
+            f"scoring {score_time:5.2f} s  "
+            f"cuts={len(cuts)} recall={recall:.3f} precision={precision:.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Compare stream-copy extraction in a single pass with one ffmpeg process per scene.
+
+Usage: python benchmarks/bench_extract.py [--duration 120] [--cut-interval 1]
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+
+from _common import generate_video, measure
+
+from scenecut_extractor import ScenecutExtractor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--duration", type=float, default=120)
+    parser.add_argument("--size", default="1280x720")
+    parser.add_argument("--cut-interval", type=float, default=1)
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    input_file = generate_video(
+        duration=args.duration, size=args.size, cut_interval=args.cut_interval
+    )
+    se = ScenecutExtractor(input_file)
+    se.calculate_scenecuts()
+    print(f"input: {input_file}, {len(se.get_scenecuts())} scene cuts")
+
+    results = {}
+    for single_pass in [False, True]:
+        output_directory = tempfile.mkdtemp()
+        try:
+            elapsed, _ = measure(
+                lambda output_directory=output_directory, single_pass=single_pass: (
+                    se.extract_scenes(output_directory, single_pass=single_pass)
+                ),
+                args.repeat,
+            )
+            results[single_pass] = elapsed
+            print(
+                f"single_pass={single_pass!s:<5} {elapsed:7.2f} s  "
+                f"files={len(os.listdir(output_directory))}"
+            )
+        finally:
+            shutil.rmtree(output_directory)
+
+    print(f"speedup: {results[False] / results[True]:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
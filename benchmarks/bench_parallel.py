@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Compare serial and parallel (time-sliced) scene detection.
+
+Usage: python benchmarks/bench_parallel.py [--duration 120] [--jobs 1 2 4 8]
+"""
+
+import argparse
+import os
+
+from _common import generate_video, measure
+
+from scenecut_extractor import ScenecutExtractor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--duration", type=float, default=120)
+    parser.add_argument("--size", default="1280x720")
+    parser.add_argument("--jobs", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    input_file = generate_video(duration=args.duration, size=args.size)
+    print(f"input: {input_file}, {os.cpu_count()} CPUs")
+
+    serial_time = None
+    serial_timeline = None
+    for jobs in args.jobs:
+
+        def run(jobs=jobs):
+            se = ScenecutExtractor(input_file)
+            se.calculate_scenecuts(workers=jobs)
+            return se
+
+        elapsed, se = measure(run, args.repeat)
+        if serial_time is None:
+            serial_time = elapsed
+            serial_timeline = se.get_timeline().to_dict()
+
+        identical = se.get_timeline().to_dict() == serial_timeline
+        print(
+            f"jobs={jobs:<3} {elapsed:7.2f} s  speedup {serial_time / elapsed:5.2f}x  "
+            f"cuts={len(se.get_scenecuts())} identical={identical}"
+        )
+
+
+if __name__ == "__main__":
+    main()
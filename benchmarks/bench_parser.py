@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Compare the bulk metadata parser with the line-by-line parsing loop.
+
+A synthetic `metadata=print` log is generated (a 24-hour recording at 50 fps
+has about 4.3 million frames, i.e. 8.6 million lines). Both parsers must give
+identical timelines.
+
+Usage: python benchmarks/bench_parser.py [--frames 1000000] [--repeat 3]
+"""
+
+import argparse
+import os
+import random
+import tracemalloc
+
+from _common import CACHE_DIR, measure
+
+from scenecut_extractor import ScoreTimeline
+from scenecut_extractor._parser import parse_metadata_file, parse_metadata_lines
+
+
+def generate_metadata(frames: int, rate: float = 50) -> str:
+    """
+    Write a synthetic metadata log with one score per frame; reused across runs.
+    """
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    metadata_file = os.path.join(CACHE_DIR, f"metadata_{frames}_{rate:g}fps.txt")
+    if os.path.isfile(metadata_file):
+        return metadata_file
+
+    rng = random.Random(0)
+    timebase = 12800
+    with open(metadata_file, "w") as f:
+        for n in range(frames):
+            pts = n * timebase // int(rate)
+            f.write(f"frame:{n:<4} pts:{pts:<7} pts_time:{pts / timebase:g}\n")
+            f.write(f"lavfi.scene_score={rng.random() ** 8:f}\n")
+    return metadata_file
+
+
+def parse_line_by_line(metadata_file: str) -> ScoreTimeline:
+    timeline = ScoreTimeline()
+    with open(metadata_file, "r") as f:
+        for frame_score in parse_metadata_lines(f):
+            timeline.append(*frame_score)
+    return timeline
+
+
+def peak_memory_mib(func) -> float:
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1] / 1024 / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--frames", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    metadata_file = generate_metadata(args.frames)
+    size_mib = os.path.getsize(metadata_file) / 1024 / 1024
+    print(f"input: {metadata_file}, {args.frames} frames, {size_mib:.1f} MiB")
+
+    results = {}
+    for name, func in [
+        ("line by line", parse_line_by_line),
+        ("bulk", parse_metadata_file),
+    ]:
+        elapsed, timeline = measure(lambda func=func: func(metadata_file), args.repeat)
+        memory = peak_memory_mib(lambda func=func: func(metadata_file))
+        results[name] = (elapsed, timeline)
+        print(
+            f"{name:<13} {elapsed:7.2f} s  {len(timeline) / elapsed:12.0f} frames/s  "
+            f"peak memory {memory:7.1f} MiB"
+        )
+
+    (line_time, line_timeline), (bulk_time, bulk_timeline) = results.values()
+    print(f"speedup: {line_time / bulk_time:.2f}x")
+    print(f"identical: {line_timeline.to_dict() == bulk_timeline.to_dict()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Compare the speed and accuracy of the analysis profiles against full-resolution analysis.
+
+A cut counts as found if it is within `frame_step - 1` frames of a cut found
+with the full profile. The scoring overhead is the time on top of decoding
+the input without any filters.
+
+Usage: python benchmarks/bench_profiles.py [--duration 12] [--size 3840x2160] [--pix-fmt yuv420p10le]
+"""
+
+import argparse
+import os
+import subprocess
+from typing import Optional
+
+from _common import generate_video, measure
+
+from scenecut_extractor import ANALYSIS_PROFILES, ScenecutExtractor
+
+
+def match_cuts(reference: list[int], found: list[int], tolerance: int):
+    matched = sum(
+        1 for ref in reference if any(abs(ref - f) <= tolerance for f in found)
+    )
+    recall = matched / len(reference) if reference else 1.0
+    precision = (
+        sum(1 for f in found if any(abs(ref - f) <= tolerance for ref in reference))
+        / len(found)
+        if found
+        else 1.0
+    )
+    return recall, precision
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--duration", type=float, default=12)
+    parser.add_argument("--size", default="3840x2160")
+    parser.add_argument("--pix-fmt", default="yuv420p10le")
+    parser.add_argument("--threshold", type=float, default=0.3)
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    input_file = generate_video(
+        duration=args.duration, size=args.size, pix_fmt=args.pix_fmt
+    )
+    print(f"input: {input_file}")
+
+    decode_time, _ = measure(
+        lambda: subprocess.run(
+            ["ffmpeg", "-nostdin", "-loglevel", "error", "-i", input_file]
+            + ["-an", "-f", "null", os.devnull],
+            check=True,
+        ),
+        args.repeat,
+    )
+    print(f"decode only {decode_time:7.2f} s")
+
+    reference: Optional[list[int]] = None
+    full_time = 0.0
+    for name, profile in ANALYSIS_PROFILES.items():
+
+        def run(profile=profile):
+            se = ScenecutExtractor(input_file)
+            se.calculate_scenecuts(args.threshold, profile=profile)
+            return [s["frame"] for s in se.get_scenecuts()]
+
+        elapsed, cuts = measure(run, args.repeat)
+        if reference is None:
+            reference, full_time = cuts, elapsed
+
+        recall, precision = match_cuts(
+            reference, cuts, profile.get("frame_step", 1) - 1
+        )
+        print(
+            f"{name:<8} {elapsed:7.2f} s  speedup {full_time / elapsed:5.2f}x  "
+            f"scoring overhead {elapsed - decode_time:5.2f} s  "
+            f"cuts={len(cuts)} recall={recall:.3f} precision={precision:.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Measure the throughput of scene detection, metadata parsing, output formatting and extraction.
+
+Each benchmark runs in a fresh process, so that its peak memory usage can be
+measured. Results are written as JSON; pass a previous result file with
+`--compare` to print the relative change of the wall times.
+
+Usage: python benchmarks/bench_suite.py [--duration 60] [--output results.json] [--compare baseline.json]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Optional
+
+from _common import generate_video, measure
+
+import scenecut_extractor
+from scenecut_extractor import ScenecutExtractor, ScoreTimeline
+from scenecut_extractor._parser import parse_metadata_file
+
+BENCHMARKS = [
+    "calculate_scenecuts",
+    "parse_metadata",
+    "get_as_json",
+    "get_as_csv",
+    "extract_copy",
+    "extract_reencode",
+]
+
+
+def _max_rss_mib(who: int) -> float:
+    # ru_maxrss is in KiB on Linux, but in bytes on macOS
+    max_rss = resource.getrusage(who).ru_maxrss
+    return max_rss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def _count_ffmpeg_processes(ffmpeg_path: str) -> Callable[[], int]:
+    """
+    Count the ffmpeg processes started from now on in this process.
+    """
+    count = 0
+    popen_init = subprocess.Popen.__init__
+
+    def counting_init(self, args, *rest, **kwargs):
+        nonlocal count
+        if args and os.path.basename(str(args[0])) == os.path.basename(ffmpeg_path):
+            count += 1
+        popen_init(self, args, *rest, **kwargs)
+
+    subprocess.Popen.__init__ = counting_init  # type: ignore[method-assign]
+    return lambda: count
+
+
+def run_benchmark(
+    name: str,
+    input_file: str,
+    timeline: ScoreTimeline,
+    metadata_file: str,
+    threshold: float,
+    repeat: int,
+    ffmpeg_path: str,
+) -> dict[str, Any]:
+    """
+    Run a single benchmark; called in a fresh worker process.
+    """
+    ffmpeg_processes = _count_ffmpeg_processes(ffmpeg_path)
+
+    se = ScenecutExtractor(input_file, ffmpeg_path=ffmpeg_path)
+    se.timeline = timeline
+    se.rethreshold(threshold)
+    output_directory = tempfile.mkdtemp()
+
+    # number of items processed per run, for the throughput
+    items = len(timeline)
+    extra: dict[str, Any] = {}
+
+    func: Callable[[], Any]
+    if name == "calculate_scenecuts":
+
+        def func() -> Any:
+            return se.calculate_scenecuts(threshold)
+
+    elif name == "parse_metadata":
+
+        def func() -> Any:
+            return parse_metadata_file(metadata_file)
+
+    elif name in ["get_as_json", "get_as_csv"]:
+        # format the scores of all frames, not only the cuts
+        se.rethreshold(0)
+        func = se.get_as_json if name == "get_as_json" else se.get_as_csv
+        extra["output_bytes"] = len(func())
+    elif name in ["extract_copy", "extract_reencode"]:
+
+        def func() -> Any:
+            return se.extract_scenes(
+                output_directory, no_copy=name == "extract_reencode"
+            )
+
+        extra["scenes"] = len(se.get_scenecuts())
+    else:
+        raise ValueError(f"No such benchmark: {name}")
+
+    try:
+        wall_time, _ = measure(func, repeat)
+    finally:
+        shutil.rmtree(output_directory)
+
+    return {
+        "name": name,
+        "wall_time": wall_time,
+        "frames": items,
+        "fps": items / wall_time if wall_time > 0 else None,
+        "peak_rss_mib": _max_rss_mib(resource.RUSAGE_SELF),
+        "ffmpeg_peak_rss_mib": _max_rss_mib(resource.RUSAGE_CHILDREN),
+        "ffmpeg_processes": ffmpeg_processes() / repeat,
+        **extra,
+    }
+
+
+def get_ffmpeg_version(ffmpeg_path: str) -> str:
+    output = subprocess.run(
+        [ffmpeg_path, "-version"], capture_output=True, text=True, check=True
+    ).stdout
+    return output.splitlines()[0] if output else ""
+
+
+def compare(results: list[dict[str, Any]], baseline_file: str) -> None:
+    with open(baseline_file, "r") as f:
+        baseline = {r["name"]: r for r in json.load(f)["results"]}
+
+    print(f"\ncompared to {baseline_file}:")
+    for result in results:
+        if (base := baseline.get(result["name"])) is None:
+            continue
+        change = result["wall_time"] / base["wall_time"] - 1
+        print(
+            f"{result['name']:<20} {base['wall_time']:8.3f} s -> "
+            f"{result['wall_time']:8.3f} s  ({change:+.1%})"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--duration", type=float, default=60)
+    parser.add_argument("--size", default="1280x720")
+    parser.add_argument("--rate", type=float, default=25)
+    parser.add_argument(
+        "--cut-interval", type=float, default=2, help="seconds between two cuts"
+    )
+    parser.add_argument("--threshold", type=float, default=0.3)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--benchmarks", nargs="+", choices=BENCHMARKS, default=BENCHMARKS
+    )
+    parser.add_argument("--ffmpeg-path", default="ffmpeg")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--compare", help="JSON results of a previous run")
+    args = parser.parse_args()
+
+    input_file = generate_video(
+        duration=args.duration,
+        size=args.size,
+        rate=args.rate,
+        cut_interval=args.cut_interval,
+        ffmpeg_path=args.ffmpeg_path,
+    )
+
+    # prepare the inputs of the benchmarks that should not run ffmpeg themselves
+    se = ScenecutExtractor(input_file, ffmpeg_path=args.ffmpeg_path)
+    metadata_file = os.path.splitext(input_file)[0] + ".metadata.txt"
+    with open(metadata_file, "wb") as f:
+        subprocess.run(se._get_score_command(), stdout=f, check=True)
+    timeline = parse_metadata_file(metadata_file)
+    print(
+        f"input: {input_file}, {len(timeline)} frames, "
+        f"{len(timeline.threshold_indices(args.threshold))} cuts"
+    )
+
+    results = []
+    ctx = multiprocessing.get_context("spawn")
+    for name in args.benchmarks:
+        with ctx.Pool(1) as pool:
+            result = pool.apply(
+                run_benchmark,
+                (
+                    name,
+                    input_file,
+                    timeline,
+                    metadata_file,
+                    args.threshold,
+                    args.repeat,
+                    args.ffmpeg_path,
+                ),
+            )
+        results.append(result)
+        print(
+            f"{name:<20} {result['wall_time']:8.3f} s  {result['fps'] or 0:12.1f} frames/s  "
+            f"rss {result['peak_rss_mib']:7.1f} MiB  "
+            f"ffmpeg rss {result['ffmpeg_peak_rss_mib']:7.1f} MiB  "
+            f"ffmpeg processes {result['ffmpeg_processes']:g}"
+        )
+
+    report: dict[str, Any] = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "version": scenecut_extractor.__version__,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "ffmpeg": get_ffmpeg_version(args.ffmpeg_path),
+            "input": {
+                "duration": args.duration,
+                "size": args.size,
+                "rate": args.rate,
+                "cut_interval": args.cut_interval,
+            },
+            "threshold": args.threshold,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+
+    output_file: Optional[str] = args.output
+    if output_file:
+        with open(output_file, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"results written to {output_file}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Compare the speed and recall of two-pass analysis with a full analysis.
+
+The corpus consists of the test file and synthetic videos with sparse and
+dense cuts, which are aligned and not aligned with the keyframes. A cut counts as found only if it
+is at exactly the same frame as a cut of the full analysis.
+
+Usage: python benchmarks/bench_two_pass.py [--duration 60] [--size 1280x720] [--pix-fmt yuv420p] [--threshold 0.3]
+"""
+
+import argparse
+import os
+from typing import Optional
+
+from _common import generate_video, measure
+from bench_profiles import match_cuts
+
+from scenecut_extractor import ScenecutExtractor, TwoPassOptions
+
+TEST_FILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "tests", "test.mp4"
+)
+
+MODES: dict[str, Optional[TwoPassOptions]] = {
+    "full": None,
+    "decimate/5": {"coarse": "decimate", "frame_step": 5},
+    "decimate/10": {"coarse": "decimate", "frame_step": 10},
+    "keyframes": {"coarse": "keyframes"},
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--duration", type=float, default=60)
+    parser.add_argument("--size", default="1280x720")
+    parser.add_argument("--pix-fmt", default="yuv420p")
+    parser.add_argument("--threshold", type=float, default=0.3)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    def video(cut_interval: float, gop: int) -> str:
+        return generate_video(
+            duration=args.duration,
+            size=args.size,
+            pix_fmt=args.pix_fmt,
+            cut_interval=cut_interval,
+            gop=gop,
+        )
+
+    corpus = {
+        "test.mp4": TEST_FILE,
+        "cuts 15s, gop 2s": video(15, 50),
+        "cuts 7.3s, gop 2s": video(7.3, 50),
+        "cuts 7.3s, gop 10s": video(7.3, 250),
+        "cuts 2s, gop 2s": video(2, 50),
+        "cuts 1.3s, gop 10s": video(1.3, 250),
+    }
+
+    for name, input_file in corpus.items():
+        print(f"input: {name}")
+        reference: list[int] = []
+        for mode, two_pass in MODES.items():
+
+            def run(input_file=input_file, two_pass=two_pass):
+                se = ScenecutExtractor(input_file)
+                se.calculate_scenecuts(
+                    args.threshold, workers=args.workers, two_pass=two_pass
+                )
+                return se
+
+            elapsed, se = measure(run, args.repeat)
+            cuts = [s["frame"] for s in se.get_scenecuts()]
+            if two_pass is None:
+                reference = cuts
+            recall, precision = match_cuts(reference, cuts, 0)
+            print(
+                f"  {mode:<12} {elapsed:7.2f} s  processes={se.stats.ffmpeg_processes:<3} "
+                f"cuts={len(cuts):<3} recall={recall:.3f} precision={precision:.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
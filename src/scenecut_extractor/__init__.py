@@ -1,7 +1,63 @@
 import importlib.metadata
+from typing import TYPE_CHECKING, Any
 
+from ._async import AsyncScenecutExtractor, ProgressCallback
+from ._batch import BatchResult
+from ._cache import ScoreCache
+from ._columnar import COLUMNAR_FORMATS
+from ._detectors import DETECTORS, DetectorEvent
+from ._postprocess import PostProcessing
+from ._profile import ANALYSIS_PROFILES, AnalysisProfile
+from ._rawvideo import BACKENDS
 from ._scenecut_extractor import ScenecutExtractor, ScenecutInfo
+from ._stats import RunStats, StatsHook
+from ._table import ScenecutRow, ScenecutTable
+from ._thumbnails import THUMBNAIL_FORMATS, THUMBNAIL_POSITIONS, ThumbnailOptions
+from ._timeline import ScoreTimeline
+from ._twopass import COARSE_MODES, TwoPassOptions
+
+if TYPE_CHECKING:
+    from ._server import JOB_TYPES, JobInfo, JobQueue
 
 __version__ = importlib.metadata.version("scenecut_extractor")
 
-__all__ = ["ScenecutExtractor", "ScenecutInfo"]
+# the job service needs http.server, so it is only imported when used
+_SERVER_NAMES = ("JOB_TYPES", "JobInfo", "JobQueue")
+
+
+def __getattr__(name: str) -> Any:
+    if name in _SERVER_NAMES:
+        from . import _server
+
+        return getattr(_server, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = [
+    "ANALYSIS_PROFILES",
+    "AnalysisProfile",
+    "AsyncScenecutExtractor",
+    "BACKENDS",
+    "BatchResult",
+    "COARSE_MODES",
+    "COLUMNAR_FORMATS",
+    "DETECTORS",
+    "DetectorEvent",
+    "JOB_TYPES",
+    "JobInfo",
+    "JobQueue",
+    "PostProcessing",
+    "ProgressCallback",
+    "RunStats",
+    "ScenecutExtractor",
+    "ScenecutInfo",
+    "ScenecutRow",
+    "ScenecutTable",
+    "ScoreCache",
+    "ScoreTimeline",
+    "StatsHook",
+    "THUMBNAIL_FORMATS",
+    "THUMBNAIL_POSITIONS",
+    "ThumbnailOptions",
+    "TwoPassOptions",
+]
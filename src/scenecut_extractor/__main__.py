@@ -6,13 +6,27 @@
 # License: MIT
 
 import argparse
+import json
 import logging
 import os
 import sys
+from typing import Any, Optional
+
+from tqdm import tqdm
 
 from .__init__ import __version__ as version
+from ._batch import collect_inputs, run_batch
+from ._cache import ScoreCache
+from ._checkpoint import Checkpoint
+from ._columnar import COLUMNAR_FORMATS
+from ._detectors import DEFAULT_MIN_DURATION
 from ._log import CustomLogFormatter
+from ._postprocess import DEFAULT_ADAPTIVE_K, PostProcessing
+from ._profile import ANALYSIS_PROFILES, AnalysisProfile
+from ._rawvideo import BACKENDS
 from ._scenecut_extractor import ScenecutExtractor
+from ._thumbnails import THUMBNAIL_FORMATS, THUMBNAIL_POSITIONS, ThumbnailOptions
+from ._twopass import COARSE_MODES, DEFAULT_COARSE_FRAME_STEP, TwoPassOptions
 
 logger = logging.getLogger("scenecut-extractor")
 
@@ -31,12 +45,318 @@ def setup_logger(level: int = logging.INFO) -> logging.Logger:
     return logger
 
 
+def get_cli_detectors(cli_args: argparse.Namespace) -> dict[str, dict[str, Any]]:
+    """
+    Get the detectors enabled on the command line, with their options.
+    """
+    detectors: dict[str, dict[str, Any]] = {}
+    if cli_args.detect_black:
+        detectors["black"] = {"d": cli_args.black_min_duration}
+    if cli_args.detect_freeze:
+        detectors["freeze"] = {"d": cli_args.freeze_min_duration}
+    return detectors
+
+
+def get_cli_postprocessing(cli_args: argparse.Namespace) -> PostProcessing:
+    """
+    Get the post-processing rules enabled on the command line.
+    """
+    postprocessing: PostProcessing = {}
+    if cli_args.adaptive_window:
+        postprocessing["adaptive_window"] = cli_args.adaptive_window
+        postprocessing["adaptive_k"] = cli_args.adaptive_k
+    if cli_args.nms_window:
+        postprocessing["nms_window"] = cli_args.nms_window
+    return postprocessing
+
+
+def get_cli_thumbnails(cli_args: argparse.Namespace) -> Optional[ThumbnailOptions]:
+    """
+    Get the thumbnail options given on the command line, if thumbnails are enabled.
+    """
+    if not cli_args.thumbnails:
+        return None
+    thumbnails: ThumbnailOptions = {
+        "output_directory": cli_args.output_directory
+        if cli_args.output_directory
+        else os.getcwd(),
+        "positions": cli_args.thumbnail_positions,
+        "image_format": cli_args.thumbnail_format,
+    }
+    if cli_args.thumbnail_width is not None:
+        thumbnails["width"] = cli_args.thumbnail_width
+    return thumbnails
+
+
+def get_cli_two_pass(cli_args: argparse.Namespace) -> Optional[TwoPassOptions]:
+    """
+    Get the two-pass options given on the command line, if two-pass analysis is enabled.
+    """
+    if not cli_args.two_pass:
+        return None
+    two_pass: TwoPassOptions = {
+        "coarse": cli_args.coarse,
+        "frame_step": cli_args.coarse_step,
+    }
+    if cli_args.candidate_threshold is not None:
+        two_pass["candidate_threshold"] = cli_args.candidate_threshold
+    return two_pass
+
+
+def write_columnar_output(se: ScenecutExtractor, cli_args: argparse.Namespace) -> None:
+    """
+    Write the scene cuts in a binary columnar format to the output file or stdout.
+    """
+    write = {
+        "npz": se.write_as_npz,
+        "arrow": se.write_as_arrow,
+        "parquet": se.write_as_parquet,
+    }[cli_args.output_format]
+    output = (
+        open(cli_args.output_file, "wb") if cli_args.output_file else sys.stdout.buffer
+    )
+    try:
+        write(output, timeline=cli_args.timeline)
+    finally:
+        if output is not sys.stdout.buffer:
+            output.close()
+
+
+def run_batch_mode(
+    cli_args: argparse.Namespace, cache: ScoreCache, profile: AnalysisProfile
+) -> None:
+    """
+    Process multiple inputs, writing one JSON Lines record per file.
+    """
+    input_files = collect_inputs(cli_args.input, cli_args.input_list)
+    logger.info(f"Calculating scene cuts for {len(input_files)} files ...")
+
+    calculate_args = {
+        "threshold": cli_args.threshold,
+        "min_scene_length": cli_args.min_scene_length,
+        "workers": cli_args.jobs,
+        "profile": profile,
+        "detectors": get_cli_detectors(cli_args),
+        "backend": cli_args.backend,
+        "postprocessing": get_cli_postprocessing(cli_args),
+        "thumbnails": get_cli_thumbnails(cli_args),
+        "two_pass": get_cli_two_pass(cli_args),
+        "start": cli_args.ss or 0,
+        "end": cli_args.to,
+        "stream": cli_args.stream,
+    }
+    extract_args = None
+    if cli_args.extract:
+        extract_args = {
+            "output_directory": cli_args.output_directory
+            if cli_args.output_directory
+            else os.getcwd(),
+            "no_copy": cli_args.no_copy,
+            "output_extension": cli_args.output_extension,
+            "single_pass": not cli_args.no_single_pass,
+            "workers": cli_args.extract_jobs,
+            "threads": cli_args.extract_threads,
+            "smart_cut": cli_args.smart_cut,
+        }
+
+    output = open(cli_args.output_file, "w") if cli_args.output_file else sys.stdout
+    failed = 0
+    try:
+        for result in tqdm(
+            run_batch(
+                input_files,
+                workers=cli_args.batch_jobs,
+                ffmpeg_path=cli_args.ffmpeg_path,
+                cache=cache if cli_args.cache else None,
+                calculate_args=calculate_args,
+                extract_args=extract_args,
+            ),
+            total=len(input_files),
+            unit="file",
+            disable=not cli_args.progress,
+        ):
+            if result["error"] is not None:
+                failed += 1
+                logger.error(f"Failed to process {result['input']}: {result['error']}")
+            output.write(json.dumps(result) + "\n")
+            output.flush()
+    except KeyboardInterrupt:
+        logger.info("Interrupted by user")
+        sys.exit(0)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    if failed:
+        logger.error(f"Failed to process {failed} of {len(input_files)} files")
+        sys.exit(1)
+
+
+def run_follow_mode(cli_args: argparse.Namespace, profile: AnalysisProfile) -> None:
+    """
+    Follow a growing input, writing each scene cut as soon as it is detected.
+    """
+    se = ScenecutExtractor(cli_args.input[0], ffmpeg_path=cli_args.ffmpeg_path)
+    logger.info(f"Following {cli_args.input[0]} ...")
+
+    # append, so that a restarted run does not overwrite earlier cuts
+    output = open(cli_args.output_file, "a") if cli_args.output_file else sys.stdout
+    write_header = output is sys.stdout or output.tell() == 0
+    try:
+        for scenecut in se.iter_scenecuts(
+            cli_args.threshold,
+            profile=profile,
+            min_scene_length=cli_args.min_scene_length,
+            follow=True,
+            idle_timeout=cli_args.idle_timeout,
+        ):
+            if cli_args.output == "frames":
+                line = str(scenecut["frame"])
+            elif cli_args.output == "seconds":
+                line = str(scenecut["pts_time"])
+            elif cli_args.output_format == "csv":
+                if write_header:
+                    output.write(",".join(scenecut.keys()) + "\n")
+                    write_header = False
+                line = ",".join([str(v) for v in scenecut.values()])
+            else:
+                # a JSON array can not be written incrementally, use JSON Lines
+                line = json.dumps(scenecut)
+            output.write(line + "\n")
+            # make each cut visible to readers (and safe from crashes) immediately
+            output.flush()
+    except KeyboardInterrupt:
+        logger.info("Interrupted by user")
+        sys.exit(0)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    if cli_args.stats:
+        print(json.dumps(se.stats.to_dict(), indent=2), file=sys.stderr)
+
+
+def serve_main(argv: list[str]) -> None:
+    # not needed to analyze files, so it is not imported on startup
+    from ._server import JobQueue, serve
+
+    parser = argparse.ArgumentParser(
+        prog="scenecut_extractor --serve",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+        description="Run a local service that queues and runs detect and extract jobs, "
+        "with a JSON API over HTTP",
+    )
+    parser.add_argument(
+        "--socket",
+        type=str,
+        help="Listen on this Unix socket instead of a TCP port",
+    )
+    parser.add_argument(
+        "--host",
+        type=str,
+        default="127.0.0.1",
+        help="Address to listen on",
+    )
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on")
+    parser.add_argument(
+        "--token",
+        type=str,
+        default=os.environ.get("SCENECUT_EXTRACTOR_TOKEN"),
+        help="Require this token as 'Authorization: Bearer <token>' in all requests. "
+        "Defaults to the SCENECUT_EXTRACTOR_TOKEN environment variable.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=JobQueue.DEFAULT_WORKERS,
+        help="Number of jobs that run at the same time",
+    )
+    parser.add_argument(
+        "--max-queue",
+        type=int,
+        default=JobQueue.DEFAULT_MAX_QUEUE,
+        help="Maximum number of waiting jobs; further jobs are rejected",
+    )
+    parser.add_argument(
+        "--ffmpeg-path",
+        type=str,
+        default="ffmpeg",
+        help="Path to ffmpeg executable",
+    )
+    parser.add_argument(
+        "--cache",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help="Cache per-frame scores on disk, shared by all jobs",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        help="Cache directory. Default is the user cache directory.",
+    )
+    parser.add_argument(
+        "-v", "--verbose", action="store_true", help="Print verbose info to stderr"
+    )
+    cli_args = parser.parse_args(argv)
+
+    setup_logger(logging.DEBUG if cli_args.verbose else logging.INFO)
+
+    try:
+        jobs = JobQueue(
+            workers=cli_args.workers,
+            max_queue=cli_args.max_queue,
+            ffmpeg_path=cli_args.ffmpeg_path,
+            cache=ScoreCache(cache_dir=cli_args.cache_dir) if cli_args.cache else None,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+
+    try:
+        serve(
+            jobs,
+            host=cli_args.host,
+            port=cli_args.port,
+            socket_path=cli_args.socket,
+            token=cli_args.token,
+        )
+    except RuntimeError as e:
+        logger.error(str(e))
+        sys.exit(1)
+    except KeyboardInterrupt:
+        logger.info("Stopped")
+
+
 def main():
+    if sys.argv[1:2] == ["--serve"]:
+        serve_main(sys.argv[2:])
+        return
+
     parser = argparse.ArgumentParser(
         formatter_class=argparse.ArgumentDefaultsHelpFormatter,
         description="scenecut_extractor v" + version,
+        epilog="Run 'scenecut_extractor --serve --help' for the options of the local job service.",
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Run the local job service instead; must be the first argument",
+    )
+    parser.add_argument(
+        "input",
+        nargs="*",
+        help="input file(s); directories are scanned recursively for video files",
+    )
+    parser.add_argument(
+        "--input-list",
+        type=str,
+        help="Read additional input files from this file, one path per line",
+    )
+    parser.add_argument(
+        "--batch-jobs",
+        type=int,
+        default=1,
+        help="Number of input files to process in parallel when running on multiple inputs",
     )
-    parser.add_argument("input", help="input file")
     parser.add_argument(
         "-t",
         "--threshold",
@@ -44,6 +364,139 @@ def main():
         default=ScenecutExtractor.DEFAULT_THRESHOLD,
         help="threshold (between 0 and 1)",
     )
+    parser.add_argument(
+        "--min-scene-length",
+        type=float,
+        default=0,
+        help="Drop scene cuts that would result in scenes shorter than this many seconds",
+    )
+    parser.add_argument(
+        "--adaptive-window",
+        type=float,
+        default=0,
+        help="Only keep scene cuts whose score stands out from the scores within a window of this many seconds around them",
+    )
+    parser.add_argument(
+        "--adaptive-k",
+        type=float,
+        default=DEFAULT_ADAPTIVE_K,
+        help="With --adaptive-window, the number of standard deviations a score must exceed the mean of the window by",
+    )
+    parser.add_argument(
+        "--nms-window",
+        type=float,
+        default=0,
+        help="Only keep scene cuts with the highest score among all cuts within this many seconds (non-maximum suppression)",
+    )
+    parser.add_argument(
+        "--top-k",
+        type=int,
+        help="Instead of using a threshold, output the N frames with the highest scores",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of ffmpeg processes analyzing separate time ranges of the input in parallel",
+    )
+    parser.add_argument(
+        "--profile",
+        type=str,
+        default="full",
+        choices=list(ANALYSIS_PROFILES),
+        help="Analysis profile: downscale, convert to grayscale and/or drop frames before scoring to save time",
+    )
+    parser.add_argument(
+        "--analysis-width",
+        type=int,
+        help="Downscale frames to this width before scoring (overrides the profile)",
+    )
+    parser.add_argument(
+        "--analysis-gray",
+        action=argparse.BooleanOptionalAction,
+        help="Convert frames to grayscale before scoring (overrides the profile)",
+    )
+    parser.add_argument(
+        "--frame-step",
+        type=int,
+        help="Only score every n-th frame (overrides the profile)",
+    )
+    parser.add_argument(
+        "--crop",
+        type=str,
+        help="Only score a region of the frames, as w:h:x:y (see ffmpeg's crop filter)",
+    )
+    parser.add_argument(
+        "--ss",
+        type=float,
+        help="Only analyze the input from this time in seconds on, seeking to it without decoding the frames before",
+    )
+    parser.add_argument(
+        "--to",
+        type=float,
+        help="Only analyze the input up to this time in seconds. Timestamps stay in the time of the input, "
+        "frame numbers count from the start of the range.",
+    )
+    parser.add_argument(
+        "--stream",
+        type=int,
+        help="Index of the video stream to analyze, e.g. 1 for the second video stream (default: the stream ffmpeg selects)",
+    )
+    parser.add_argument(
+        "--backend",
+        type=str,
+        default="ffmpeg",
+        choices=list(BACKENDS),
+        help="Scoring backend: ffmpeg's scene score, or the mean absolute difference or histogram difference of small grayscale frames, calculated with NumPy",
+    )
+    parser.add_argument(
+        "--two-pass",
+        action="store_true",
+        help="Score a cheap subset of the frames first, then only analyze the frames around candidate cuts. "
+        "Faster if cuts are sparse, but cuts that the first pass misses are not found. Use -j to analyze the candidates in parallel.",
+    )
+    parser.add_argument(
+        "--coarse",
+        type=str,
+        default="decimate",
+        choices=list(COARSE_MODES),
+        help="With --two-pass, score every n-th frame or only the keyframes in the first pass",
+    )
+    parser.add_argument(
+        "--coarse-step",
+        type=int,
+        default=DEFAULT_COARSE_FRAME_STEP,
+        help="With --two-pass and --coarse decimate, score every n-th frame in the first pass",
+    )
+    parser.add_argument(
+        "--candidate-threshold",
+        type=float,
+        help="With --two-pass, analyze the frames before every frame of the first pass whose difference "
+        "to the previous one (between 0 and 1) is at least this. Default is half the threshold.",
+    )
+    parser.add_argument(
+        "--detect-black",
+        action="store_true",
+        help="Also detect black frames, in the same pass as the scene cuts (see ffmpeg's blackdetect filter)",
+    )
+    parser.add_argument(
+        "--black-min-duration",
+        type=float,
+        default=DEFAULT_MIN_DURATION,
+        help="Minimum duration in seconds of detected black sequences",
+    )
+    parser.add_argument(
+        "--detect-freeze",
+        action="store_true",
+        help="Also detect frozen frames, in the same pass as the scene cuts (see ffmpeg's freezedetect filter)",
+    )
+    parser.add_argument(
+        "--freeze-min-duration",
+        type=float,
+        default=DEFAULT_MIN_DURATION,
+        help="Minimum duration in seconds of detected freezes",
+    )
     parser.add_argument(
         "-o",
         "--output",
@@ -57,8 +510,38 @@ def main():
         "--output-format",
         type=str,
         default="json",
-        choices=["json", "csv"],
-        help="output in which format",
+        choices=["json", "csv", "ndjson", *COLUMNAR_FORMATS],
+        help="output in which format; ndjson writes one JSON object per line; "
+        "npz (requires NumPy), arrow and parquet (require pyarrow) write binary columns with metadata",
+    )
+    parser.add_argument(
+        "--timeline",
+        action="store_true",
+        help="With -of npz, arrow or parquet, write the scores of all analyzed frames, "
+        "with a boolean cut column, instead of only the scene cuts",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        type=str,
+        help="Periodically save the analysis progress to this file, and resume from it if it exists",
+    )
+    parser.add_argument(
+        "--checkpoint-interval",
+        type=float,
+        default=Checkpoint.DEFAULT_INTERVAL,
+        help="Minimum time in seconds between checkpoint writes",
+    )
+    parser.add_argument(
+        "--follow",
+        action="store_true",
+        help="Follow an input that is still being written (or a stream or '-' for stdin), "
+        "writing each scene cut as soon as it is detected. Output formats json and ndjson write JSON Lines.",
+    )
+    parser.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=ScenecutExtractor.DEFAULT_IDLE_TIMEOUT,
+        help="With --follow, stop after the input has not grown for this many seconds",
     )
     parser.add_argument(
         "-x", "--extract", action="store_true", help="extract the scene cuts"
@@ -68,11 +551,57 @@ def main():
         "--output-directory",
         help="Set the output directory. Default is the current working directory.",
     )
+    parser.add_argument(
+        "--thumbnails",
+        action="store_true",
+        help="Write an image of every scene to the output directory, in the same pass as the analysis if possible",
+    )
+    parser.add_argument(
+        "--thumbnail-positions",
+        nargs="+",
+        default=["start"],
+        choices=list(THUMBNAIL_POSITIONS),
+        help="Frames of each scene to write images of",
+    )
+    parser.add_argument(
+        "--thumbnail-width",
+        type=int,
+        help="Downscale the images to this width, keeping the aspect ratio",
+    )
+    parser.add_argument(
+        "--thumbnail-format",
+        type=str,
+        default="jpg",
+        choices=list(THUMBNAIL_FORMATS),
+        help="Image format of the thumbnails",
+    )
     parser.add_argument(
         "--no-copy",
         action="store_true",
         help="Don't stream-copy, but re-encode the video.",
     )
+    parser.add_argument(
+        "--smart-cut",
+        action="store_true",
+        help="Cut frame-accurately, re-encoding only the frames before the first and after the last keyframe of each scene. "
+        "Only keeps the first video stream and the audio streams.",
+    )
+    parser.add_argument(
+        "--no-single-pass",
+        action="store_true",
+        help="When stream-copying, run one ffmpeg process per scene instead of splitting the input in a single pass.",
+    )
+    parser.add_argument(
+        "--extract-jobs",
+        type=int,
+        default=1,
+        help="Number of scenes to extract in parallel",
+    )
+    parser.add_argument(
+        "--extract-threads",
+        type=int,
+        help="Number of threads per ffmpeg process when extracting scenes. Default is ffmpeg's choice.",
+    )
     parser.add_argument(
         "-e",
         "--output-extension",
@@ -90,49 +619,257 @@ def main():
         "--output-file",
         help="Write output to a file instead of stdout",
     )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="Print timing and resource usage of each stage as JSON to stderr",
+    )
     parser.add_argument(
         "--ffmpeg-path",
         type=str,
         default="ffmpeg",
         help="Path to ffmpeg executable",
     )
+    parser.add_argument(
+        "--cache",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help="Cache per-frame scores on disk, so that re-running with another threshold skips decoding",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        help="Cache directory. Default is the user cache directory.",
+    )
+    parser.add_argument(
+        "--cache-max-size",
+        type=float,
+        default=ScoreCache.DEFAULT_MAX_SIZE / 1024 / 1024,
+        help="Maximum cache size in MiB; least recently used entries are evicted",
+    )
+    parser.add_argument(
+        "--cache-hash",
+        action="store_true",
+        help="Also key the cache on a hash of the file contents (slower for large files)",
+    )
+    parser.add_argument(
+        "--prune-cache",
+        action="store_true",
+        help="Evict least recently used entries until the cache fits --cache-max-size",
+    )
+    parser.add_argument(
+        "--clear-cache",
+        action="store_true",
+        help="Remove all entries from the cache",
+    )
 
     cli_args = parser.parse_args()
 
+    if cli_args.serve:
+        parser.error("--serve must be the first argument")
+
     setup_logger(logging.DEBUG if cli_args.verbose else logging.INFO)
 
+    cache = ScoreCache(
+        cache_dir=cli_args.cache_dir,
+        max_size=int(cli_args.cache_max_size * 1024 * 1024),
+        hash_content=cli_args.cache_hash,
+    )
+
+    if cli_args.clear_cache or cli_args.prune_cache:
+        evicted = cache.clear() if cli_args.clear_cache else cache.prune()
+        logger.info(f"Removed {evicted} entries from cache {cache.cache_dir}")
+        if not cli_args.input and cli_args.input_list is None:
+            sys.exit(0)
+
+    if not cli_args.input and cli_args.input_list is None:
+        parser.error("the following arguments are required: input")
+
+    if cli_args.output_format in COLUMNAR_FORMATS and cli_args.output != "all":
+        parser.error(f"-of {cli_args.output_format} requires -o all")
+    if cli_args.timeline and cli_args.output_format not in COLUMNAR_FORMATS:
+        parser.error("--timeline requires -of npz, arrow or parquet")
+
+    if cli_args.smart_cut and cli_args.no_copy:
+        parser.error("--smart-cut and --no-copy are mutually exclusive")
+
+    detectors = get_cli_detectors(cli_args)
+    if detectors and (
+        cli_args.output != "all" or cli_args.output_format not in ("json", "ndjson")
+    ):
+        parser.error("detectors require -o all and -of json or ndjson")
+
+    profile: AnalysisProfile = ANALYSIS_PROFILES[cli_args.profile].copy()
+    if cli_args.analysis_width is not None:
+        profile["width"] = cli_args.analysis_width
+    if cli_args.analysis_gray is not None:
+        profile["gray"] = cli_args.analysis_gray
+    if cli_args.frame_step is not None:
+        profile["frame_step"] = cli_args.frame_step
+    if cli_args.crop is not None:
+        profile["crop"] = cli_args.crop
+
+    if cli_args.two_pass and (
+        detectors or cli_args.backend != "ffmpeg" or profile.get("frame_step", 1) > 1
+    ):
+        parser.error(
+            "--two-pass requires the ffmpeg backend, and no detectors or frame decimation"
+        )
+
+    time_range = cli_args.ss is not None or cli_args.to is not None
+    if (cli_args.ss is not None and cli_args.ss < 0) or (
+        cli_args.to is not None and cli_args.to <= (cli_args.ss or 0)
+    ):
+        parser.error("--to must be after --ss, which must not be negative")
+    if cli_args.stream is not None and cli_args.stream < 0:
+        parser.error("--stream must not be negative")
+    if (time_range or cli_args.stream is not None) and (
+        cli_args.two_pass or cli_args.thumbnails
+    ):
+        parser.error(
+            "--ss, --to and --stream can not be combined with --two-pass or --thumbnails"
+        )
+    if time_range and cli_args.follow:
+        parser.error("--ss and --to can not be combined with --follow")
+
+    if (
+        len(cli_args.input) > 1
+        or cli_args.input_list is not None
+        or any(os.path.isdir(path) for path in cli_args.input)
+    ):
+        if cli_args.top_k is not None:
+            parser.error("--top-k is not supported with multiple inputs")
+        if cli_args.follow:
+            parser.error("--follow is not supported with multiple inputs")
+        if cli_args.checkpoint is not None:
+            parser.error("--checkpoint is not supported with multiple inputs")
+        if cli_args.output_format in COLUMNAR_FORMATS:
+            parser.error(
+                f"-of {cli_args.output_format} is not supported with multiple inputs"
+            )
+        run_batch_mode(cli_args, cache, profile)
+        return
+
+    if cli_args.follow:
+        if (
+            cli_args.extract
+            or cli_args.top_k is not None
+            or cli_args.checkpoint is not None
+        ):
+            parser.error(
+                "--follow can not be combined with --extract, --top-k or --checkpoint"
+            )
+        if cli_args.backend != "ffmpeg":
+            parser.error("--follow is only supported with the ffmpeg backend")
+        if cli_args.thumbnails:
+            parser.error("--follow can not be combined with --thumbnails")
+        if cli_args.two_pass:
+            parser.error("--follow can not be combined with --two-pass")
+        if cli_args.stream is not None:
+            parser.error("--follow can not be combined with --stream")
+        if cli_args.output_format in COLUMNAR_FORMATS:
+            parser.error(
+                f"--follow can not be combined with -of {cli_args.output_format}"
+            )
+        if get_cli_postprocessing(cli_args):
+            # both need the scores after a cut, which are not known yet when following
+            parser.error(
+                "--follow can not be combined with --adaptive-window or --nms-window"
+            )
+        run_follow_mode(cli_args, profile)
+        return
+
+    thumbnails = get_cli_thumbnails(cli_args)
     try:
         logger.info("Calculating scene cuts ...")
-        se = ScenecutExtractor(cli_args.input, ffmpeg_path=cli_args.ffmpeg_path)
+        se = ScenecutExtractor(
+            cli_args.input[0],
+            ffmpeg_path=cli_args.ffmpeg_path,
+            cache=cache if cli_args.cache else None,
+        )
         se.calculate_scenecuts(
             cli_args.threshold,
             progress=cli_args.progress,
+            min_scene_length=cli_args.min_scene_length,
+            workers=cli_args.jobs,
+            profile=profile,
+            checkpoint_file=cli_args.checkpoint,
+            checkpoint_interval=cli_args.checkpoint_interval,
+            detectors=detectors,
+            backend=cli_args.backend,
+            postprocessing=get_cli_postprocessing(cli_args),
+            two_pass=get_cli_two_pass(cli_args),
+            start=cli_args.ss or 0,
+            end=cli_args.to,
+            stream=cli_args.stream,
+            # the top k cuts are only known after the analysis
+            thumbnails=thumbnails if cli_args.top_k is None else None,
         )
+        if cli_args.top_k is not None:
+            se.top_k(cli_args.top_k, min_scene_length=cli_args.min_scene_length)
+            if thumbnails is not None:
+                se.extract_thumbnails(
+                    thumbnails["output_directory"],
+                    thumbnails.get("positions"),
+                    thumbnails.get("width"),
+                    thumbnails.get("image_format", "jpg"),
+                    cli_args.progress,
+                )
 
-        scenecuts = se.get_scenecuts()
+        scenecuts = se.get_scenecut_table()
 
-        if cli_args.output == "all":
-            if cli_args.output_format == "csv":
-                output_str = se.get_as_csv()
-            else:
-                output_str = se.get_as_json()
+        if cli_args.output_format in COLUMNAR_FORMATS:
+            write_columnar_output(se, cli_args)
         else:
-            if cli_args.output == "frames":
-                data = [str(s["frame"]) for s in scenecuts]
-            elif cli_args.output == "seconds":
-                data = [str(s["pts_time"]) for s in scenecuts]
-            else:
-                raise RuntimeError(f"No such output format: {cli_args.output}")
-            output_str = "\n".join(data)
-
+            output = (
+                open(cli_args.output_file, "w") if cli_args.output_file else sys.stdout
+            )
+            try:
+                # write the output as it is formatted, so that large results are not
+                # held in memory as a single string
+                if detectors:
+                    events = se.get_events()
+                    if cli_args.output_format == "ndjson":
+                        # one line per scene cut, then one line per event
+                        se.write_as_ndjson(output)
+                        for name, detector_events in events.items():
+                            for event in detector_events:
+                                output.write(
+                                    json.dumps({"detector": name, **event}) + "\n"
+                                )
+                    else:
+                        output.write(
+                            json.dumps(
+                                {"scenecuts": scenecuts.to_list(), "events": events},
+                                indent=2,
+                            )
+                            + "\n"
+                        )
+                elif cli_args.output == "all":
+                    if cli_args.output_format == "ndjson":
+                        se.write_as_ndjson(output)
+                    else:
+                        if cli_args.output_format == "csv":
+                            se.write_as_csv(output)
+                        else:
+                            se.write_as_json(output)
+                        output.write("\n")
+                else:
+                    if cli_args.output == "frames":
+                        column = scenecuts.frames
+                    elif cli_args.output == "seconds":
+                        column = scenecuts.pts_time
+                    else:
+                        raise RuntimeError(f"No such output format: {cli_args.output}")
+                    for value in column:
+                        output.write(f"{value}\n")
+                    if not scenecuts:
+                        output.write("\n")
+            finally:
+                if output is not sys.stdout:
+                    output.close()
         if cli_args.output_file:
-            with open(cli_args.output_file, "w") as f:
-                f.write(output_str)
-                if not output_str.endswith("\n"):
-                    f.write("\n")
             logger.info(f"Output written to {cli_args.output_file}")
-        else:
-            print(output_str)
 
         if cli_args.extract:
             logger.info("Extracting scenes ...")
@@ -143,11 +880,22 @@ def main():
                 no_copy=cli_args.no_copy,
                 progress=cli_args.progress,
                 output_extension=cli_args.output_extension,
+                single_pass=not cli_args.no_single_pass,
+                workers=cli_args.extract_jobs,
+                threads=cli_args.extract_threads,
+                smart_cut=cli_args.smart_cut,
             )
             logger.info(f"Scenes extracted to {cli_args.output_directory}")
 
+        if cli_args.stats:
+            print(json.dumps(se.stats.to_dict(), indent=2), file=sys.stderr)
+
     except KeyboardInterrupt:
         logger.info("Interrupted by user")
+        if cli_args.checkpoint is not None and os.path.isfile(cli_args.checkpoint):
+            logger.info(
+                f"Progress saved to {cli_args.checkpoint}, run the same command again to resume"
+            )
         sys.exit(0)
 
 
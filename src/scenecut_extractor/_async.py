@@ -0,0 +1,788 @@
+from __future__ import annotations
+
+import asyncio
+import inspect
+import logging
+import os
+import shlex
+import tempfile
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncGenerator,
+    Awaitable,
+    Callable,
+    Iterable,
+    Literal,
+    Mapping,
+    Optional,
+    Union,
+)
+
+from ffmpeg_progress_yield import FfmpegProgress
+
+from ._detectors import (
+    DetectorEvent,
+    DetectorOptions,
+    parse_detector_events,
+    resolve_detectors,
+)
+from ._parser import MetadataParser
+from ._postprocess import PostProcessing, resolve_postprocessing
+from ._probe import probe_input
+from ._profile import AnalysisProfile, resolve_profile
+from ._scenecut_extractor import ScenecutExtractor, ScenecutInfo
+from ._smartcut import SMART_CUT_ENCODERS, KeyframeIndex
+from ._stats import read_process_io_bytes
+from ._timeline import ScoreTimeline
+
+if TYPE_CHECKING:
+    from ._cache import ScoreCache
+
+logger = logging.getLogger("scenecut-extractor")
+
+ProgressCallback = Callable[[float], Union[Awaitable[None], None]]
+"""Called with the progress in percent; may be a coroutine function"""
+
+
+async def _read_lines(stream: asyncio.StreamReader, lines: deque[bytes]) -> None:
+    async for line in stream:
+        lines.append(line)
+
+
+async def _report_progress(
+    progress_callback: Optional[ProgressCallback], progress: float
+) -> None:
+    if progress_callback is None:
+        return
+    ret = progress_callback(progress)
+    if inspect.isawaitable(ret):
+        await ret
+
+
+class AsyncScenecutExtractor(ScenecutExtractor):
+    """
+    Variant of `ScenecutExtractor` with coroutine versions of its ffmpeg-based methods.
+
+    The coroutines have an `_async` suffix, e.g. `calculate_scenecuts_async()` and
+    `extract_scenes_async()`. ffmpeg runs as an asyncio subprocess, so many analyses
+    and extractions can share one event loop without blocking it. Cancelling a task
+    kills the ffmpeg processes it started. All inherited methods (e.g. `rethreshold()`,
+    `get_as_json()` or `calculate_scenecuts()`) stay synchronous.
+    """
+
+    def __init__(
+        self,
+        input_file: str,
+        ffmpeg_path: str = "ffmpeg",
+        cache: Optional[ScoreCache] = None,
+        semaphore: Optional[asyncio.Semaphore] = None,
+    ) -> None:
+        """
+        Create a new AsyncScenecutExtractor instance.
+
+        Args:
+            input_file (str): the input file
+            ffmpeg_path (str, optional): Path to ffmpeg executable. Defaults to "ffmpeg".
+            cache (ScoreCache, optional): Cache for per-frame scores. Defaults to None (no caching).
+            semaphore (asyncio.Semaphore, optional): Limits the number of concurrently running
+                ffmpeg processes. Share one semaphore between instances to set a global limit.
+                Defaults to None (no limit).
+        """
+        super().__init__(input_file, ffmpeg_path=ffmpeg_path, cache=cache)
+        self.semaphore = semaphore
+
+    @asynccontextmanager
+    async def _ffmpeg_slot(self) -> AsyncGenerator[None, None]:
+        if self.semaphore is None:
+            yield
+        else:
+            async with self.semaphore:
+                yield
+
+    async def calculate_scenecuts_async(
+        self,
+        threshold: float = ScenecutExtractor.DEFAULT_THRESHOLD,
+        progress_callback: Optional[ProgressCallback] = None,
+        min_scene_length: float = 0,
+        profile: Union[str, AnalysisProfile, None] = None,
+        postprocessing: Optional[PostProcessing] = None,
+        detectors: Union[Iterable[str], Mapping[str, Mapping[str, Any]], None] = None,
+        start: float = 0,
+        end: Optional[float] = None,
+        stream: Optional[int] = None,
+    ) -> None:
+        """
+        Calculate scene cuts with ffmpeg.
+
+        See `ScenecutExtractor.calculate_scenecuts()`. The analysis always runs in a
+        single ffmpeg process with the ffmpeg backend; for parallel, two-pass or NumPy
+        analyses, checkpoints or thumbnails, run `calculate_scenecuts()` in a thread,
+        e.g. with `asyncio.to_thread()`.
+
+        Args:
+            threshold (float): Threshold (between 0 and 1)
+            progress_callback (ProgressCallback, optional): Called with the progress in percent
+            min_scene_length (float): Minimum scene length in seconds
+            profile (Union[str, AnalysisProfile, None]): Analysis profile name or custom profile
+            postprocessing (PostProcessing, optional): Rules to suppress false cuts
+            detectors (Union[Iterable[str], Mapping[str, Mapping[str, Any]], None]): Detector names,
+                or a mapping of detector names to options of their ffmpeg filter
+            start (float): Only analyze the frames from this time in seconds on
+            end (float, optional): Only analyze the frames before this time in seconds
+            stream (int, optional): Index of the video stream to analyze
+
+        Raises:
+            ValueError: if a post-processing rule, the time range or the stream is invalid
+        """
+        if not (0 <= threshold <= 1):
+            raise RuntimeError("Threshold must be between 0 and 1")
+        time_range = self._resolve_time_range(start, end, stream)
+        resolve_postprocessing(postprocessing)
+
+        analysis_profile = resolve_profile(profile)
+        detector_options = resolve_detectors(detectors)
+
+        timeline: Optional[ScoreTimeline] = None
+        events: Optional[dict[str, list[DetectorEvent]]] = None
+        cache_key: Optional[str] = None
+        if self.cache is not None:
+            with self.stats.stage("cache"):
+                cache_key = await asyncio.to_thread(
+                    self.cache.make_key,
+                    self.input_file,
+                    self._get_cache_options(
+                        self._get_score_filter(analysis_profile, detector_options),
+                        time_range=time_range,
+                        stream=stream,
+                    ),
+                )
+                timeline = await asyncio.to_thread(self.cache.get, cache_key)
+                if timeline is not None and detector_options:
+                    events = await asyncio.to_thread(self.cache.get_events, cache_key)
+                    if events is None:
+                        timeline = None
+            if timeline is not None:
+                logger.debug("Using cached scores for " + self.input_file)
+
+        if timeline is None:
+            metadata: list[tuple[str, str]] = []
+            with self.stats.stage("decode", ffmpeg=True):
+                timeline = await self._calculate_frame_scores_async(
+                    progress_callback,
+                    analysis_profile,
+                    detector_options,
+                    metadata,
+                    stream,
+                    time_range,
+                )
+            if detector_options:
+                events = parse_detector_events(
+                    detector_options,
+                    metadata,
+                    timeline.pts_time[-1] if len(timeline) else None,
+                )
+            if self.cache is not None and cache_key is not None:
+                with self.stats.stage("cache"):
+                    await asyncio.to_thread(
+                        self.cache.put, cache_key, timeline, self.input_file, events
+                    )
+
+        self.timeline = timeline
+        self.events = events
+        self.time_range = time_range
+        self.stream = stream
+        self.rethreshold(threshold, min_scene_length, postprocessing)
+
+    async def iter_scenecuts_async(
+        self,
+        threshold: float = ScenecutExtractor.DEFAULT_THRESHOLD,
+        profile: Union[str, AnalysisProfile, None] = None,
+        min_scene_length: float = 0,
+        follow: bool = False,
+        idle_timeout: float = ScenecutExtractor.DEFAULT_IDLE_TIMEOUT,
+    ) -> AsyncGenerator[ScenecutInfo, None]:
+        """
+        Calculate scene cuts with ffmpeg, yielding each cut as soon as it is detected.
+
+        Closing the generator early (e.g. with `contextlib.aclosing()`) terminates ffmpeg.
+        See `ScenecutExtractor.iter_scenecuts()` for follow mode.
+
+        Args:
+            threshold (float): Threshold (between 0 and 1)
+            profile (Union[str, AnalysisProfile, None]): Analysis profile name or custom profile
+            min_scene_length (float): Minimum scene length in seconds
+            follow (bool): Follow an input that is still being written
+            idle_timeout (float): In follow mode, stop after this many seconds without new data
+
+        Yields:
+            ScenecutInfo: the scene cuts, in presentation order
+        """
+        if not (0 <= threshold <= 1):
+            raise RuntimeError("Threshold must be between 0 and 1")
+
+        analysis_profile = resolve_profile(profile)
+        last_cut_time = 0.0
+        async for frame, pts, pts_time, score in self._iter_frame_scores_async(
+            input_args=self._get_follow_args(idle_timeout) if follow else None,
+            profile=analysis_profile,
+            live=follow,
+        ):
+            if score >= threshold and pts_time - last_cut_time >= min_scene_length:
+                last_cut_time = pts_time
+                yield {"frame": frame, "pts": pts, "pts_time": pts_time, "score": score}
+
+    async def _calculate_frame_scores_async(
+        self,
+        progress_callback: Optional[ProgressCallback] = None,
+        profile: Optional[AnalysisProfile] = None,
+        detectors: Optional[DetectorOptions] = None,
+        metadata: Optional[list[tuple[str, str]]] = None,
+        stream: Optional[int] = None,
+        time_range: Optional[tuple[float, Optional[float]]] = None,
+    ) -> ScoreTimeline:
+        """
+        Run ffmpeg and parse the scene scores of all frames.
+
+        Args:
+            progress_callback (ProgressCallback, optional): Called with the progress in percent
+            profile (AnalysisProfile, optional): Analysis profile
+            detectors (DetectorOptions, optional): Detectors to run in the same process
+            metadata (list[tuple[str, str]], optional): List to append the metadata of the detectors to
+            stream (int, optional): Index of the video stream to analyze
+            time_range (tuple[float, Optional[float]], optional): Only analyze the time range from the
+                start to the end (if any), see `ScenecutExtractor.calculate_scenecuts()`
+
+        Returns:
+            ScoreTimeline: the scores of all frames
+        """
+        timeline = ScoreTimeline()
+
+        input_args: Optional[list[str]] = None
+        if time_range is not None:
+            input_args = await asyncio.to_thread(self._get_time_range_args, time_range)
+
+        start, end = time_range or (0.0, None)
+        duration = None
+        if progress_callback is not None:
+            duration = (
+                end
+                if end is not None
+                else (
+                    await asyncio.to_thread(
+                        probe_input, self.input_file, self.ffmpeg_path
+                    )
+                )["duration"]
+            )
+            await _report_progress(progress_callback, 0)
+
+        last_progress = 0
+        async for chunk in self._iter_frame_score_chunks_async(
+            input_args,
+            profile,
+            detectors=detectors,
+            metadata=metadata,
+            stream=stream,
+        ):
+            timeline.extend(chunk.frames, chunk.pts, chunk.pts_time, chunk.scores)
+            if (
+                duration
+                and duration > start
+                and (p := int((chunk.pts_time[-1] - start) / (duration - start) * 100))
+                > last_progress
+            ):
+                last_progress = min(p, 100)
+                await _report_progress(progress_callback, last_progress)
+
+        if progress_callback is not None and last_progress < 100:
+            await _report_progress(progress_callback, 100)
+
+        if time_range is not None:
+            return self._select_time_range(timeline, time_range)
+        return timeline
+
+    async def _iter_frame_scores_async(
+        self,
+        input_args: Optional[list[str]] = None,
+        profile: Optional[AnalysisProfile] = None,
+        live: bool = False,
+    ) -> AsyncGenerator[tuple[int, float, float, float], None]:
+        """
+        Run ffmpeg as an asyncio subprocess and yield the scene score of each frame.
+
+        Args:
+            input_args (list[str], optional): Additional ffmpeg input options
+            profile (AnalysisProfile, optional): Analysis profile
+            live (bool, optional): Read each frame as soon as it has been analyzed
+
+        Yields:
+            tuple[int, float, float, float]: frame number, pts, pts_time and score
+        """
+        async for chunk in self._iter_frame_score_chunks_async(
+            input_args, profile, live
+        ):
+            for frame_score in zip(
+                chunk.frames, chunk.pts, chunk.pts_time, chunk.scores
+            ):
+                yield frame_score
+
+    async def _iter_frame_score_chunks_async(
+        self,
+        input_args: Optional[list[str]] = None,
+        profile: Optional[AnalysisProfile] = None,
+        live: bool = False,
+        detectors: Optional[DetectorOptions] = None,
+        metadata: Optional[list[tuple[str, str]]] = None,
+        stream: Optional[int] = None,
+    ) -> AsyncGenerator[ScoreTimeline, None]:
+        """
+        Run ffmpeg as an asyncio subprocess and yield the scene scores of all frames printed so far.
+
+        Args:
+            input_args (list[str], optional): Additional ffmpeg input options
+            profile (AnalysisProfile, optional): Analysis profile
+            live (bool, optional): Read each frame as soon as it has been analyzed
+            detectors (DetectorOptions, optional): Detectors to run on the same frames
+            metadata (list[tuple[str, str]], optional): List to append the metadata of the detectors to
+            stream (int, optional): Index of the video stream to analyze
+
+        Yields:
+            ScoreTimeline: the scores of the frames that have been printed since the last chunk
+        """
+        cmd = self._get_score_command(
+            input_args, profile, live, detectors, stream=stream
+        )
+
+        async with self._ffmpeg_slot():
+            logger.debug(
+                "Running ffmpeg command: " + " ".join([shlex.quote(c) for c in cmd])
+            )
+            proc = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdin=None if self._reads_stdin() else asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            assert proc.stdout is not None and proc.stderr is not None
+            self.stats.add_ffmpeg_process(proc.pid)
+
+            # drain stderr concurrently so that ffmpeg never blocks on it,
+            # keeping only the last lines so that memory stays bounded on long runs
+            stderr_lines: deque[bytes] = deque(maxlen=self.STDERR_LINES)
+            stderr_task = asyncio.ensure_future(_read_lines(proc.stderr, stderr_lines))
+
+            parser = MetadataParser(
+                frame_step=(profile or {}).get("frame_step", 1), metadata=metadata
+            )
+            parse_time = 0.0
+            frames = 0
+            completed = False
+            try:
+                while True:
+                    data = await proc.stdout.read(self.READ_SIZE)
+                    parse_start = time.thread_time()
+                    if data:
+                        parser.feed(data)
+                    else:
+                        parser.close()
+                    parse_time += time.thread_time() - parse_start
+
+                    if len(parser.timeline):
+                        frames += len(parser.timeline)
+                        yield parser.timeline
+                        parser.timeline = ScoreTimeline()
+                    if not data:
+                        break
+                completed = True
+            finally:
+                if not completed and proc.returncode is None:
+                    proc.kill()
+                # read before waiting, as the process is gone afterwards
+                input_bytes = read_process_io_bytes(proc.pid)
+                await proc.wait()
+                self.stats.add_frames(frames, input_bytes)
+                self.stats.add_stage("parse", parse_time, parse_time)
+                await stderr_task
+                stderr = b"".join(stderr_lines).decode("utf-8", errors="replace")
+
+        if proc.returncode != 0:
+            raise RuntimeError(f"Error running command {cmd}: " + stderr.strip())
+
+    async def get_keyframe_index_async(self) -> KeyframeIndex:
+        """
+        Get the timestamps of all frames of the input and which of them are keyframes.
+
+        See `ScenecutExtractor.get_keyframe_index()`.
+
+        Returns:
+            KeyframeIndex: the keyframe index
+
+        Raises:
+            RuntimeError: if ffmpeg fails
+        """
+        if self.keyframe_index is not None:
+            return self.keyframe_index
+
+        cache_key: Optional[str] = None
+        if self.cache is not None:
+            with self.stats.stage("cache"):
+                cache_key = await asyncio.to_thread(
+                    self.cache.make_key, self.input_file, {"keyframe_index": 1}
+                )
+                self.keyframe_index = await asyncio.to_thread(
+                    self.cache.get_keyframe_index, cache_key
+                )
+            if self.keyframe_index is not None:
+                logger.debug("Using cached keyframe index for " + self.input_file)
+                return self.keyframe_index
+
+        cmd = KeyframeIndex.get_keyframe_index_command(
+            self.input_file, self.ffmpeg_path
+        )
+
+        with self.stats.stage("index", ffmpeg=True):
+            async with self._ffmpeg_slot():
+                logger.debug(
+                    "Running ffmpeg command: " + " ".join([shlex.quote(c) for c in cmd])
+                )
+                proc = await asyncio.create_subprocess_exec(
+                    *cmd,
+                    stdin=asyncio.subprocess.DEVNULL,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                )
+                self.stats.add_ffmpeg_process(proc.pid)
+                try:
+                    stdout, stderr = await proc.communicate()
+                finally:
+                    if proc.returncode is None:
+                        proc.kill()
+                        await proc.wait()
+
+        if proc.returncode != 0:
+            raise RuntimeError(
+                f"Error running command {cmd}: "
+                + stderr.decode("utf-8", errors="replace").strip()
+            )
+
+        keyframe_index = KeyframeIndex.from_framecrc(
+            stdout.decode("utf-8", errors="replace").splitlines()
+        )
+        if self.cache is not None and cache_key is not None:
+            with self.stats.stage("cache"):
+                await asyncio.to_thread(
+                    self.cache.put_keyframe_index,
+                    cache_key,
+                    keyframe_index,
+                    self.input_file,
+                )
+
+        self.keyframe_index = keyframe_index
+        return keyframe_index
+
+    async def extract_scenes_async(
+        self,
+        output_directory: str,
+        no_copy: bool = False,
+        progress_callback: Optional[ProgressCallback] = None,
+        output_extension: Optional[str] = None,
+        single_pass: bool = True,
+        workers: int = 1,
+        threads: Optional[int] = None,
+        smart_cut: bool = False,
+    ) -> None:
+        """
+        Extract all scenes to individual files.
+
+        Args:
+            output_directory (str): Output directory.
+            no_copy (bool, optional): Do not copy the streams, reencode them. Defaults to False.
+            progress_callback (ProgressCallback, optional): Called with the overall progress in percent.
+            output_extension (str, optional): Output file extension (e.g., ".mp4"). Defaults to input file extension.
+            single_pass (bool, optional): When stream-copying, split the input with a single ffmpeg process
+                instead of running one process per scene. Defaults to True.
+            workers (int, optional): Number of scenes to extract concurrently. Defaults to 1.
+            threads (int, optional): Number of threads per ffmpeg process. Defaults to ffmpeg's choice.
+            smart_cut (bool, optional): Cut frame-accurately, re-encoding only the frames before the first
+                and after the last keyframe of each scene. Defaults to False.
+
+        Raises:
+            ValueError: if both `no_copy` and `smart_cut` are set
+            RuntimeError: if extracting one or more scenes failed (all other scenes are still extracted)
+        """
+        if self.scenecuts is None:
+            raise RuntimeError("No scene cuts calculated yet")
+
+        if smart_cut:
+            if no_copy:
+                raise ValueError("Smart cutting and re-encoding are mutually exclusive")
+            codec = (await self.get_keyframe_index_async()).codec
+            if codec not in SMART_CUT_ENCODERS:
+                logger.warning(
+                    f"Smart cutting is not supported for {codec} video, re-encoding scenes"
+                )
+                smart_cut, no_copy = False, True
+
+        with self.stats.stage("extract", ffmpeg=True):
+            await self._extract_scenes_async(
+                output_directory,
+                no_copy,
+                progress_callback,
+                output_extension,
+                single_pass,
+                workers,
+                threads,
+                smart_cut,
+            )
+
+    async def _extract_scenes_async(
+        self,
+        output_directory: str,
+        no_copy: bool,
+        progress_callback: Optional[ProgressCallback],
+        output_extension: Optional[str],
+        single_pass: bool,
+        workers: int,
+        threads: Optional[int],
+        smart_cut: bool = False,
+    ) -> None:
+        """
+        Extract all scenes to individual files; see `extract_scenes()` for the arguments.
+        """
+        cut_times = self._get_cut_times()
+
+        if not os.path.exists(output_directory):
+            os.makedirs(output_directory, exist_ok=True)
+
+        if (
+            not no_copy
+            and not smart_cut
+            and single_pass
+            and len(cut_times) > 1
+            and await self._split_scenes_single_pass_async(
+                output_directory, cut_times, progress_callback, output_extension
+            )
+        ):
+            return
+
+        # longest scenes first, so that no long scene is left running on its own at the end
+        scenes = sorted(
+            zip(cut_times, cut_times[1:]),
+            key=lambda scene: scene[1] - scene[0],
+            reverse=True,
+        )
+        total_duration = sum(end - start for start, end in scenes)
+        done: dict[tuple[float, float], float] = {}
+        limit = asyncio.Semaphore(max(1, workers))
+
+        async def extract_scene(start: float, end: float) -> None:
+            async def on_progress(p: float) -> None:
+                done[(start, end)] = (end - start) * p / 100
+                if total_duration > 0:
+                    await _report_progress(
+                        progress_callback, sum(done.values()) / total_duration * 100
+                    )
+
+            async with limit:
+                try:
+                    if smart_cut:
+                        await self.smart_cut_part_from_file_async(
+                            output_directory,
+                            start,
+                            end,
+                            output_extension,
+                            threads,
+                            on_progress,
+                        )
+                    else:
+                        self.stats.add_ffmpeg_process()
+                        await self.cut_part_from_file_async(
+                            self.input_file,
+                            output_directory,
+                            start,
+                            end,
+                            no_copy,
+                            self.ffmpeg_path,
+                            output_extension,
+                            threads,
+                            on_progress,
+                            self.semaphore,
+                        )
+                except Exception as e:
+                    logger.error(f"Failed to extract scene {start:.3f}-{end:.3f}: {e}")
+                    raise
+                finally:
+                    await on_progress(100)
+
+        results = await asyncio.gather(
+            *(extract_scene(start, end) for start, end in scenes),
+            return_exceptions=True,
+        )
+        failures = [
+            scene for scene, ret in zip(scenes, results) if isinstance(ret, Exception)
+        ]
+        if failures:
+            raise RuntimeError(
+                f"Failed to extract {len(failures)} of {len(scenes)} scenes: "
+                + ", ".join(f"{start:.3f}-{end:.3f}" for start, end in failures)
+            )
+
+    async def smart_cut_part_from_file_async(
+        self,
+        output_directory: str,
+        start: float,
+        end: float,
+        output_extension: Optional[str] = None,
+        threads: Optional[int] = None,
+        progress_callback: Optional[ProgressCallback] = None,
+    ) -> None:
+        """
+        Cut a part of the input frame-accurately, re-encoding as few frames as possible.
+
+        See `ScenecutExtractor.smart_cut_part_from_file()`.
+
+        Args:
+            output_directory (str): Output directory.
+            start (float): Start time.
+            end (float): End time.
+            output_extension (str, optional): Output file extension (e.g., ".mp4"). Defaults to input file extension.
+            threads (int, optional): Number of threads ffmpeg may use. Defaults to ffmpeg's choice.
+            progress_callback (ProgressCallback, optional): Called with the progress in percent.
+
+        Raises:
+            ValueError: if the codec of the input is not supported
+            RuntimeError: if ffmpeg fails
+        """
+        keyframe_index = await self.get_keyframe_index_async()
+        with tempfile.TemporaryDirectory(dir=output_directory) as temp_dir:
+            cmds = self._get_smart_cut_commands(
+                keyframe_index,
+                output_directory,
+                temp_dir,
+                start,
+                end,
+                output_extension,
+                threads,
+            )
+            for i, cmd in enumerate(cmds):
+
+                async def on_progress(p: float, i: int = i) -> None:
+                    await _report_progress(progress_callback, (i * 100 + p) / len(cmds))
+
+                self.stats.add_ffmpeg_process()
+                await self._run_ffmpeg_async(cmd, on_progress, self.semaphore)
+
+    async def _split_scenes_single_pass_async(
+        self,
+        output_directory: str,
+        cut_times: list[float],
+        progress_callback: Optional[ProgressCallback] = None,
+        output_extension: Optional[str] = None,
+    ) -> bool:
+        """
+        Split the input at all cut times with one ffmpeg process using the segment muxer.
+
+        See `ScenecutExtractor._split_scenes_single_pass()` for when the input should be split per scene instead.
+
+        Args:
+            output_directory (str): Output directory.
+            cut_times (list[float]): Start times of all scenes, and the end time of the last scene.
+            progress_callback (ProgressCallback, optional): Called with the progress in percent.
+            output_extension (str, optional): Output file extension (e.g., ".mp4"). Defaults to input file extension.
+
+        Returns:
+            bool: True if all scenes were written, False if the input should be split per scene instead
+        """
+        output_files = [
+            self.get_scene_file_path(
+                self.input_file, output_directory, start, end, output_extension
+            )
+            for start, end in zip(cut_times, cut_times[1:])
+        ]
+        segment_extension = os.path.splitext(output_files[0])[1]
+
+        with tempfile.TemporaryDirectory(dir=output_directory) as temp_dir:
+            cmd = self._get_split_command(
+                cut_times,
+                os.path.join(temp_dir, "scene_%06d" + segment_extension),
+                os.path.join(temp_dir, self.SEGMENT_LIST),
+            )
+            if cmd is None:
+                return False
+            self.stats.add_ffmpeg_process()
+            await self._run_ffmpeg_async(cmd, progress_callback, self.semaphore)
+            return self._move_split_scenes(temp_dir, output_files, cut_times)
+
+    @staticmethod
+    async def _run_ffmpeg_async(
+        cmd: list[str],
+        progress_callback: Optional[ProgressCallback] = None,
+        semaphore: Optional[asyncio.Semaphore] = None,
+    ) -> None:
+        """
+        Run an ffmpeg command as an asyncio subprocess, reporting its progress.
+
+        Args:
+            cmd (list[str]): the command
+            progress_callback (ProgressCallback, optional): Called with the progress in percent.
+            semaphore (asyncio.Semaphore, optional): Acquired while ffmpeg is running.
+
+        Raises:
+            RuntimeError: if ffmpeg fails
+        """
+        if semaphore is not None:
+            async with semaphore:
+                await AsyncScenecutExtractor._run_ffmpeg_async(cmd, progress_callback)
+            return
+
+        logger.debug(
+            "Running ffmpeg command: " + " ".join([shlex.quote(c) for c in cmd])
+        )
+        # the process is killed when the generator is closed, including on cancellation
+        async for p in FfmpegProgress(cmd).async_run_command_with_progress():
+            await _report_progress(progress_callback, p)
+
+    @staticmethod
+    async def cut_part_from_file_async(
+        input_file: str,
+        output_directory: str,
+        start: Union[float, None] = None,
+        end: Union[float, None, Literal[""]] = None,
+        no_copy: bool = False,
+        ffmpeg_path: str = "ffmpeg",
+        output_extension: Optional[str] = None,
+        threads: Optional[int] = None,
+        progress_callback: Optional[ProgressCallback] = None,
+        semaphore: Optional[asyncio.Semaphore] = None,
+    ) -> None:
+        """
+        Cut a part of a video.
+
+        Args:
+            input_file (str): Input file.
+            output_directory (str): Output directory.
+            start (Union[float, None], optional): Start time. Defaults to None.
+            end (Union[float, None, Literal[""]], optional): End time. Defaults to None.
+            no_copy (bool, optional): Do not copy the streams, reencode them. Defaults to False.
+            ffmpeg_path (str, optional): Path to ffmpeg executable. Defaults to "ffmpeg".
+            output_extension (str, optional): Output file extension (e.g., ".mp4"). Defaults to input file extension.
+            threads (int, optional): Number of threads ffmpeg may use. Defaults to ffmpeg's choice.
+            progress_callback (ProgressCallback, optional): Called with the progress in percent.
+            semaphore (asyncio.Semaphore, optional): Acquired while ffmpeg is running.
+        """
+        cmd = ScenecutExtractor._get_cut_command(
+            input_file,
+            output_directory,
+            start,
+            end,
+            no_copy,
+            ffmpeg_path,
+            output_extension,
+            threads,
+        )
+        await AsyncScenecutExtractor._run_ffmpeg_async(
+            cmd, progress_callback, semaphore
+        )
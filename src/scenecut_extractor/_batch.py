@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, Optional, TypedDict
+
+from ._detectors import DetectorEvent
+from ._scenecut_extractor import ScenecutExtractor, ScenecutInfo
+from ._stats import RunStats
+
+if TYPE_CHECKING:
+    from ._cache import ScoreCache
+
+logger = logging.getLogger("scenecut-extractor")
+
+VIDEO_EXTENSIONS = {
+    ".264",
+    ".265",
+    ".avi",
+    ".flv",
+    ".h264",
+    ".h265",
+    ".hevc",
+    ".m2ts",
+    ".m4v",
+    ".mkv",
+    ".mov",
+    ".mp4",
+    ".mpeg",
+    ".mpg",
+    ".mts",
+    ".mxf",
+    ".ts",
+    ".webm",
+    ".wmv",
+    ".y4m",
+}
+"""File extensions that are considered when scanning directories"""
+
+
+class BatchResult(TypedDict):
+    input: str
+    """The input file"""
+    scenecuts: Optional[list[ScenecutInfo]]
+    """The scene cuts, or None if processing failed"""
+    events: Optional[dict[str, list[DetectorEvent]]]
+    """The events of the detectors, or None if no detectors were run or processing failed"""
+    elapsed: float
+    """The processing time in seconds"""
+    error: Optional[str]
+    """The error message, or None if processing succeeded"""
+    stats: dict[str, Any]
+    """Timing and resource usage, see `RunStats`"""
+
+
+def collect_inputs(paths: Iterable[str], input_list: Optional[str] = None) -> list[str]:
+    """
+    Collect input files from paths, directories and a file list.
+
+    Directories are scanned recursively for files with a known video extension.
+
+    Args:
+        paths (Iterable[str]): files or directories
+        input_list (str, optional): File with one input path per line.
+
+    Returns:
+        list[str]: the input files
+    """
+    candidates = list(paths)
+    if input_list is not None:
+        with open(input_list, "r") as f:
+            candidates.extend(line.strip() for line in f if line.strip())
+
+    inputs: list[str] = []
+    for path in candidates:
+        if not os.path.isdir(path):
+            inputs.append(path)
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            inputs.extend(
+                os.path.join(root, name)
+                for name in sorted(files)
+                if os.path.splitext(name)[1].lower() in VIDEO_EXTENSIONS
+            )
+
+    return inputs
+
+
+def analyze_file(
+    input_file: str,
+    ffmpeg_path: str = "ffmpeg",
+    cache: Optional[ScoreCache] = None,
+    calculate_args: Optional[dict[str, Any]] = None,
+    extract_args: Optional[dict[str, Any]] = None,
+) -> BatchResult:
+    """
+    Calculate (and optionally extract) the scene cuts of a single file, capturing any error.
+
+    Args:
+        input_file (str): the input file
+        ffmpeg_path (str, optional): Path to ffmpeg executable. Defaults to "ffmpeg".
+        cache (ScoreCache, optional): Cache for per-frame scores.
+        calculate_args (dict, optional): Arguments for `ScenecutExtractor.calculate_scenecuts()`.
+        extract_args (dict, optional): Arguments for `ScenecutExtractor.extract_scenes()`; no extraction if None.
+
+    Returns:
+        BatchResult: the result
+    """
+    start = time.perf_counter()
+    se = ScenecutExtractor(input_file, ffmpeg_path=ffmpeg_path, cache=cache)
+    try:
+        se.calculate_scenecuts(**(calculate_args or {}))
+        if extract_args is not None:
+            se.extract_scenes(**extract_args)
+        return {
+            "input": input_file,
+            "scenecuts": se.get_scenecuts(),
+            "events": se.events,
+            "elapsed": time.perf_counter() - start,
+            "error": None,
+            "stats": se.stats.to_dict(),
+        }
+    except Exception as e:
+        return {
+            "input": input_file,
+            "scenecuts": None,
+            "events": None,
+            "elapsed": time.perf_counter() - start,
+            "error": str(e),
+            "stats": se.stats.to_dict(),
+        }
+
+
+def run_batch(
+    input_files: Iterable[str],
+    workers: int = 1,
+    ffmpeg_path: str = "ffmpeg",
+    cache: Optional[ScoreCache] = None,
+    calculate_args: Optional[dict[str, Any]] = None,
+    extract_args: Optional[dict[str, Any]] = None,
+) -> Iterator[BatchResult]:
+    """
+    Process many files with a pool of worker processes.
+
+    Args:
+        input_files (Iterable[str]): the input files
+        workers (int, optional): Number of files to process in parallel. Defaults to 1.
+        ffmpeg_path (str, optional): Path to ffmpeg executable. Defaults to "ffmpeg".
+        cache (ScoreCache, optional): Cache for per-frame scores.
+        calculate_args (dict, optional): Arguments for `ScenecutExtractor.calculate_scenecuts()`.
+        extract_args (dict, optional): Arguments for `ScenecutExtractor.extract_scenes()`; no extraction if None.
+
+    Yields:
+        BatchResult: the result for each file, in order of completion; if a worker process
+            dies or a job can not be sent to it, the file gets a failed result
+    """
+    if workers <= 1:
+        for input_file in input_files:
+            yield analyze_file(
+                input_file, ffmpeg_path, cache, calculate_args, extract_args
+            )
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        start = time.perf_counter()
+        futures = {
+            executor.submit(
+                analyze_file,
+                input_file,
+                ffmpeg_path,
+                cache,
+                calculate_args,
+                extract_args,
+            ): input_file
+            for input_file in input_files
+        }
+        for future in as_completed(futures):
+            result: BatchResult
+            try:
+                result = future.result()
+            except Exception as e:
+                # e.g. a BrokenProcessPool after a worker was killed
+                result = {
+                    "input": futures[future],
+                    "scenecuts": None,
+                    "events": None,
+                    "elapsed": time.perf_counter() - start,
+                    "error": str(e) or type(e).__name__,
+                    "stats": RunStats().to_dict(),
+                }
+            yield result
@@ -0,0 +1,290 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from typing import Any, Optional
+
+from ._detectors import DetectorEvent
+from ._smartcut import KeyframeIndex
+from ._timeline import ScoreTimeline
+
+logger = logging.getLogger("scenecut-extractor")
+
+
+class ScoreCache:
+    """
+    On-disk cache of per-frame scene scores, detector events and keyframe indexes.
+
+    Entries are keyed by the input path, size and modification time (and
+    optionally a hash of the file contents), as well as the analysis parameters.
+    When the total size of the cache exceeds `max_size`, the least recently used
+    entries are evicted.
+    """
+
+    DEFAULT_MAX_SIZE: int = 512 * 1024 * 1024
+    CACHE_VERSION: int = 2
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        max_size: int = DEFAULT_MAX_SIZE,
+        hash_content: bool = False,
+    ) -> None:
+        """
+        Create a new ScoreCache instance.
+
+        Args:
+            cache_dir (str, optional): Cache directory. Defaults to the user cache directory.
+            max_size (int, optional): Maximum total size of the cache in bytes. Defaults to 512 MiB.
+            hash_content (bool, optional): Also key entries on a hash of the file contents. Defaults to False.
+        """
+        self.cache_dir = cache_dir or ScoreCache.default_cache_dir()
+        self.max_size = max_size
+        self.hash_content = hash_content
+
+    @staticmethod
+    def default_cache_dir() -> str:
+        """
+        Get the default cache directory.
+
+        Returns:
+            str: the platform-specific user cache directory
+        """
+        base = (
+            os.environ.get("XDG_CACHE_HOME")
+            or os.environ.get("LOCALAPPDATA")
+            or os.path.join(os.path.expanduser("~"), ".cache")
+        )
+        return os.path.join(base, "scenecut-extractor")
+
+    @staticmethod
+    def hash_file(input_file: str, chunk_size: int = 1024 * 1024) -> str:
+        """
+        Hash the contents of a file.
+
+        Args:
+            input_file (str): the file to hash
+            chunk_size (int, optional): Read size in bytes. Defaults to 1 MiB.
+
+        Returns:
+            str: the hex digest
+        """
+        h = hashlib.blake2b(digest_size=16)
+        with open(input_file, "rb") as f:
+            while chunk := f.read(chunk_size):
+                h.update(chunk)
+        return h.hexdigest()
+
+    def make_key(self, input_file: str, params: Optional[dict[str, Any]] = None) -> str:
+        """
+        Compute the cache key for an input file.
+
+        Args:
+            input_file (str): the input file
+            params (dict, optional): Analysis parameters that influence the scores.
+
+        Returns:
+            str: the cache key
+        """
+        stat = os.stat(input_file)
+        key_data: dict[str, Any] = {
+            "path": os.path.abspath(input_file),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "params": params or {},
+        }
+        if self.hash_content:
+            key_data["content_hash"] = ScoreCache.hash_file(input_file)
+
+        return hashlib.sha256(
+            json.dumps(key_data, sort_keys=True).encode("utf-8")
+        ).hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + ".json")
+
+    def _read_entry(self, key: str) -> Optional[dict[str, Any]]:
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, "r") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable cache entry {entry_path}: {e}")
+            return None
+
+        if entry.get("version") != ScoreCache.CACHE_VERSION:
+            return None
+
+        # mark as recently used
+        try:
+            os.utime(entry_path)
+        except OSError:
+            # evicted by another process since it was read, which is still a hit
+            pass
+
+        return entry
+
+    def _write_entry(self, key: str, entry: dict[str, Any]) -> None:
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        # write atomically so that concurrent readers never see partial entries
+        fd, temp_file_name = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump({"version": ScoreCache.CACHE_VERSION, **entry}, f)
+            os.replace(temp_file_name, self._entry_path(key))
+        except Exception as e:
+            if os.path.isfile(temp_file_name):
+                os.remove(temp_file_name)
+            raise e
+
+        self.prune()
+
+    def get(self, key: str) -> Optional[ScoreTimeline]:
+        """
+        Get the per-frame scores for a key.
+
+        Args:
+            key (str): the cache key
+
+        Returns:
+            Optional[ScoreTimeline]: the scores of all frames, or None if not cached
+        """
+        entry = self._read_entry(key)
+        if entry is None or "timeline" not in entry:
+            return None
+
+        return ScoreTimeline.from_dict(entry["timeline"])
+
+    def get_events(self, key: str) -> Optional[dict[str, list[DetectorEvent]]]:
+        """
+        Get the detector events for a key.
+
+        Args:
+            key (str): the cache key
+
+        Returns:
+            Optional[dict[str, list[DetectorEvent]]]: the events of each detector, or None if not cached
+        """
+        entry = self._read_entry(key)
+        if entry is None or "events" not in entry:
+            return None
+
+        return entry["events"]
+
+    def put(
+        self,
+        key: str,
+        timeline: ScoreTimeline,
+        input_file: str = "",
+        events: Optional[dict[str, list[DetectorEvent]]] = None,
+    ) -> None:
+        """
+        Store the per-frame scores for a key, evicting old entries if needed.
+
+        Args:
+            key (str): the cache key
+            timeline (ScoreTimeline): the scores of all frames
+            input_file (str, optional): The input file, stored for reference only.
+            events (dict[str, list[DetectorEvent]], optional): Events of the detectors that ran
+                in the same analysis.
+        """
+        entry: dict[str, Any] = {
+            "input_file": input_file,
+            "timeline": timeline.to_dict(),
+        }
+        if events is not None:
+            entry["events"] = events
+        self._write_entry(key, entry)
+
+    def get_keyframe_index(self, key: str) -> Optional[KeyframeIndex]:
+        """
+        Get the keyframe index for a key.
+
+        Args:
+            key (str): the cache key
+
+        Returns:
+            Optional[KeyframeIndex]: the keyframe index, or None if not cached
+        """
+        entry = self._read_entry(key)
+        if entry is None or "keyframe_index" not in entry:
+            return None
+
+        return KeyframeIndex.from_dict(entry["keyframe_index"])
+
+    def put_keyframe_index(
+        self, key: str, keyframe_index: KeyframeIndex, input_file: str = ""
+    ) -> None:
+        """
+        Store the keyframe index for a key, evicting old entries if needed.
+
+        Args:
+            key (str): the cache key
+            keyframe_index (KeyframeIndex): the keyframe index
+            input_file (str, optional): The input file, stored for reference only.
+        """
+        self._write_entry(
+            key, {"input_file": input_file, "keyframe_index": keyframe_index.to_dict()}
+        )
+
+    def _entries(self) -> list[os.DirEntry]:
+        if not os.path.isdir(self.cache_dir):
+            return []
+        return [
+            e
+            for e in os.scandir(self.cache_dir)
+            if e.is_file() and e.name.endswith(".json")
+        ]
+
+    def size(self) -> int:
+        """
+        Get the total size of the cache.
+
+        Returns:
+            int: the size in bytes
+        """
+        return sum(e.stat().st_size for e in self._entries())
+
+    def prune(self, max_size: Optional[int] = None) -> int:
+        """
+        Evict the least recently used entries until the cache fits into `max_size`.
+
+        Args:
+            max_size (int, optional): Target size in bytes. Defaults to the configured maximum size.
+
+        Returns:
+            int: the number of evicted entries
+        """
+        if max_size is None:
+            max_size = self.max_size
+
+        entries = sorted(
+            ((e.stat().st_mtime, e.stat().st_size, e.path) for e in self._entries()),
+        )
+        total_size = sum(size for _, size, _ in entries)
+
+        evicted = 0
+        for _, size, path in entries:
+            if total_size <= max_size:
+                break
+            logger.debug("Evicting cache entry: " + path)
+            os.remove(path)
+            total_size -= size
+            evicted += 1
+
+        return evicted
+
+    def clear(self) -> int:
+        """
+        Remove all entries from the cache.
+
+        Returns:
+            int: the number of removed entries
+        """
+        return self.prune(max_size=0)
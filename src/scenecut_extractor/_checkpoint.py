@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import time
+from typing import IO, Any, Optional
+
+from ._timeline import ScoreTimeline
+
+logger = logging.getLogger("scenecut-extractor")
+
+
+class Checkpoint:
+    """
+    Append-only file with the scores of the frames analyzed so far.
+
+    The first line identifies the input and the analysis parameters, each further
+    line holds the frames analyzed since the previous one, as JSON written by
+    `ScoreTimeline.to_dict()`. Lines are flushed to disk as they are written, so
+    an interrupted analysis loses at most the frames of the last `interval`
+    seconds, and an incomplete last line (e.g. after a crash) is ignored.
+    """
+
+    VERSION: int = 1
+    DEFAULT_INTERVAL: float = 30.0
+
+    def __init__(
+        self,
+        checkpoint_file: str,
+        input_file: str,
+        params: Optional[dict[str, Any]] = None,
+        interval: float = DEFAULT_INTERVAL,
+    ) -> None:
+        """
+        Create a new Checkpoint instance.
+
+        Args:
+            checkpoint_file (str): the checkpoint file
+            input_file (str): the analyzed input file
+            params (dict, optional): Analysis parameters that influence the scores.
+            interval (float, optional): Minimum time in seconds between writes. Defaults to 30.
+        """
+        self.checkpoint_file = checkpoint_file
+        self.interval = interval
+        stat = os.stat(input_file)
+        self.header: dict[str, Any] = {
+            "version": Checkpoint.VERSION,
+            "path": os.path.abspath(input_file),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "params": params or {},
+        }
+        self._file: Optional[IO[bytes]] = None
+        self._valid_size = 0
+        self._written = 0
+        self._last_write = 0.0
+
+    def load(self) -> ScoreTimeline:
+        """
+        Read the frames stored in the checkpoint file.
+
+        Returns:
+            ScoreTimeline: the stored frames; empty if there is no checkpoint file,
+                or if it belongs to another input or other analysis parameters
+        """
+        timeline = ScoreTimeline()
+        self._valid_size = 0
+        try:
+            f = open(self.checkpoint_file, "rb")
+        except FileNotFoundError:
+            return timeline
+
+        with f:
+            header_line = f.readline()
+            try:
+                header = json.loads(header_line)
+            except ValueError:
+                header = None
+            if header != self.header:
+                logger.warning(
+                    f"Ignoring checkpoint {self.checkpoint_file} of another input or analysis"
+                )
+                return timeline
+
+            size = len(header_line)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    chunk = ScoreTimeline.from_dict(json.loads(line))
+                except (ValueError, KeyError):
+                    break
+                timeline.extend(chunk.frames, chunk.pts, chunk.pts_time, chunk.scores)
+                size += len(line)
+
+        self._valid_size = size
+        self._written = len(timeline)
+        return timeline
+
+    def open(self) -> None:
+        """
+        Open the checkpoint file for writing, continuing after the frames returned by `load()`.
+        """
+        if self._valid_size:
+            self._file = open(self.checkpoint_file, "r+b")
+            # drop an incomplete last line
+            self._file.truncate(self._valid_size)
+            self._file.seek(self._valid_size)
+        else:
+            self._file = open(self.checkpoint_file, "wb")
+            self._file.write(json.dumps(self.header).encode("utf-8") + b"\n")
+            self._written = 0
+        self._last_write = time.monotonic()
+
+    def update(self, timeline: ScoreTimeline, force: bool = False) -> None:
+        """
+        Append the frames added to the timeline since the last write.
+
+        Args:
+            timeline (ScoreTimeline): all frames analyzed so far
+            force (bool, optional): Write even if the interval has not passed yet. Defaults to False.
+        """
+        if self._file is None:
+            return
+        if not force and time.monotonic() - self._last_write < self.interval:
+            return
+
+        if len(timeline) > self._written:
+            data = json.dumps(timeline[self._written :].to_dict())
+            self._file.write(data.encode("utf-8") + b"\n")
+            self._written = len(timeline)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._last_write = time.monotonic()
+
+    def close(self, timeline: Optional[ScoreTimeline] = None) -> None:
+        """
+        Write the remaining frames and close the checkpoint file.
+
+        Args:
+            timeline (ScoreTimeline, optional): all frames analyzed so far
+        """
+        if self._file is None:
+            return
+        if timeline is not None:
+            self.update(timeline, force=True)
+        self._file.close()
+        self._file = None
+
+    def remove(self) -> None:
+        """
+        Close and remove the checkpoint file, e.g. after the analysis has finished.
+        """
+        self.close()
+        if os.path.isfile(self.checkpoint_file):
+            os.remove(self.checkpoint_file)
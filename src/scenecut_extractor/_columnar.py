@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import json
+from typing import IO, TYPE_CHECKING, Any, Optional
+
+from ._table import COLUMNS, ScenecutTable
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+COLUMNAR_FORMATS = ("npz", "arrow", "parquet")
+"""Binary column-oriented output formats"""
+
+METADATA_KEY = "scenecut_extractor"
+"""Key of the JSON-encoded metadata in the output"""
+
+
+def write_npz(
+    scenecuts: ScenecutTable,
+    f: IO[bytes],
+    metadata: dict[str, Any],
+    timeline: Optional[ScenecutTable] = None,
+) -> None:
+    """
+    Write scene cuts as an uncompressed NumPy `.npz` archive.
+
+    The archive holds one array per column (`frame`, `pts`, `pts_time` and
+    `score`), and the metadata as a JSON string in `scenecut_extractor`. With a
+    timeline, the columns hold all frames, and a boolean `cut` array marks the
+    scene cuts. `np.load()` reads each array with a single read, without
+    parsing, and without pickle.
+
+    Args:
+        scenecuts (ScenecutTable): the scene cuts
+        f (IO[bytes]): the binary file object to write to
+        metadata (dict): JSON-compatible metadata
+        timeline (ScenecutTable, optional): Write these frames instead of only the scene cuts
+
+    Raises:
+        ImportError: if NumPy is not installed
+    """
+    try:
+        import numpy as np
+    except ImportError as e:
+        raise ImportError(
+            "The npz format requires NumPy, install scenecut_extractor[numpy]"
+        ) from e
+
+    columns = (timeline if timeline is not None else scenecuts).to_numpy()
+    if timeline is not None:
+        columns["cut"] = np.isin(columns["frame"], scenecuts.to_numpy()["frame"])
+    columns[METADATA_KEY] = np.array(json.dumps(metadata))
+    np.savez(f, allow_pickle=False, **columns)
+
+
+def to_arrow(
+    scenecuts: ScenecutTable,
+    metadata: dict[str, Any],
+    timeline: Optional[ScenecutTable] = None,
+) -> pa.Table:
+    """
+    Get scene cuts as an Arrow table, without copying the columns.
+
+    The table has the same columns as the `.npz` archive of `write_npz()`, and
+    the metadata as a JSON string in the `scenecut_extractor` key of the schema
+    metadata.
+
+    Args:
+        scenecuts (ScenecutTable): the scene cuts
+        metadata (dict): JSON-compatible metadata
+        timeline (ScenecutTable, optional): Include these frames instead of only the scene cuts
+
+    Returns:
+        pa.Table: the table, sharing memory with the scene cuts or timeline
+
+    Raises:
+        ImportError: if pyarrow is not installed
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+    except ImportError as e:
+        raise ImportError(
+            "The arrow and parquet formats require pyarrow, install scenecut_extractor[arrow]"
+        ) from e
+
+    def column(table: ScenecutTable, key: str) -> pa.Array:
+        return pa.Array.from_buffers(
+            pa.int64() if key == "frame" else pa.float64(),
+            len(table),
+            [None, pa.py_buffer(getattr(table, COLUMNS[key]))],
+        )
+
+    table = timeline if timeline is not None else scenecuts
+    columns = {key: column(table, key) for key in COLUMNS}
+    if timeline is not None:
+        columns["cut"] = pc.is_in(  # ty: ignore[unresolved-attribute]
+            columns["frame"], value_set=column(scenecuts, "frame")
+        )
+    return pa.table(columns).replace_schema_metadata(
+        {METADATA_KEY: json.dumps(metadata)}
+    )
+
+
+def write_arrow(
+    scenecuts: ScenecutTable,
+    f: IO[bytes],
+    metadata: dict[str, Any],
+    timeline: Optional[ScenecutTable] = None,
+) -> None:
+    """
+    Write scene cuts as an Arrow IPC file (Feather v2), see `to_arrow()`.
+
+    The file can be memory-mapped and read without copying, e.g. with
+    `pyarrow.ipc.open_file(pyarrow.memory_map(path)).read_all()`.
+
+    Args:
+        scenecuts (ScenecutTable): the scene cuts
+        f (IO[bytes]): the binary file object to write to
+        metadata (dict): JSON-compatible metadata
+        timeline (ScenecutTable, optional): Write these frames instead of only the scene cuts
+
+    Raises:
+        ImportError: if pyarrow is not installed
+    """
+    import pyarrow as pa
+
+    table = to_arrow(scenecuts, metadata, timeline)
+    with pa.ipc.new_file(f, table.schema) as writer:
+        writer.write_table(table)
+
+
+def write_parquet(
+    scenecuts: ScenecutTable,
+    f: IO[bytes],
+    metadata: dict[str, Any],
+    timeline: Optional[ScenecutTable] = None,
+) -> None:
+    """
+    Write scene cuts as a Parquet file, see `to_arrow()`.
+
+    Args:
+        scenecuts (ScenecutTable): the scene cuts
+        f (IO[bytes]): the binary file object to write to
+        metadata (dict): JSON-compatible metadata
+        timeline (ScenecutTable, optional): Write these frames instead of only the scene cuts
+
+    Raises:
+        ImportError: if pyarrow is not installed
+    """
+    table = to_arrow(scenecuts, metadata, timeline)
+
+    import pyarrow.parquet as pq
+
+    pq.write_table(table, f)
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+from typing import Any, Iterable, Mapping, Optional, TypedDict, Union
+
+
+class DetectorEvent(TypedDict):
+    start: float
+    """The start time in seconds"""
+    end: float
+    """The end time in seconds"""
+    duration: float
+    """The duration in seconds"""
+
+
+class DetectorSpec(TypedDict):
+    filter: str
+    """The ffmpeg filter"""
+    start_key: str
+    """The frame metadata key (without `lavfi.`) set on the first frame of an event"""
+    end_key: str
+    """The frame metadata key (without `lavfi.`) set on the frame after an event"""
+    duration_options: tuple[str, ...]
+    """The names of the filter option for the minimum duration of an event"""
+
+
+DETECTORS: dict[str, DetectorSpec] = {
+    "black": {
+        "filter": "blackdetect",
+        "start_key": "black_start",
+        "end_key": "black_end",
+        "duration_options": ("d", "black_min_duration"),
+    },
+    "freeze": {
+        "filter": "freezedetect",
+        "start_key": "freezedetect.freeze_start",
+        "end_key": "freezedetect.freeze_end",
+        "duration_options": ("d", "duration"),
+    },
+}
+"""Detectors that can run in the same pass as the scene score"""
+
+# the default minimum duration of both filters
+DEFAULT_MIN_DURATION = 2.0
+
+DetectorOptions = dict[str, dict[str, Any]]
+"""Enabled detectors, with the options of their ffmpeg filter"""
+
+
+def resolve_detectors(
+    detectors: Union[Iterable[str], Mapping[str, Mapping[str, Any]], None],
+) -> DetectorOptions:
+    """
+    Validate the detectors to run.
+
+    Args:
+        detectors (Union[Iterable[str], Mapping[str, Mapping[str, Any]], None]): the detector names
+            (see `DETECTORS`), or a mapping of names to options of their ffmpeg filter,
+            e.g. `{"black": {"d": 0.5, "pix_th": 0.1}}`
+
+    Returns:
+        DetectorOptions: the detectors and their options
+
+    Raises:
+        ValueError: if a detector does not exist
+    """
+    if detectors is None:
+        return {}
+    if not isinstance(detectors, Mapping):
+        detectors = {name: {} for name in detectors}
+
+    for name in detectors:
+        if name not in DETECTORS:
+            raise ValueError(
+                f"No such detector: {name}, must be one of {', '.join(DETECTORS)}"
+            )
+    return {name: dict(options) for name, options in detectors.items()}
+
+
+def get_detector_filters(detectors: DetectorOptions) -> list[str]:
+    """
+    Get the ffmpeg filters that implement the detectors.
+
+    The filters only attach metadata to the frames, so they can be chained with
+    the scene score filter and share its decode.
+
+    Args:
+        detectors (DetectorOptions): the detectors and their options
+
+    Returns:
+        list[str]: the filters, to be joined with commas
+    """
+    filters = []
+    for name, options in detectors.items():
+        f = DETECTORS[name]["filter"]
+        if options:
+            f += "=" + ":".join(f"{key}={value}" for key, value in options.items())
+        filters.append(f)
+    return filters
+
+
+def parse_detector_events(
+    detectors: DetectorOptions,
+    metadata: Iterable[tuple[str, str]],
+    end_time: Optional[float] = None,
+) -> dict[str, list[DetectorEvent]]:
+    """
+    Get the events of the detectors from the metadata printed by ffmpeg.
+
+    Args:
+        detectors (DetectorOptions): the detectors and their options
+        metadata (Iterable[tuple[str, str]]): metadata keys (without `lavfi.`) and values, in order
+        end_time (float, optional): Time of the last frame, to end events that are still
+            ongoing at the end of the input. Such events are dropped if not given.
+
+    Returns:
+        dict[str, list[DetectorEvent]]: the events of each detector, in order
+    """
+    starts: dict[str, Optional[float]] = {name: None for name in detectors}
+    events: dict[str, list[DetectorEvent]] = {name: [] for name in detectors}
+    keys = {}
+    for name in detectors:
+        keys[DETECTORS[name]["start_key"]] = (name, True)
+        keys[DETECTORS[name]["end_key"]] = (name, False)
+
+    def add_event(name: str, start: float, end: float) -> None:
+        options = detectors[name]
+        min_duration = next(
+            (
+                float(options[o])
+                for o in DETECTORS[name]["duration_options"]
+                if o in options
+            ),
+            DEFAULT_MIN_DURATION,
+        )
+        # blackdetect marks every black frame sequence, regardless of its duration
+        if end - start >= min_duration:
+            events[name].append(
+                {"start": start, "end": end, "duration": round(end - start, 6)}
+            )
+
+    for key, value in metadata:
+        if key not in keys:
+            continue
+        name, is_start = keys[key]
+        if is_start:
+            starts[name] = float(value)
+        elif (start := starts[name]) is not None:
+            add_event(name, start, float(value))
+            starts[name] = None
+
+    if end_time is not None:
+        for name, start in starts.items():
+            if start is not None:
+                add_event(name, start, end_time)
+
+    return events
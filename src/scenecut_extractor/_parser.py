@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import re
+from array import array
+from typing import Iterable, Iterator, Optional, Union
+
+from ._timeline import ScoreTimeline
+
+# any number of frames in exactly the format printed by ffmpeg
+FRAMES_REGEX = re.compile(
+    rb"(?:frame:[0-9]+ +pts:[0-9\.]+ +pts_time:[0-9\.]+\r?\n"
+    rb"lavfi\.scene_score=[0-9\.]+\r?\n)*"
+)
+# metadata lines of other filters than the scene score, e.g. of detectors
+OTHER_METADATA_REGEX = re.compile(
+    rb"^lavfi\.(?!scene_score=)([^=\r\n]*)=([^\r\n]*)\r?\n", re.MULTILINE
+)
+# keeps digits and dots, turns everything else into whitespace
+NUMBERS_TABLE = bytes(c if chr(c) in "0123456789." else ord(" ") for c in range(256))
+
+
+def parse_metadata_lines(
+    lines: Iterable[str],
+) -> Iterator[tuple[int, float, float, float]]:
+    """
+    Parse the output of ffmpeg's `metadata=print` filter.
+
+    Args:
+        lines (Iterable[str]): the lines printed by ffmpeg
+
+    Yields:
+        tuple[int, float, float, float]: frame number, pts, pts_time and score of each frame
+
+    Raises:
+        RuntimeError: if a line is wrongly formatted
+    """
+    frame = 0
+    pts = pts_time = 0.0
+    for line in lines:
+        line = line.strip()
+        if line.startswith("frame"):
+            if ret := re.match(
+                r"frame:(?P<frame>\d+)\s+pts:(?P<pts>[\d\.]+)\s+pts_time:(?P<pts_time>[\d\.]+)",
+                line,
+            ):
+                ret_matches = ret.groupdict()
+                frame = int(ret_matches["frame"])
+                pts = float(ret_matches["pts"])
+                pts_time = float(ret_matches["pts_time"])
+            else:
+                raise RuntimeError("Wrongly formatted line: " + line)
+            continue
+
+        if line.startswith("lavfi.scene_score") and (splits := line.split("=")):
+            if len(splits):
+                yield frame, pts, pts_time, float(splits[1])
+            else:
+                raise RuntimeError("Wrongly formatted line: " + line)
+
+
+class MetadataParser:
+    """
+    Bulk parser for the output of ffmpeg's `metadata=print` filter.
+
+    Data can be fed in chunks of any size. Each chunk is validated with a single
+    regular expression and then split into its numbers in bulk, which are stored
+    in typed arrays, without matching or allocating objects per line or per frame.
+    If a chunk contains anything but well-formed frames, it is parsed line by line
+    with `parse_metadata_lines()` instead, which gives the same results and errors.
+    Metadata of other filters (e.g. detectors), which is usually only attached to
+    a few frames, is removed before parsing and optionally collected.
+    """
+
+    def __init__(
+        self,
+        timeline: Optional[ScoreTimeline] = None,
+        frame_step: int = 1,
+        metadata: Optional[list[tuple[str, str]]] = None,
+    ) -> None:
+        """
+        Create a new MetadataParser instance.
+
+        Args:
+            timeline (ScoreTimeline, optional): Timeline to append the frames to. Defaults to a new one.
+            frame_step (int, optional): Multiply frame numbers by this factor, if only every n-th frame
+                was analyzed. Defaults to 1.
+            metadata (list[tuple[str, str]], optional): List to append the keys (without `lavfi.`)
+                and values of other metadata to. Defaults to None (discard it).
+        """
+        self.timeline = timeline if timeline is not None else ScoreTimeline()
+        self.frame_step = frame_step
+        self.metadata = metadata
+        self._pending = b""
+
+    def feed(self, data: Union[bytes, str]) -> int:
+        """
+        Parse a chunk of the output, keeping incomplete frames for the next call.
+
+        Args:
+            data (Union[bytes, str]): the next chunk of the output
+
+        Returns:
+            int: the number of frames added to the timeline
+
+        Raises:
+            RuntimeError: if a line is wrongly formatted
+        """
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        data = self._pending + data
+
+        # the last frame may not be complete yet
+        split = data.rfind(b"\nframe")
+        if split < 0:
+            self._pending = data
+            return 0
+        self._pending = data[split + 1 :]
+        return self._parse(data[: split + 1])
+
+    def close(self) -> int:
+        """
+        Parse the remaining output after the last chunk.
+
+        Returns:
+            int: the number of frames added to the timeline
+
+        Raises:
+            RuntimeError: if a line is wrongly formatted
+        """
+        data = self._pending
+        self._pending = b""
+        if data and not data.endswith(b"\n"):
+            data += b"\n"
+        return self._parse(data)
+
+    def _parse(self, data: bytes) -> int:
+        if data.count(b"\nlavfi.") != data.count(b"\nlavfi.scene_score="):
+            if self.metadata is not None:
+                self.metadata.extend(
+                    (key.decode("utf-8"), value.decode("utf-8"))
+                    for key, value in OTHER_METADATA_REGEX.findall(data)
+                )
+            data = OTHER_METADATA_REGEX.sub(b"", data)
+
+        if not FRAMES_REGEX.fullmatch(data):
+            # unusual or malformed output; parse line by line for exact results and errors
+            lines = data.decode("utf-8", errors="replace").splitlines()
+            rows = list(parse_metadata_lines(lines))
+            for frame, pts, pts_time, score in rows:
+                self.timeline.append(frame * self.frame_step, pts, pts_time, score)
+            return len(rows)
+
+        # per frame: frame number, pts, pts_time, the dot of "lavfi.", and score
+        values = data.translate(NUMBERS_TABLE).split()
+        frames = array("q", map(int, values[0::5]))
+        if self.frame_step != 1:
+            frames = array("q", [f * self.frame_step for f in frames])
+        self.timeline.extend(
+            frames,
+            array("d", map(float, values[1::5])),
+            array("d", map(float, values[2::5])),
+            array("d", map(float, values[4::5])),
+        )
+        return len(frames)
+
+
+def parse_metadata_file(
+    metadata_file: str,
+    frame_step: int = 1,
+    chunk_size: int = 1024 * 1024,
+    metadata: Optional[list[tuple[str, str]]] = None,
+) -> ScoreTimeline:
+    """
+    Parse a file written by ffmpeg's `metadata=print` filter.
+
+    Args:
+        metadata_file (str): the file
+        frame_step (int, optional): Multiply frame numbers by this factor. Defaults to 1.
+        chunk_size (int, optional): Read size in bytes. Defaults to 1 MiB.
+        metadata (list[tuple[str, str]], optional): List to append other metadata to, see `MetadataParser`.
+
+    Returns:
+        ScoreTimeline: the scores of all frames
+
+    Raises:
+        RuntimeError: if a line is wrongly formatted
+    """
+    parser = MetadataParser(frame_step=frame_step, metadata=metadata)
+    with open(metadata_file, "rb") as f:
+        while chunk := f.read(chunk_size):
+            parser.feed(chunk)
+    parser.close()
+    return parser.timeline
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from typing import Optional, TypedDict
+
+
+class PostProcessing(TypedDict, total=False):
+    """
+    Rules applied to the frames whose score is at or above the threshold, to
+    suppress false cuts, e.g. in bursts of fast motion.
+
+    All keys are optional; an empty dict keeps all frames above the threshold.
+    """
+
+    adaptive_window: float
+    """Length in seconds of the window around each frame for the adaptive threshold; 0 disables it"""
+    adaptive_k: float
+    """With an adaptive window, a cut must exceed the mean score of the other frames
+    in the window by this many standard deviations"""
+    nms_window: float
+    """Only keep cuts whose score is the highest of all cuts within this many seconds
+    before and after them (non-maximum suppression); 0 disables it"""
+
+
+DEFAULT_ADAPTIVE_K = 2.0
+
+
+def resolve_postprocessing(
+    postprocessing: Optional[PostProcessing],
+) -> PostProcessing:
+    """
+    Validate post-processing rules.
+
+    Args:
+        postprocessing (PostProcessing, optional): the rules
+
+    Returns:
+        PostProcessing: the rules, with the defaults filled in
+
+    Raises:
+        ValueError: if a rule is invalid
+    """
+    if not postprocessing:
+        return {}
+
+    for key in ("adaptive_window", "adaptive_k", "nms_window"):
+        if postprocessing.get(key, 0) < 0:
+            raise ValueError(f"{key} must not be negative")
+
+    resolved: PostProcessing = {
+        "adaptive_window": 0,
+        "adaptive_k": DEFAULT_ADAPTIVE_K,
+        "nms_window": 0,
+    }
+    resolved.update(postprocessing)
+    return resolved
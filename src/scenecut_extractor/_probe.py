@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import logging
+import re
+import subprocess
+from typing import Optional, TypedDict
+
+logger = logging.getLogger("scenecut-extractor")
+
+DURATION_REGEX = re.compile(
+    r"Duration: (?P<hour>\d+):(?P<min>\d{2}):(?P<sec>\d{2}(?:\.\d+)?)"
+)
+VIDEO_STREAM_REGEX = re.compile(r"Stream #\d+:\d+.*?: Video: (?P<info>.*)")
+FPS_REGEX = re.compile(r"(?P<fps>[\d\.]+k?) (?:fps|tbr)")
+
+
+class ProbeInfo(TypedDict):
+    duration: Optional[float]
+    """The duration of the input in seconds, if known"""
+    fps: Optional[float]
+    """The frame rate of the first video stream, if known"""
+
+
+def _parse_rate(rate: str) -> float:
+    if rate.endswith("k"):
+        return float(rate[:-1]) * 1000
+    return float(rate)
+
+
+def probe_input(input_file: str, ffmpeg_path: str = "ffmpeg") -> ProbeInfo:
+    """
+    Get basic information about an input file from the ffmpeg banner.
+
+    This only requires ffmpeg, not ffprobe.
+
+    Args:
+        input_file (str): the input file
+        ffmpeg_path (str, optional): Path to ffmpeg executable. Defaults to "ffmpeg".
+
+    Returns:
+        ProbeInfo: the input information
+    """
+    cmd = [ffmpeg_path, "-nostdin", "-hide_banner", "-i", input_file]
+    # ffmpeg exits with an error because no output is given; we only need the banner
+    stderr = subprocess.run(
+        cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=False
+    ).stderr.decode("utf-8", errors="replace")
+
+    info: ProbeInfo = {"duration": None, "fps": None}
+
+    if match := DURATION_REGEX.search(stderr):
+        info["duration"] = (
+            int(match.group("hour")) * 3600
+            + int(match.group("min")) * 60
+            + float(match.group("sec"))
+        )
+
+    if (match := VIDEO_STREAM_REGEX.search(stderr)) and (
+        fps_match := FPS_REGEX.search(match.group("info"))
+    ):
+        info["fps"] = _parse_rate(fps_match.group("fps"))
+
+    logger.debug(f"Probed {input_file}: {info}")
+
+    return info
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+from typing import Optional, TypedDict, Union
+
+
+class AnalysisProfile(TypedDict, total=False):
+    """
+    Preprocessing applied to the frames before the scene score is calculated.
+
+    All keys are optional; an empty profile analyzes the full-resolution frames.
+    """
+
+    width: int
+    """Downscale the frames to this width, keeping the aspect ratio"""
+    gray: bool
+    """Convert the frames to 8-bit grayscale"""
+    frame_step: int
+    """Only score every n-th frame"""
+    crop: str
+    """Only score a region of the frames, in the syntax of ffmpeg's crop filter (`w:h:x:y`)"""
+
+
+ANALYSIS_PROFILES: dict[str, AnalysisProfile] = {
+    "full": {},
+    "fast": {"width": 640, "gray": True},
+    "fastest": {"width": 320, "gray": True, "frame_step": 2},
+}
+"""Predefined analysis profiles"""
+
+
+def resolve_profile(
+    profile: Union[str, AnalysisProfile, None],
+) -> AnalysisProfile:
+    """
+    Get an analysis profile by name, or validate a custom one.
+
+    Args:
+        profile (Union[str, AnalysisProfile, None]): the profile name or a custom profile
+
+    Returns:
+        AnalysisProfile: the profile
+
+    Raises:
+        ValueError: if the profile does not exist or is invalid
+    """
+    if profile is None:
+        return {}
+
+    if isinstance(profile, str):
+        if profile not in ANALYSIS_PROFILES:
+            raise ValueError(
+                f"No such analysis profile: {profile}, "
+                f"must be one of {', '.join(ANALYSIS_PROFILES)}"
+            )
+        return ANALYSIS_PROFILES[profile]
+
+    if profile.get("frame_step", 1) < 1:
+        raise ValueError("frame_step must be at least 1")
+    if profile.get("width", 2) < 2:
+        raise ValueError("width must be at least 2")
+
+    return profile
+
+
+def get_profile_filters(profile: AnalysisProfile) -> list[str]:
+    """
+    Get the ffmpeg filters that implement an analysis profile.
+
+    Frames are dropped before any other processing, and the remaining filters
+    do not change the timestamps, so the results can be mapped back to the
+    original timeline.
+
+    Args:
+        profile (AnalysisProfile): the profile
+
+    Returns:
+        list[str]: the filters, to be joined with commas
+    """
+    filters: list[str] = []
+
+    frame_step: Optional[int] = profile.get("frame_step")
+    if frame_step and frame_step > 1:
+        filters.append(f"select=not(mod(n\\,{frame_step}))")
+
+    if crop := profile.get("crop"):
+        filters.append(f"crop={crop}")
+
+    if width := profile.get("width"):
+        # never upscale; interpolation quality does not matter for scoring
+        filters.append(f"scale=w=min(iw\\,{width}):h=-2:flags=fast_bilinear")
+
+    if profile.get("gray"):
+        filters.append("format=gray")
+
+    return filters
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+from typing import IO, TYPE_CHECKING, Iterator, Optional
+
+if TYPE_CHECKING:
+    import numpy as np
+
+    from ._profile import AnalysisProfile
+
+NUMPY_BACKENDS: dict[str, str] = {
+    "numpy-mad": "mad",
+    "numpy-histogram": "histogram",
+}
+"""Backends that score raw frames with NumPy, and their metric"""
+
+BACKENDS = ("ffmpeg", *NUMPY_BACKENDS)
+"""All backends; `ffmpeg` uses the scene score of ffmpeg's `select` filter"""
+
+# frames are scaled to this width by default (and to a 16:9 aspect ratio)
+DEFAULT_WIDTH = 160
+# 8-bit values are shifted right by this, giving 32 histogram bins
+HISTOGRAM_SHIFT = 3
+HISTOGRAM_BINS = 256 >> HISTOGRAM_SHIFT
+
+
+def get_raw_frame_size(profile: Optional[AnalysisProfile] = None) -> tuple[int, int]:
+    """
+    Get the size of the raw frames to score.
+
+    Args:
+        profile (AnalysisProfile, optional): Analysis profile; its width overrides the default.
+
+    Returns:
+        tuple[int, int]: width and height
+    """
+    width = (profile or {}).get("width", DEFAULT_WIDTH)
+    return width, max(2, width * 9 // 16 // 2 * 2)
+
+
+class FrameDifferenceScorer:
+    """
+    Scene scores from the differences of consecutive raw 8-bit grayscale frames.
+
+    Frames are read from a stream into a preallocated buffer, a batch at a time,
+    and all frames of a batch are scored at once. The metric is either the mean
+    absolute difference of the pixels (`mad`) or the difference of the luma
+    histograms (`histogram`), both between 0 and 1. As in ffmpeg's scene score,
+    the score of a frame is the minimum of its difference and the change of the
+    difference from the frame before, which suppresses continuous motion.
+    """
+
+    BATCH_SIZE: int = 128
+
+    def __init__(
+        self, width: int, height: int, metric: str = "mad", batch_size: int = BATCH_SIZE
+    ) -> None:
+        """
+        Create a new FrameDifferenceScorer instance.
+
+        Args:
+            width (int): Frame width
+            height (int): Frame height
+            metric (str, optional): `mad` or `histogram`. Defaults to `mad`.
+            batch_size (int, optional): Number of frames scored at once.
+
+        Raises:
+            ImportError: if NumPy is not installed
+            ValueError: if the metric does not exist
+        """
+        try:
+            import numpy as np
+        except ImportError as e:
+            raise ImportError(
+                "The NumPy backends require NumPy, install scenecut_extractor[numpy]"
+            ) from e
+        if metric not in NUMPY_BACKENDS.values():
+            raise ValueError(
+                f"No such metric: {metric}, must be one of {', '.join(NUMPY_BACKENDS.values())}"
+            )
+
+        self.metric = metric
+        self.frame_size = width * height
+        self.batch_size = batch_size
+        # row 0 holds the last frame of the previous batch
+        self._frames = np.empty((batch_size + 1, self.frame_size), np.uint8)
+        if metric == "mad":
+            self._work = np.empty((batch_size, self.frame_size), np.int16)
+        else:
+            self._work = np.empty((batch_size + 1, self.frame_size), np.intp)
+            self._bin_offsets = (
+                np.arange(batch_size + 1, dtype=np.intp) * HISTOGRAM_BINS
+            )[:, None]
+        self._has_previous = False
+        self._previous_difference = 0.0
+
+    def _read_batch(self, stream: IO[bytes]) -> int:
+        view = self._frames.data.cast("B")[self.frame_size :]
+        size = 0
+        while size < len(view):
+            n = stream.readinto(view[size:])  # ty: ignore[unresolved-attribute]
+            if not n:
+                break
+            size += n
+        return size // self.frame_size
+
+    def _differences(self, n: int) -> np.ndarray:
+        import numpy as np
+
+        frames = self._frames
+        if self.metric == "mad":
+            work = self._work[:n]
+            np.subtract(frames[1 : n + 1], frames[:n], out=work, dtype=np.int16)
+            np.abs(work, out=work)
+            return work.sum(axis=1, dtype=np.int64) / (self.frame_size * 256)
+
+        # one bincount for all frames, with separate bins per frame
+        work = self._work[: n + 1]
+        np.right_shift(frames[: n + 1], HISTOGRAM_SHIFT, out=work)
+        work += self._bin_offsets[: n + 1]
+        histograms = np.bincount(
+            work.ravel(), minlength=(n + 1) * HISTOGRAM_BINS
+        ).reshape(n + 1, HISTOGRAM_BINS)
+        return np.abs(np.diff(histograms, axis=0)).sum(axis=1) / (2 * self.frame_size)
+
+    def iter_scores(self, stream: IO[bytes]) -> Iterator[np.ndarray]:
+        """
+        Read all frames from a stream and yield their scores, a batch at a time.
+
+        Args:
+            stream (IO[bytes]): the raw frames
+
+        Yields:
+            np.ndarray: the scores of the frames of a batch, rounded like ffmpeg's scene scores
+        """
+        import numpy as np
+
+        while n := self._read_batch(stream):
+            differences = self._differences(n)
+            if not self._has_previous:
+                # the first frame has no frame to compare to
+                differences[0] = 0.0
+                self._has_previous = True
+            previous = np.empty_like(differences)
+            previous[0] = self._previous_difference
+            previous[1:] = differences[:-1]
+            self._previous_difference = float(differences[-1])
+
+            scores = np.minimum(differences, np.abs(differences - previous))
+            yield np.clip(scores, 0, 1).round(6)
+
+            self._frames[0] = self._frames[n]
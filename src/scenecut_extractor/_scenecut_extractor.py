@@ -1,18 +1,86 @@
 from __future__ import annotations
 
-import json
+import csv
+import importlib.metadata
+import io
 import logging
 import os
-import posixpath
-import re
 import shlex
+import shutil
+import subprocess
 import tempfile
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from platform import system
-from typing import Literal, Optional, TypedDict, Union, cast
+from typing import (
+    IO,
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Generator,
+    Iterable,
+    Iterator,
+    Literal,
+    Mapping,
+    Optional,
+    TypedDict,
+    Union,
+)
 
 from ffmpeg_progress_yield import FfmpegProgress
 from tqdm import tqdm
 
+from ._checkpoint import Checkpoint
+from ._columnar import write_arrow, write_npz, write_parquet
+from ._detectors import (
+    DetectorEvent,
+    DetectorOptions,
+    get_detector_filters,
+    parse_detector_events,
+    resolve_detectors,
+)
+from ._parser import MetadataParser, parse_metadata_file
+from ._postprocess import PostProcessing, resolve_postprocessing
+from ._probe import probe_input
+from ._profile import AnalysisProfile, get_profile_filters, resolve_profile
+from ._rawvideo import (
+    BACKENDS,
+    NUMPY_BACKENDS,
+    FrameDifferenceScorer,
+    get_raw_frame_size,
+)
+from ._smartcut import SMART_CUT_ENCODERS, TIME_TOLERANCE, KeyframeIndex
+from ._stats import RunStats, read_process_io_bytes
+from ._table import ScenecutTable
+from ._thumbnails import (
+    THUMBNAIL_FORMATS,
+    ThumbnailOptions,
+    get_frame_select_expr,
+    get_thumbnail_filters,
+    resolve_thumbnail_options,
+)
+from ._timeline import ScoreTimeline
+from ._twopass import (
+    CONTEXT_FRAMES,
+    TwoPassOptions,
+    get_candidate_windows,
+    get_coarse_input_args,
+    get_coarse_profile,
+    get_differences,
+    merge_refined,
+    renumber_frames,
+    resolve_two_pass,
+)
+from ._writers import write_csv, write_json, write_ndjson
+
+if TYPE_CHECKING:
+    from ._batch import BatchResult
+    from ._cache import ScoreCache
+
 IS_WIN = system() in ["Windows", "cli"]
 
 logger = logging.getLogger("scenecut-extractor")
@@ -49,7 +117,7 @@ def escape_path_for_ffmpeg_filters(path: str) -> str:
 class ScenecutInfo(TypedDict):
     frame: int
     """The frame number"""
-    pts: int
+    pts: float
     """The PTS of the frame"""
     pts_time: float
     """The PTS in wall clock time of the frame"""
@@ -59,18 +127,78 @@ class ScenecutInfo(TypedDict):
 
 class ScenecutExtractor:
     DEFAULT_THRESHOLD: float = 0.3
+    SCORE_FILTER: str = r"select=gte(scene\,0)"
+    DIFFERENCE_FILTER: str = "scdet=threshold=0"
+    MIN_SEGMENT_DURATION: float = 5.0
+    READ_SIZE: int = 1024 * 1024
+    DEFAULT_IDLE_TIMEOUT: float = 10.0
+    STDERR_LINES: int = 100
+    # Linux limits a single command line argument to 128 KiB
+    MAX_ARGUMENT_LENGTH: int = 100_000
+    SEGMENT_LIST: str = "segments.csv"
 
-    def __init__(self, input_file: str, ffmpeg_path: str = "ffmpeg") -> None:
+    def __init__(
+        self,
+        input_file: str,
+        ffmpeg_path: str = "ffmpeg",
+        cache: Optional[ScoreCache] = None,
+    ) -> None:
         """
         Create a new ScenecutExtractor instance.
 
         Args:
             input_file (str): the input file
             ffmpeg_path (str, optional): Path to ffmpeg executable. Defaults to "ffmpeg".
+            cache (ScoreCache, optional): Cache for per-frame scores. Defaults to None (no caching).
         """
-        self.scenecuts: Optional[list[ScenecutInfo]] = None
+        self.scenecuts: Optional[ScenecutTable] = None
+        self.timeline: Optional[ScoreTimeline] = None
+        self.keyframe_index: Optional[KeyframeIndex] = None
+        self.events: Optional[dict[str, list[DetectorEvent]]] = None
+        self.selection: Optional[dict[str, Any]] = None
+        """How the current scene cuts were selected from the scores"""
+        self.time_range: Optional[tuple[float, Optional[float]]] = None
+        """Start and end (if any) of the analyzed time range, or None for the whole input"""
+        self.stream: Optional[int] = None
+        """Index of the analyzed video stream, or None for the one that ffmpeg selects"""
         self.input_file = input_file
         self.ffmpeg_path = ffmpeg_path
+        self.cache = cache
+        self.stats = RunStats()
+        """Timing and resource usage of all runs"""
+
+    @staticmethod
+    def batch(
+        input_files: Iterable[str],
+        workers: int = 1,
+        ffmpeg_path: str = "ffmpeg",
+        cache: Optional[ScoreCache] = None,
+        **calculate_args: Any,
+    ) -> Iterator[BatchResult]:
+        """
+        Calculate the scene cuts of many files with a pool of worker processes.
+
+        A failing file does not abort the batch; its error is reported in the result instead.
+
+        Args:
+            input_files (Iterable[str]): the input files
+            workers (int, optional): Number of files to process in parallel. Defaults to 1.
+            ffmpeg_path (str, optional): Path to ffmpeg executable. Defaults to "ffmpeg".
+            cache (ScoreCache, optional): Cache for per-frame scores.
+            **calculate_args: Arguments for `calculate_scenecuts()`, e.g. `threshold`.
+
+        Yields:
+            BatchResult: the result for each file, in order of completion
+        """
+        from ._batch import run_batch
+
+        yield from run_batch(
+            input_files,
+            workers=workers,
+            ffmpeg_path=ffmpeg_path,
+            cache=cache,
+            calculate_args=calculate_args,
+        )
 
     def get_as_csv(self) -> str:
         """
@@ -82,18 +210,9 @@ class ScenecutExtractor:
         Raises:
             RuntimeError: if no scene cuts have been calculated yet
         """
-        if self.scenecuts is None:
-            raise RuntimeError("No scene cuts calculated yet")
-
-        if not self.scenecuts:
-            return ""
-
-        ret = ",".join(self.scenecuts[0].keys()) + "\n"
-        ret += "\n".join(
-            [",".join([str(r) for r in row.values()]) for row in self.scenecuts]
-        )
-
-        return ret
+        output = io.StringIO()
+        self.write_as_csv(output)
+        return output.getvalue()
 
     def get_as_json(self) -> str:
         """
@@ -105,18 +224,176 @@ class ScenecutExtractor:
         Raises:
             RuntimeError: if no scene cuts have been calculated yet
         """
-        if self.scenecuts is None:
-            raise RuntimeError("No scene cuts calculated yet")
+        output = io.StringIO()
+        self.write_as_json(output)
+        return output.getvalue()
+
+    def get_as_ndjson(self) -> str:
+        """
+        Return the scene cuts as JSON Lines (NDJSON), one object per line.
+
+        Returns:
+            str: the scene cuts as JSON Lines
+
+        Raises:
+            RuntimeError: if no scene cuts have been calculated yet
+        """
+        output = io.StringIO()
+        self.write_as_ndjson(output)
+        return output.getvalue()
+
+    def write_as_csv(self, f: IO[str]) -> None:
+        """
+        Write the scene cuts as CSV to a file object, without building the whole output in memory.
+
+        The output is identical to `get_as_csv()`.
+
+        Args:
+            f (IO[str]): the file object, e.g. `sys.stdout`
+
+        Raises:
+            RuntimeError: if no scene cuts have been calculated yet
+        """
+        with self.stats.stage("serialize"):
+            write_csv(self.get_scenecut_table(), f)
+
+    def write_as_json(self, f: IO[str]) -> None:
+        """
+        Write the scene cuts as JSON to a file object, without building the whole output in memory.
+
+        The output is identical to `get_as_json()`.
+
+        Args:
+            f (IO[str]): the file object, e.g. `sys.stdout`
+
+        Raises:
+            RuntimeError: if no scene cuts have been calculated yet
+        """
+        with self.stats.stage("serialize"):
+            write_json(self.get_scenecut_table(), f)
+
+    def write_as_ndjson(self, f: IO[str]) -> None:
+        """
+        Write the scene cuts as JSON Lines (NDJSON) to a file object, one object per line.
+
+        Args:
+            f (IO[str]): the file object, e.g. `sys.stdout`
+
+        Raises:
+            RuntimeError: if no scene cuts have been calculated yet
+        """
+        with self.stats.stage("serialize"):
+            write_ndjson(self.get_scenecut_table(), f)
+
+    def write_as_npz(self, f: IO[bytes], timeline: bool = False) -> None:
+        """
+        Write the scene cuts as an uncompressed NumPy `.npz` archive, one array per column.
+
+        Requires NumPy to be installed. See `write_npz()` for the layout, and
+        `get_metadata()` for the metadata that is included.
+
+        Args:
+            f (IO[bytes]): the binary file object, e.g. `sys.stdout.buffer`
+            timeline (bool, optional): Write all analyzed frames, with a boolean `cut` column
+
+        Raises:
+            RuntimeError: if no scene cuts have been calculated yet
+            ImportError: if NumPy is not installed
+        """
+        with self.stats.stage("serialize"):
+            write_npz(
+                self.get_scenecut_table(),
+                f,
+                self.get_metadata(),
+                self.get_timeline() if timeline else None,
+            )
+
+    def write_as_arrow(self, f: IO[bytes], timeline: bool = False) -> None:
+        """
+        Write the scene cuts as an Arrow IPC file, which can be memory-mapped without copying.
+
+        Requires pyarrow to be installed. The columns are the same as with `write_as_npz()`.
+
+        Args:
+            f (IO[bytes]): the binary file object, e.g. `sys.stdout.buffer`
+            timeline (bool, optional): Write all analyzed frames, with a boolean `cut` column
+
+        Raises:
+            RuntimeError: if no scene cuts have been calculated yet
+            ImportError: if pyarrow is not installed
+        """
+        with self.stats.stage("serialize"):
+            write_arrow(
+                self.get_scenecut_table(),
+                f,
+                self.get_metadata(),
+                self.get_timeline() if timeline else None,
+            )
 
-        return json.dumps(self.scenecuts, indent=2)
+    def write_as_parquet(self, f: IO[bytes], timeline: bool = False) -> None:
+        """
+        Write the scene cuts as a Parquet file.
+
+        Requires pyarrow to be installed. The columns are the same as with `write_as_npz()`.
+
+        Args:
+            f (IO[bytes]): the binary file object, e.g. `sys.stdout.buffer`
+            timeline (bool, optional): Write all analyzed frames, with a boolean `cut` column
+
+        Raises:
+            RuntimeError: if no scene cuts have been calculated yet
+            ImportError: if pyarrow is not installed
+        """
+        with self.stats.stage("serialize"):
+            write_parquet(
+                self.get_scenecut_table(),
+                f,
+                self.get_metadata(),
+                self.get_timeline() if timeline else None,
+            )
+
+    def get_metadata(self) -> dict[str, Any]:
+        """
+        Get information about the analysis, as included in the columnar output formats.
+
+        Returns:
+            dict: the `input` file, the `version` of scenecut_extractor, the number of
+                analyzed `frames`, and how the scene cuts were selected (`threshold` or
+                `top_k`, `min_scene_length` and `postprocessing`)
+
+        Raises:
+            RuntimeError: if no scene cuts have been calculated yet
+        """
+        self.get_scenecut_table()
+        return {
+            "input": self.input_file,
+            "version": importlib.metadata.version("scenecut_extractor"),
+            "frames": len(self.timeline) if self.timeline is not None else None,
+            **(self.selection or {}),
+        }
 
     def get_scenecuts(self) -> list[ScenecutInfo]:
         """
-        Get the scene cuts.
+        Get the scene cuts as a list of dicts.
+
+        The list is created on each call; for many scene cuts, use the more
+        compact `get_scenecut_table()` instead.
 
         Returns:
             list[ScenecutInfo]: the scene cuts
 
+        Raises:
+            RuntimeError: if no scene cuts have been calculated yet
+        """
+        return self.get_scenecut_table().to_list()
+
+    def get_scenecut_table(self) -> ScenecutTable:
+        """
+        Get the scene cuts as a columnar table.
+
+        Returns:
+            ScenecutTable: the scene cuts
+
         Raises:
             RuntimeError: if no scene cuts have been calculated yet
         """
@@ -126,184 +403,2328 @@ class ScenecutExtractor:
         return self.scenecuts
 
     def calculate_scenecuts(
-        self, threshold: float = DEFAULT_THRESHOLD, progress: bool = False
+        self,
+        threshold: float = DEFAULT_THRESHOLD,
+        progress: bool = False,
+        min_scene_length: float = 0,
+        workers: int = 1,
+        profile: Union[str, AnalysisProfile, None] = None,
+        checkpoint_file: Optional[str] = None,
+        checkpoint_interval: float = Checkpoint.DEFAULT_INTERVAL,
+        detectors: Union[Iterable[str], Mapping[str, Mapping[str, Any]], None] = None,
+        backend: str = "ffmpeg",
+        postprocessing: Optional[PostProcessing] = None,
+        thumbnails: Optional[ThumbnailOptions] = None,
+        two_pass: Optional[TwoPassOptions] = None,
+        start: float = 0,
+        end: Optional[float] = None,
+        stream: Optional[int] = None,
     ) -> None:
         """
         Calculate scene cuts with ffmpeg.
 
+        The scores of all frames are kept, so that the cuts can be re-calculated
+        with `rethreshold()` or `top_k()` without running ffmpeg again.
+
+        With a checkpoint file, the scores analyzed so far are saved periodically
+        and when the analysis is interrupted. If the file exists, the analysis
+        resumes after the last saved frame, with the same results as an
+        uninterrupted run. The file is removed when the analysis has finished.
+
+        Detectors (see `DETECTORS`) run in the same ffmpeg process as the scene
+        score, so the input is only decoded once. Their events are available
+        with `get_events()`.
+
+        The `numpy-mad` and `numpy-histogram` backends score small grayscale
+        frames piped from ffmpeg with NumPy instead of using ffmpeg's scene score.
+        They require NumPy to be installed.
+
+        A two-pass analysis first scores a cheap subset of the frames, and then
+        only analyzes the frames around candidate cuts, which is faster if cuts are
+        sparse. Cuts that the first pass misses are not found; the scores outside
+        of the candidate windows are those of the first pass, so `rethreshold()`
+        below the candidate threshold is not meaningful.
+
+        With a `start` or `end` time, ffmpeg seeks to a few frames before the start
+        (so that the first frame is scored against its predecessors) and stops
+        decoding at the end, so only the time range is decoded. The pts and pts_time
+        values stay in the time of the input file, while frame numbers count from the
+        first frame of the range.
+
         Args:
             threshold (float): Threshold (between 0 and 1)
             progress (bool): Show a progress bar on stderr
+            min_scene_length (float): Minimum scene length in seconds
+            workers (int): Number of ffmpeg processes analyzing separate time ranges in parallel
+            profile (Union[str, AnalysisProfile, None]): Analysis profile name (see `ANALYSIS_PROFILES`)
+                or custom profile to reduce the cost of scoring. Defaults to full-resolution analysis.
+            checkpoint_file (str, optional): Save progress to this file, and resume from it if it exists
+            checkpoint_interval (float): Minimum time in seconds between checkpoint writes
+            detectors (Union[Iterable[str], Mapping[str, Mapping[str, Any]], None]): Detector names,
+                or a mapping of detector names to options of their ffmpeg filter, e.g. `{"black": {"d": 0.5}}`
+            backend (str): Scoring backend, one of `BACKENDS`
+            postprocessing (PostProcessing, optional): Rules to suppress false cuts, e.g.
+                `{"adaptive_window": 2, "nms_window": 0.5}`
+            thumbnails (ThumbnailOptions, optional): Also write an image of the first frame of each scene,
+                in the same ffmpeg process; see `extract_thumbnails()`. If that is not possible (with other
+                positions, a NumPy backend, an analysis profile that changes the frames, or cached scores),
+                the images are written in a separate pass after the analysis.
+            two_pass (TwoPassOptions, optional): Analyze in two passes, e.g. `{"coarse": "keyframes"}`;
+                candidate windows are analyzed by up to `workers` ffmpeg processes in parallel.
+                Requires the ffmpeg backend, and no detectors or frame decimation.
+            start (float): Only analyze the frames from this time in seconds on
+            end (float, optional): Only analyze the frames before this time in seconds
+            stream (int, optional): Index of the video stream to analyze, e.g. 1 for the second video
+                stream. Defaults to the video stream that ffmpeg selects.
+
+        Raises:
+            ValueError: if the backend does not exist, a post-processing rule, a thumbnail option,
+                a two-pass option, the time range or the stream is invalid, or two passes, a time range
+                or a stream are combined with an unsupported option
         """
         if not (0 <= threshold <= 1):
             raise RuntimeError("Threshold must be between 0 and 1")
-
-        temp_dir = tempfile.mkdtemp()
-        temp_file_name = posixpath.join(
-            temp_dir, "scenecut-extractor-" + os.path.basename(self.input_file) + ".txt"
+        if backend not in BACKENDS:
+            raise ValueError(
+                f"No such backend: {backend}, must be one of {', '.join(BACKENDS)}"
+            )
+        time_range = self._resolve_time_range(start, end, stream)
+        if (time_range is not None or stream is not None) and (
+            thumbnails is not None or two_pass is not None
+        ):
+            # both select frames by their number in the default stream of the whole input
+            raise ValueError(
+                "Thumbnails and two-pass analysis do not support time ranges or stream selection"
+            )
+        # fail before running ffmpeg
+        resolve_postprocessing(postprocessing)
+        thumbnail_options = (
+            resolve_thumbnail_options(thumbnails) if thumbnails is not None else None
         )
 
-        logger.debug("Writing to temp file: " + temp_file_name)
+        analysis_profile = resolve_profile(profile)
+        detector_options = resolve_detectors(detectors)
+        two_pass_options: Optional[TwoPassOptions] = None
+        if two_pass is not None:
+            if backend != "ffmpeg" or detector_options:
+                raise ValueError(
+                    "Two-pass analysis requires the ffmpeg backend and no detectors"
+                )
+            if analysis_profile.get("frame_step", 1) > 1:
+                raise ValueError("Two-pass analysis does not support frame decimation")
+            two_pass_options = resolve_two_pass(two_pass, threshold)
+            if two_pass_options["candidate_threshold"] > threshold:
+                logger.warning(
+                    "The candidate threshold is above the threshold, some cuts may be missed"
+                )
+        if backend == "ffmpeg":
+            score_filter = self._get_score_filter(analysis_profile, detector_options)
+        else:
+            score_filter = self._get_raw_frame_filter(
+                analysis_profile, detector_options
+            )
 
-        try:
-            cmd = [
-                self.ffmpeg_path,
-                "-nostdin",
-                "-loglevel",
-                "error",
-                "-y",
-                "-i",
-                self.input_file,
-                "-vf",
-                r"select=gte(scene\,0),metadata=print:file="
-                + escape_path_for_ffmpeg_filters(temp_file_name),
-                "-an",
-                "-f",
-                "null",
-                os.devnull,
-            ]
+        thumbnails_in_pass = thumbnail_options is not None and (
+            thumbnail_options["positions"] == ["start"]
+            and backend == "ffmpeg"
+            and two_pass_options is None
+            # the images are taken from the analyzed frames
+            and not any(key in analysis_profile for key in ("width", "gray", "crop"))
+        )
 
-            logger.debug(
-                "Running ffmpeg command: " + " ".join([shlex.quote(c) for c in cmd])
+        if workers > 1 and (
+            detector_options or backend != "ffmpeg" or thumbnails_in_pass
+        ):
+            # events could span the boundaries of the time ranges, and the NumPy
+            # backends have no equivalent of the overlap at the range edges yet
+            logger.warning(
+                "Detectors, NumPy backends and thumbnails are not supported in parallel, analyzing serially"
             )
+            workers = 1
 
-            ff = FfmpegProgress(cmd)
-            if progress:
-                with tqdm(total=100, position=1) as pbar:
-                    for p in ff.run_command_with_progress():
-                        pbar.update(p - pbar.n)
+        checkpoint: Optional[Checkpoint] = None
+        if checkpoint_file is not None:
+            if backend != "ffmpeg":
+                logger.warning(
+                    "Checkpoints are not supported with NumPy backends, analyzing without"
+                )
+            elif (
+                detector_options
+                or thumbnails_in_pass
+                or two_pass_options
+                or time_range is not None
+            ):
+                logger.warning(
+                    "Checkpoints are not supported with detectors, thumbnails, two passes "
+                    "or time ranges, analyzing without"
+                )
+            elif analysis_profile.get("frame_step", 1) > 1:
+                # after seeking, other frames would be sampled than in an uninterrupted run
+                logger.warning(
+                    "Checkpoints are not supported with frame decimation, analyzing without"
+                )
             else:
-                for _ in ff.run_command_with_progress():
-                    pass
-
-            lines: list[str] = []
-            if os.path.isfile(temp_file_name):
-                with open(temp_file_name, "r") as out_f:
-                    lines = out_f.readlines()
-
-            frames: list[ScenecutInfo] = []
-            last_frame_info: dict = {}
-            for line in lines:
-                line = line.strip()
-                if line.startswith("frame"):
-                    if ret := re.match(
-                        r"frame:(?P<frame>\d+)\s+pts:(?P<pts>[\d\.]+)\s+pts_time:(?P<pts_time>[\d\.]+)",
-                        line,
-                    ):
-                        ret_matches = ret.groupdict()
-                        last_frame_info["frame"] = int(ret_matches["frame"])
-                        last_frame_info["pts"] = float(ret_matches["pts"])
-                        last_frame_info["pts_time"] = float(ret_matches["pts_time"])
-                    else:
-                        raise RuntimeError("Wrongly formatted line: " + line)
-                    continue
+                checkpoint_params: dict[str, Any] = {
+                    "filters": self._get_score_filter(analysis_profile)
+                }
+                if stream is not None:
+                    checkpoint_params["stream"] = stream
+                checkpoint = Checkpoint(
+                    checkpoint_file,
+                    self.input_file,
+                    checkpoint_params,
+                    checkpoint_interval,
+                )
+                if workers > 1:
+                    logger.warning(
+                        "Checkpoints are not supported in parallel, analyzing serially"
+                    )
+                    workers = 1
 
-                if line.startswith("lavfi.scene_score") and (splits := line.split("=")):
-                    if len(splits):
-                        last_frame_info["score"] = float(splits[1])
-                    else:
-                        raise RuntimeError("Wrongly formatted line: " + line)
-                    frames.append(cast(ScenecutInfo, last_frame_info))
-                    last_frame_info = {}
+        timeline: Optional[ScoreTimeline] = None
+        events: Optional[dict[str, list[DetectorEvent]]] = None
+        cache_key: Optional[str] = None
+        if self.cache is not None:
+            with self.stats.stage("cache"):
+                cache_key = self.cache.make_key(
+                    self.input_file,
+                    self._get_cache_options(
+                        score_filter, backend, two_pass_options, time_range, stream
+                    ),
+                )
+                timeline = self.cache.get(cache_key)
+                if timeline is not None and detector_options:
+                    events = self.cache.get_events(cache_key)
+                    if events is None:
+                        timeline = None
+            if timeline is not None:
+                logger.debug("Using cached scores for " + self.input_file)
 
-            self.scenecuts = [f for f in frames if f["score"] >= threshold]
+        if timeline is None:
+            metadata: list[tuple[str, str]] = []
+            with self.stats.stage("decode", ffmpeg=True):
+                if backend != "ffmpeg":
+                    timeline = self._calculate_frame_scores_numpy(
+                        NUMPY_BACKENDS[backend],
+                        progress,
+                        profile=analysis_profile,
+                        detectors=detector_options,
+                        metadata=metadata,
+                        stream=stream,
+                        time_range=time_range,
+                    )
+                elif two_pass_options is not None:
+                    timeline = self._calculate_frame_scores_two_pass(
+                        two_pass_options, workers, progress, analysis_profile
+                    )
+                elif thumbnail_options is not None and thumbnails_in_pass:
+                    timeline = self._calculate_frame_scores_with_thumbnails(
+                        thumbnail_options,
+                        threshold,
+                        min_scene_length,
+                        postprocessing,
+                        progress,
+                        profile=analysis_profile,
+                        detectors=detector_options,
+                        metadata=metadata,
+                    )
+                    thumbnail_options = None
+                elif workers > 1:
+                    timeline = self._calculate_frame_scores_parallel(
+                        workers, progress, analysis_profile, stream, time_range
+                    )
+                else:
+                    timeline = self._calculate_frame_scores(
+                        progress,
+                        profile=analysis_profile,
+                        checkpoint=checkpoint,
+                        detectors=detector_options,
+                        metadata=metadata,
+                        stream=stream,
+                        time_range=time_range,
+                    )
+            if detector_options:
+                events = parse_detector_events(
+                    detector_options,
+                    metadata,
+                    timeline.pts_time[-1] if len(timeline) else None,
+                )
+            if self.cache is not None and cache_key is not None:
+                with self.stats.stage("cache"):
+                    self.cache.put(cache_key, timeline, self.input_file, events)
 
-        except Exception as e:
-            raise e
-        finally:
-            if os.path.isfile(temp_file_name):
-                logger.debug("Removing temp file: " + temp_file_name)
-                os.remove(temp_file_name)
+        self.timeline = timeline
+        self.events = events
+        self.time_range = time_range
+        self.stream = stream
+        self.rethreshold(threshold, min_scene_length, postprocessing)
 
-    def extract_scenes(
-        self,
-        output_directory: str,
-        no_copy: bool = False,
-        progress: bool = False,
-        output_extension: Optional[str] = None,
-    ):
+        if thumbnail_options is not None:
+            # not written in the analysis pass
+            self.extract_thumbnails(
+                thumbnail_options["output_directory"],
+                thumbnail_options["positions"],
+                thumbnail_options.get("width"),
+                thumbnail_options["image_format"],
+                progress,
+            )
+
+    @staticmethod
+    def _resolve_time_range(
+        start: float, end: Optional[float], stream: Optional[int]
+    ) -> Optional[tuple[float, Optional[float]]]:
         """
-        Extract all scenes to individual files.
+        Validate the time range and stream of `calculate_scenecuts()`.
 
         Args:
-            output_directory (str): Output directory.
-            no_copy (bool, optional): Do not copy the streams, reencode them. Defaults to False.
-            progress (bool, optional): Show progress bar. Defaults to False.
-            output_extension (str, optional): Output file extension (e.g., ".mp4"). Defaults to input file extension.
+            start (float): Start of the time range in seconds
+            end (float, optional): End of the time range in seconds
+            stream (int, optional): Index of the video stream
+
+        Returns:
+            tuple[float, Optional[float]], optional: the time range, or None for the whole input
+
+        Raises:
+            ValueError: if the time range or the stream is invalid
         """
-        if self.scenecuts is None:
+        if start < 0 or (end is not None and end <= start):
+            raise ValueError(
+                "The end must be after the start, which must not be negative"
+            )
+        if stream is not None and stream < 0:
+            raise ValueError("The stream index must not be negative")
+        return (start, end) if start > 0 or end is not None else None
+
+    @staticmethod
+    def _get_cache_options(
+        score_filter: str,
+        backend: str = "ffmpeg",
+        two_pass: Optional[TwoPassOptions] = None,
+        time_range: Optional[tuple[float, Optional[float]]] = None,
+        stream: Optional[int] = None,
+    ) -> dict[str, Any]:
+        """
+        Get the options that the scores of an analysis depend on, to look them up in the cache.
+
+        Args:
+            score_filter (str): the filter chain of the analysis
+            backend (str): Scoring backend
+            two_pass (TwoPassOptions, optional): Resolved two-pass options
+            time_range (tuple[float, Optional[float]], optional): the analyzed time range
+            stream (int, optional): Index of the analyzed video stream
+
+        Returns:
+            dict[str, Any]: the options for `ScoreCache.make_key()`
+        """
+        cache_options: dict[str, Any] = {"filters": score_filter}
+        if backend != "ffmpeg":
+            cache_options["backend"] = backend
+        if two_pass is not None:
+            cache_options["two_pass"] = two_pass
+        if time_range is not None:
+            cache_options["time_range"] = list(time_range)
+        if stream is not None:
+            cache_options["stream"] = stream
+        return cache_options
+
+    def get_events(self) -> dict[str, list[DetectorEvent]]:
+        """
+        Get the events of the detectors enabled in `calculate_scenecuts()`.
+
+        Events that are still ongoing at the end of the input end at the last frame.
+
+        Returns:
+            dict[str, list[DetectorEvent]]: the events of each detector, in order
+
+        Raises:
+            RuntimeError: if no detectors have been run yet
+        """
+        if self.events is None:
+            raise RuntimeError("No detectors run yet")
+
+        return self.events
+
+    def get_timeline(self) -> ScoreTimeline:
+        """
+        Get the scores of all frames.
+
+        Returns:
+            ScoreTimeline: the scores of all frames
+
+        Raises:
+            RuntimeError: if no scene cuts have been calculated yet
+        """
+        if self.timeline is None:
             raise RuntimeError("No scene cuts calculated yet")
 
-        # insert one at the beginning
-        scenecuts = self.scenecuts[:]
-        scenecuts.insert(0, {"pts_time": 0, "pts": 0, "frame": 0, "score": 0})
+        return self.timeline
 
-        if not os.path.exists(output_directory):
-            os.makedirs(output_directory, exist_ok=True)
+    def rethreshold(
+        self,
+        threshold: float,
+        min_scene_length: float = 0,
+        postprocessing: Optional[PostProcessing] = None,
+    ) -> ScenecutTable:
+        """
+        Re-calculate the scene cuts with another threshold, without running ffmpeg again.
 
-        for scene, next_scene in zip(scenecuts, scenecuts[1:]):
-            self.cut_part_from_file(
-                self.input_file,
-                output_directory,
-                scene["pts_time"],
-                next_scene["pts_time"],
-                no_copy,
-                progress,
-                self.ffmpeg_path,
-                output_extension,
+        Args:
+            threshold (float): Threshold (between 0 and 1)
+            min_scene_length (float): Minimum scene length in seconds
+            postprocessing (PostProcessing, optional): Rules to suppress false cuts
+
+        Returns:
+            ScenecutTable: the scene cuts
+
+        Raises:
+            RuntimeError: if no scene cuts have been calculated yet
+        """
+        if not (0 <= threshold <= 1):
+            raise RuntimeError("Threshold must be between 0 and 1")
+
+        timeline = self.get_timeline()
+        with self.stats.stage("threshold"):
+            self.scenecuts = timeline.rethreshold(
+                threshold, min_scene_length, postprocessing
             )
+        self.selection = {
+            "threshold": threshold,
+            "min_scene_length": min_scene_length,
+            "postprocessing": postprocessing or {},
+        }
+        return self.scenecuts
 
-    @staticmethod
-    def cut_part_from_file(
-        input_file: str,
-        output_directory: str,
-        start: Union[float, None] = None,
-        end: Union[float, None, Literal[""]] = None,
-        no_copy: bool = False,
-        progress: bool = False,
-        ffmpeg_path: str = "ffmpeg",
-        output_extension: Optional[str] = None,
-    ):
+    def top_k(self, n: int, min_scene_length: float = 0) -> ScenecutTable:
         """
-        Cut a part of a video.
+        Use the `n` frames with the highest scores as scene cuts.
 
         Args:
-            input_file (str): Input file.
-            output_directory (str): Output directory.
-            start (Union[float, None], optional): Start time. Defaults to None.
-            end (Union[float, None, Literal[""]], optional): End time. Defaults to None.
-            no_copy (bool, optional): Do not copy the streams, reencode them. Defaults to False.
-            progress (bool, optional): Show progress bar. Defaults to False.
-            ffmpeg_path (str, optional): Path to ffmpeg executable. Defaults to "ffmpeg".
-            output_extension (str, optional): Output file extension (e.g., ".mp4"). Defaults to input file extension.
+            n (int): Number of scene cuts
+            min_scene_length (float): Minimum scene length in seconds
 
-        FIXME: This has been copy-pasted from ffmpeg-black-split.
+        Returns:
+            ScenecutTable: the scene cuts
+
+        Raises:
+            RuntimeError: if no scene cuts have been calculated yet
         """
-        if start is None:
-            start = 0
+        timeline = self.get_timeline()
+        with self.stats.stage("threshold"):
+            self.scenecuts = timeline.top_k(n, min_scene_length)
+        self.selection = {"top_k": n, "min_scene_length": min_scene_length}
+        return self.scenecuts
 
-        if end is not None and end != "":
-            to_args = ["-t", str(end - start)]
-        else:
-            end = ""
-            to_args = []
+    def cuts_in_range(
+        self, start: float, end: float, threshold: float = DEFAULT_THRESHOLD
+    ) -> ScenecutTable:
+        """
+        Get the scene cuts within a time range, without running ffmpeg again.
 
-        if no_copy:
-            codec_args = ["-c:v", "libx264", "-c:a", "aac"]
-        else:
-            codec_args = ["-c", "copy"]
+        Args:
+            start (float): Start time in seconds (inclusive)
+            end (float): End time in seconds (exclusive)
+            threshold (float): Threshold (between 0 and 1)
 
-        # Use provided extension or default to input file's extension
-        if output_extension is None:
-            output_extension = os.path.splitext(input_file)[1]
-        elif not output_extension.startswith("."):
-            output_extension = "." + output_extension
+        Returns:
+            ScenecutTable: the scene cuts
+
+        Raises:
+            RuntimeError: if no scene cuts have been calculated yet
+        """
+        return self.get_timeline().cuts_in_range(start, end, threshold)
+
+    def get_keyframe_index(self) -> KeyframeIndex:
+        """
+        Get the timestamps of all frames of the input and which of them are keyframes.
+
+        The index is created with a single ffmpeg pass that reads the video packets
+        without decoding them. It is kept in memory, and in the cache if one is set.
+
+        Returns:
+            KeyframeIndex: the keyframe index
+
+        Raises:
+            RuntimeError: if ffmpeg fails
+        """
+        if self.keyframe_index is not None:
+            return self.keyframe_index
+
+        cache_key: Optional[str] = None
+        if self.cache is not None:
+            with self.stats.stage("cache"):
+                cache_key = self.cache.make_key(self.input_file, {"keyframe_index": 1})
+                self.keyframe_index = self.cache.get_keyframe_index(cache_key)
+            if self.keyframe_index is not None:
+                logger.debug("Using cached keyframe index for " + self.input_file)
+                return self.keyframe_index
+
+        cmd = KeyframeIndex.get_keyframe_index_command(
+            self.input_file, self.ffmpeg_path
+        )
+        logger.debug(
+            "Running ffmpeg command: " + " ".join([shlex.quote(c) for c in cmd])
+        )
+
+        with self.stats.stage("index", ffmpeg=True), tempfile.TemporaryFile() as f:
+            proc = subprocess.Popen(
+                cmd,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=f,
+                text=True,
+            )
+            self.stats.add_ffmpeg_process(proc.pid)
+            assert proc.stdout is not None
+
+            completed = False
+            try:
+                keyframe_index = KeyframeIndex.from_framecrc(proc.stdout)
+                completed = True
+            finally:
+                if not completed and proc.poll() is None:
+                    proc.kill()
+                proc.wait()
+                proc.stdout.close()
+
+            if proc.returncode != 0:
+                f.seek(0)
+                stderr = f.read().decode("utf-8", errors="replace")
+                raise RuntimeError(f"Error running command {cmd}: " + stderr.strip())
+
+        if self.cache is not None and cache_key is not None:
+            with self.stats.stage("cache"):
+                self.cache.put_keyframe_index(
+                    cache_key, keyframe_index, self.input_file
+                )
+
+        self.keyframe_index = keyframe_index
+        return keyframe_index
+
+    def _calculate_frame_scores_parallel(
+        self,
+        workers: int,
+        progress: bool = False,
+        profile: Optional[AnalysisProfile] = None,
+        stream: Optional[int] = None,
+        time_range: Optional[tuple[float, Optional[float]]] = None,
+    ) -> ScoreTimeline:
+        """
+        Split the input into time ranges and analyze each range in its own ffmpeg process.
+
+        Each process seeks to a few frames before the start of its range, since the
+        score of a frame depends on the two frames before it. Frames are then assigned
+        to exactly one range based on their timestamp, and frame numbers are
+        re-calculated from the number of frames in the preceding ranges.
+
+        Args:
+            workers (int): Maximum number of parallel ffmpeg processes
+            progress (bool): Show a progress bar on stderr
+            profile (AnalysisProfile, optional): Analysis profile
+            stream (int, optional): Index of the video stream to analyze
+            time_range (tuple[float, Optional[float]], optional): Only split and analyze the
+                time range from the start to the end (if any), see `calculate_scenecuts()`
+
+        Returns:
+            ScoreTimeline: the scores of all frames
+        """
+        serial_args: dict[str, Any] = {
+            "profile": profile,
+            "stream": stream,
+            "time_range": time_range,
+        }
+        if profile and profile.get("frame_step", 1) > 1:
+            # the frames sampled by each process would not line up with the serial analysis
+            logger.warning(
+                "Frame decimation is not supported in parallel, analyzing serially"
+            )
+            return self._calculate_frame_scores(progress, **serial_args)
+
+        probe = probe_input(self.input_file, self.ffmpeg_path)
+        duration, fps = probe["duration"], probe["fps"]
+        if not duration or not fps:
+            logger.warning(
+                "Could not determine duration or frame rate of input, analyzing serially"
+            )
+            return self._calculate_frame_scores(progress, **serial_args)
+
+        range_start, range_end = time_range or (0.0, None)
+        span = (range_end if range_end is not None else duration) - range_start
+        num_segments = min(workers, int(span // self.MIN_SEGMENT_DURATION))
+        if num_segments <= 1:
+            return self._calculate_frame_scores(progress, **serial_args)
+
+        overlap = 3 / fps
+        # split the available cores among the decoders to avoid oversubscription
+        decoder_threads = max(1, (os.cpu_count() or 1) // num_segments)
+        bounds = [range_start + span * i / num_segments for i in range(num_segments)]
+        bounds.append(range_end if range_end is not None else float("inf"))
+
+        def analyze_segment(start: float, end: float) -> ScoreTimeline:
+            # keep absolute timestamps so that segments can be merged
+            input_args = [
+                "-threads",
+                str(decoder_threads),
+                "-copyts",
+                "-start_at_zero",
+            ]
+            if start > 0:
+                input_args.extend(["-ss", str(max(start - overlap, 0))])
+            if end != float("inf"):
+                input_args.extend(["-t", str(end - start + 2 * overlap)])
+            return self._calculate_frame_scores(
+                input_args=input_args, profile=profile, stream=stream
+            )
+
+        logger.debug(f"Analyzing {num_segments} segments in parallel")
+
+        with ThreadPoolExecutor(max_workers=num_segments) as executor:
+            futures = [
+                executor.submit(analyze_segment, start, end)
+                for start, end in zip(bounds, bounds[1:])
+            ]
+            with tqdm(total=num_segments, position=1, disable=not progress) as pbar:
+                for future in as_completed(futures):
+                    pbar.update(1)
+            segments = [future.result() for future in futures]
+
+        timeline = ScoreTimeline()
+        for segment, start, end in zip(segments, bounds, bounds[1:]):
+            for i in range(len(segment)):
+                if start <= segment.pts_time[i] < end:
+                    timeline.append(
+                        len(timeline),
+                        segment.pts[i],
+                        segment.pts_time[i],
+                        segment.scores[i],
+                    )
+
+        return timeline
+
+    def _calculate_frame_scores_two_pass(
+        self,
+        options: TwoPassOptions,
+        workers: int = 1,
+        progress: bool = False,
+        profile: Optional[AnalysisProfile] = None,
+    ) -> ScoreTimeline:
+        """
+        Score a cheap subset of the frames, then analyze the frames around candidate cuts.
+
+        The first pass scores downscaled frames, either every n-th frame or only the
+        keyframes, by their difference to the previous frame of the first pass (the
+        scene score would miss cuts in consecutive frames of the first pass). Wherever
+        the difference reaches the candidate threshold, and after the last frame of the
+        first pass, the second pass seeks to the frames since the previous frame of the
+        first pass and scores them like a full analysis would. Frame numbers are taken
+        from the keyframe index, so the cuts found in the second pass have the same
+        frame, pts and pts_time values as with a full analysis. Outside of the candidate
+        windows, the timeline holds the differences of the first pass.
+
+        Args:
+            options (TwoPassOptions): the resolved two-pass options
+            workers (int): Maximum number of candidate windows analyzed in parallel
+            progress (bool): Show a progress bar on stderr
+            profile (AnalysisProfile, optional): Analysis profile of the second pass
+
+        Returns:
+            ScoreTimeline: the scores of the analyzed frames
+
+        Raises:
+            RuntimeError: if the keyframe index of the input is empty
+        """
+        index = self.get_keyframe_index()
+        if not len(index):
+            raise RuntimeError("Could not index the frames of " + self.input_file)
+
+        metadata: list[tuple[str, str]] = []
+        coarse = self._calculate_frame_scores(
+            progress,
+            input_args=get_coarse_input_args(options),
+            profile=get_coarse_profile(options),
+            metadata=metadata,
+            difference=True,
+        )
+        coarse = renumber_frames(coarse, index, get_differences(metadata))
+        windows = get_candidate_windows(
+            coarse, options["candidate_threshold"], index.keyframes, len(index)
+        )
+        logger.debug(
+            f"Analyzing {sum(last - first for first, last in windows)} frames "
+            f"in {len(windows)} candidate windows"
+        )
+
+        def refine(first: int, last: int) -> ScoreTimeline:
+            # include the frames that the score of the first frame depends on
+            start = max(0, first - CONTEXT_FRAMES)
+            input_args = ["-copyts", "-start_at_zero"]
+            if start > 0:
+                input_args.extend(["-ss", str(index.pts_time[start] - TIME_TOLERANCE)])
+            if last < len(index):
+                input_args.extend(
+                    ["-t", str(index.pts_time[last] - index.pts_time[start])]
+                )
+            return renumber_frames(
+                self._calculate_frame_scores(input_args=input_args, profile=profile),
+                index,
+            )
+
+        with self.stats.stage("refine", ffmpeg=True):
+            with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+                futures = [
+                    executor.submit(refine, first, last) for first, last in windows
+                ]
+                with tqdm(total=len(windows), position=1, disable=not progress) as pbar:
+                    for future in as_completed(futures):
+                        pbar.update(1)
+                refined = [future.result() for future in futures]
+
+        return merge_refined(coarse, windows, refined)
+
+    def iter_scenecuts(
+        self,
+        threshold: float = DEFAULT_THRESHOLD,
+        profile: Union[str, AnalysisProfile, None] = None,
+        min_scene_length: float = 0,
+        follow: bool = False,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+    ) -> Generator[ScenecutInfo, None, None]:
+        """
+        Calculate scene cuts with ffmpeg, yielding each cut as soon as it is detected.
+
+        Unlike `calculate_scenecuts()`, the scores are not stored, so memory usage
+        stays constant regardless of the input length. Stopping the iteration
+        early terminates ffmpeg.
+
+        In follow mode, the input may still be written to: a growing file is read
+        until it has not grown for `idle_timeout` seconds, and each cut is yielded
+        as soon as its frame has been decoded. Stream URLs and pipes (`-` for
+        stdin) are read until they end or stall for `idle_timeout` seconds.
+
+        Args:
+            threshold (float): Threshold (between 0 and 1)
+            profile (Union[str, AnalysisProfile, None]): Analysis profile name or custom profile
+            min_scene_length (float): Minimum scene length in seconds
+            follow (bool): Follow an input that is still being written, see above
+            idle_timeout (float): In follow mode, stop after this many seconds without new data
+
+        Yields:
+            ScenecutInfo: the scene cuts, in presentation order
+        """
+        if not (0 <= threshold <= 1):
+            raise RuntimeError("Threshold must be between 0 and 1")
+
+        analysis_profile = resolve_profile(profile)
+        last_cut_time = 0.0
+        for frame, pts, pts_time, score in self._iter_frame_scores(
+            input_args=self._get_follow_args(idle_timeout) if follow else None,
+            profile=analysis_profile,
+            live=follow,
+        ):
+            if score >= threshold and pts_time - last_cut_time >= min_scene_length:
+                last_cut_time = pts_time
+                yield {"frame": frame, "pts": pts, "pts_time": pts_time, "score": score}
+
+    def _get_follow_args(self, idle_timeout: float) -> list[str]:
+        """
+        Get the ffmpeg input options to read an input that is still being written.
+
+        Args:
+            idle_timeout (float): Stop reading after this many seconds without new data
+
+        Returns:
+            list[str]: the input options
+        """
+        # applies to all protocols, so that stalled streams and pipes end as well
+        args = ["-rw_timeout", str(int(idle_timeout * 1_000_000))]
+        if self.input_file.startswith("file:") or os.path.isfile(self.input_file):
+            # keep reading at the end of the file instead of stopping
+            args = ["-follow", "1", *args]
+        return args
+
+    def _reads_stdin(self) -> bool:
+        return self.input_file in ("-", "pipe:", "pipe:0")
+
+    def _calculate_frame_scores(
+        self,
+        progress: bool = False,
+        input_args: Optional[list[str]] = None,
+        profile: Optional[AnalysisProfile] = None,
+        checkpoint: Optional[Checkpoint] = None,
+        detectors: Optional[DetectorOptions] = None,
+        metadata: Optional[list[tuple[str, str]]] = None,
+        frame_output: Optional[tuple[str, list[str]]] = None,
+        difference: bool = False,
+        stream: Optional[int] = None,
+        time_range: Optional[tuple[float, Optional[float]]] = None,
+    ) -> ScoreTimeline:
+        """
+        Run ffmpeg and parse the scene scores of all frames.
+
+        Args:
+            progress (bool): Show a progress bar on stderr
+            input_args (list[str], optional): Additional ffmpeg input options
+            profile (AnalysisProfile, optional): Analysis profile
+            checkpoint (Checkpoint, optional): Checkpoint to resume from and to save progress to
+            detectors (DetectorOptions, optional): Detectors to run in the same process
+            metadata (list[tuple[str, str]], optional): List to append the metadata of the detectors to
+            frame_output (tuple[str, list[str]], optional): Filter chain and output options to also
+                write the analyzed frames with, see `_get_score_command()`
+            difference (bool, optional): Also append the difference to the previous frame to `metadata`,
+                see `_get_score_filter()`
+            stream (int, optional): Index of the video stream to analyze
+            time_range (tuple[float, Optional[float]], optional): Only analyze the time range from the
+                start to the end (if any), see `calculate_scenecuts()`
+
+        Returns:
+            ScoreTimeline: the scores of all frames
+        """
+        if checkpoint is not None:
+            return self._calculate_frame_scores_checkpointed(
+                checkpoint, progress, input_args, profile, stream
+            )
+
+        if time_range is not None:
+            input_args = [*(input_args or []), *self._get_time_range_args(time_range)]
+
+        timeline = ScoreTimeline()
+        chunks = self._iter_frame_score_chunks(
+            input_args,
+            profile,
+            detectors=detectors,
+            metadata=metadata,
+            frame_output=frame_output,
+            difference=difference,
+            stream=stream,
+        )
+
+        if not progress:
+            for chunk in chunks:
+                timeline.extend(chunk.frames, chunk.pts, chunk.pts_time, chunk.scores)
+        else:
+            start, end = time_range or (0.0, None)
+            duration = (
+                end
+                if end is not None
+                else probe_input(self.input_file, self.ffmpeg_path)["duration"]
+            )
+            with tqdm(total=100, position=1) as pbar:
+                for chunk in chunks:
+                    timeline.extend(
+                        chunk.frames, chunk.pts, chunk.pts_time, chunk.scores
+                    )
+                    if (
+                        duration
+                        and duration > start
+                        and (
+                            p := int(
+                                (chunk.pts_time[-1] - start) / (duration - start) * 100
+                            )
+                        )
+                        > pbar.n
+                    ):
+                        pbar.update(min(p, 100) - pbar.n)
+                pbar.update(100 - pbar.n)
+
+        if time_range is not None:
+            return self._select_time_range(timeline, time_range)
+        return timeline
+
+    def _get_time_range_args(
+        self, time_range: tuple[float, Optional[float]]
+    ) -> list[str]:
+        """
+        Get the ffmpeg input options to only decode a time range.
+
+        Like the parallel analysis, ffmpeg seeks to a few frames before the start,
+        since the score of a frame depends on the two frames before it, and keeps
+        the timestamps of the input. The frames outside of the range are removed
+        afterwards with `_select_time_range()`.
+
+        Args:
+            time_range (tuple[float, Optional[float]]): Start and end (if any) in seconds
+
+        Returns:
+            list[str]: the input options
+        """
+        start, end = time_range
+        fps = probe_input(self.input_file, self.ffmpeg_path)["fps"]
+        overlap = 3 / fps if fps else 1.0
+        seek = max(start - overlap, 0)
+        input_args = ["-copyts", "-start_at_zero"]
+        if seek > 0:
+            input_args.extend(["-ss", str(seek)])
+        if end is not None:
+            input_args.extend(["-t", str(end - seek + overlap)])
+        return input_args
+
+    @staticmethod
+    def _select_time_range(
+        timeline: ScoreTimeline, time_range: tuple[float, Optional[float]]
+    ) -> ScoreTimeline:
+        """
+        Get the frames of a timeline within a time range, numbered from the first of them.
+
+        Args:
+            timeline (ScoreTimeline): the scores, analyzed from a few frames before the start
+            time_range (tuple[float, Optional[float]]): Start (inclusive) and end (exclusive, if any) in seconds
+
+        Returns:
+            ScoreTimeline: the scores of the frames within the range
+        """
+        start, end = time_range
+        lo = bisect_left(timeline.pts_time, start)
+        hi = (
+            bisect_left(timeline.pts_time, end, lo=lo)
+            if end is not None
+            else len(timeline)
+        )
+        offset = timeline.frames[lo] if lo < hi else 0
+        selected = ScoreTimeline()
+        selected.extend(
+            [frame - offset for frame in timeline.frames[lo:hi]],
+            timeline.pts[lo:hi],
+            timeline.pts_time[lo:hi],
+            timeline.scores[lo:hi],
+        )
+        return selected
+
+    def _calculate_frame_scores_checkpointed(
+        self,
+        checkpoint: Checkpoint,
+        progress: bool = False,
+        input_args: Optional[list[str]] = None,
+        profile: Optional[AnalysisProfile] = None,
+        stream: Optional[int] = None,
+    ) -> ScoreTimeline:
+        """
+        Run ffmpeg and parse the scene scores of all frames, resuming from and saving to a checkpoint.
+
+        To resume, ffmpeg seeks to a few frames before the last saved frame, since
+        the score of a frame depends on the two frames before it, and keeps
+        timestamps like the parallel analysis does. Frames up to the last saved one
+        are dropped, and frame numbers continue from the number of saved frames.
+
+        Args:
+            checkpoint (Checkpoint): the checkpoint
+            progress (bool): Show a progress bar on stderr
+            input_args (list[str], optional): Additional ffmpeg input options
+            profile (AnalysisProfile, optional): Analysis profile
+            stream (int, optional): Index of the video stream to analyze
+
+        Returns:
+            ScoreTimeline: the scores of all frames
+        """
+        timeline = checkpoint.load()
+        probe = (
+            probe_input(self.input_file, self.ffmpeg_path)
+            if progress or len(timeline)
+            else None
+        )
+        resume_time = None
+        if probe is not None and len(timeline):
+            resume_time = timeline.pts_time[-1]
+            logger.info(f"Resuming analysis after {resume_time} s")
+            overlap = 3 / probe["fps"] if probe["fps"] else 1.0
+            input_args = [
+                *(input_args or []),
+                "-copyts",
+                "-start_at_zero",
+                "-ss",
+                str(max(resume_time - overlap, 0)),
+            ]
+
+        duration = probe["duration"] if probe is not None and progress else None
+        checkpoint.open()
+        completed = False
+        try:
+            with tqdm(total=100, position=1, disable=not progress) as pbar:
+                for chunk in self._iter_frame_score_chunks(
+                    input_args, profile, stream=stream
+                ):
+                    if resume_time is not None:
+                        chunk = chunk[bisect_right(chunk.pts_time, resume_time) :]
+                        if not chunk:
+                            continue
+                        frames: Iterable[int] = range(
+                            len(timeline), len(timeline) + len(chunk)
+                        )
+                    else:
+                        frames = chunk.frames
+                    timeline.extend(frames, chunk.pts, chunk.pts_time, chunk.scores)
+                    checkpoint.update(timeline)
+                    if (
+                        duration
+                        and (p := int(chunk.pts_time[-1] / duration * 100)) > pbar.n
+                    ):
+                        pbar.update(min(p, 100) - pbar.n)
+                pbar.update(100 - pbar.n)
+            completed = True
+        finally:
+            if completed:
+                checkpoint.remove()
+            else:
+                # save the progress on errors and interruptions, e.g. with Ctrl-C
+                checkpoint.close(timeline)
+
+        return timeline
+
+    def _calculate_frame_scores_with_thumbnails(
+        self,
+        options: ThumbnailOptions,
+        threshold: float,
+        min_scene_length: float = 0,
+        postprocessing: Optional[PostProcessing] = None,
+        progress: bool = False,
+        profile: Optional[AnalysisProfile] = None,
+        detectors: Optional[DetectorOptions] = None,
+        metadata: Optional[list[tuple[str, str]]] = None,
+    ) -> ScoreTimeline:
+        """
+        Run ffmpeg and parse the scene scores of all frames, writing an image of the first frame of each scene.
+
+        While scoring, ffmpeg writes an image of each frame whose score is at or
+        above the threshold (and of the first frame), as the final cuts are not
+        known yet. After the analysis, the images of the final cuts are moved to
+        their paths, and the others are removed.
+
+        Args:
+            options (ThumbnailOptions): Resolved thumbnail options, with only the `start` position
+            threshold (float): Threshold (between 0 and 1)
+            min_scene_length (float): Minimum scene length in seconds
+            postprocessing (PostProcessing, optional): Rules to suppress false cuts
+            progress (bool): Show a progress bar on stderr
+            profile (AnalysisProfile, optional): Analysis profile
+            detectors (DetectorOptions, optional): Detectors to run in the same process
+            metadata (list[tuple[str, str]], optional): List to append the metadata of the detectors to
+
+        Returns:
+            ScoreTimeline: the scores of all frames
+        """
+        output_directory = options["output_directory"]
+        os.makedirs(output_directory, exist_ok=True)
+
+        with tempfile.TemporaryDirectory(dir=output_directory) as temp_dir:
+            frame_filter = ",".join(
+                [
+                    # the first frame starts the first scene, but has no score
+                    "metadata=mode=modify:key=lavfi.scene_score:value=1:enable=eq(n\\,0)",
+                    # the value is compared as a number in the expression
+                    f"metadata=mode=select:key=lavfi.scene_score:value={threshold}"
+                    ":function=expr:expr=gte(VALUE1\\,VALUE2)",
+                    *get_thumbnail_filters(options.get("width")),
+                ]
+            )
+            timeline = self._calculate_frame_scores(
+                progress,
+                profile=profile,
+                detectors=detectors,
+                metadata=metadata,
+                frame_output=(
+                    frame_filter,
+                    self._get_thumbnail_output_args(options["image_format"], temp_dir),
+                ),
+            )
+
+            if not len(timeline):
+                return timeline
+            frames = [
+                timeline.frames[i]
+                for i in sorted({0, *timeline.threshold_indices(threshold)})
+            ]
+            scenecuts = timeline.rethreshold(
+                threshold, min_scene_length, postprocessing
+            )
+            plan = self._get_thumbnail_plan(timeline, scenecuts, options)
+            if self._move_thumbnails(temp_dir, frames, plan) is None:
+                self._extract_thumbnails(plan, options, progress)
+
+        return timeline
+
+    def _calculate_frame_scores_numpy(
+        self,
+        metric: str,
+        progress: bool = False,
+        profile: Optional[AnalysisProfile] = None,
+        detectors: Optional[DetectorOptions] = None,
+        metadata: Optional[list[tuple[str, str]]] = None,
+        stream: Optional[int] = None,
+        time_range: Optional[tuple[float, Optional[float]]] = None,
+    ) -> ScoreTimeline:
+        """
+        Run ffmpeg to get small grayscale raw frames, and score them with NumPy.
+
+        The frames are piped to stdout and scored a batch at a time. The timestamps
+        (and the metadata of detectors) are written to a temporary file and parsed
+        after ffmpeg has finished.
+
+        Args:
+            metric (str): `mad` or `histogram`, see `FrameDifferenceScorer`
+            progress (bool): Show a progress bar on stderr
+            profile (AnalysisProfile, optional): Analysis profile
+            detectors (DetectorOptions, optional): Detectors to run on the same frames
+            metadata (list[tuple[str, str]], optional): List to append the metadata of the detectors to
+            stream (int, optional): Index of the video stream to analyze
+            time_range (tuple[float, Optional[float]], optional): Only analyze the time range from the
+                start to the end (if any), see `calculate_scenecuts()`
+
+        Returns:
+            ScoreTimeline: the scores of all frames
+
+        Raises:
+            ImportError: if NumPy is not installed
+            RuntimeError: if ffmpeg fails
+        """
+        width, height = get_raw_frame_size(profile)
+        scorer = FrameDifferenceScorer(width, height, metric)
+        frame_step = (profile or {}).get("frame_step", 1)
+
+        import numpy as np
+
+        expected_frames = None
+        if progress:
+            probe = probe_input(self.input_file, self.ffmpeg_path)
+            start, end = time_range or (0.0, None)
+            duration = end if end is not None else probe["duration"]
+            if duration and probe["fps"]:
+                expected_frames = (duration - start) * probe["fps"] / frame_step
+
+        with tempfile.TemporaryDirectory() as temp_dir, tempfile.TemporaryFile() as f:
+            metadata_file = os.path.join(temp_dir, "metadata.txt")
+            cmd = [
+                self.ffmpeg_path,
+                "-nostdin",
+                "-loglevel",
+                "error",
+                "-y",
+                *(self._get_time_range_args(time_range) if time_range else []),
+                "-i",
+                self.input_file,
+                *(["-map", f"0:v:{stream}"] if stream is not None else []),
+                "-vf",
+                self._get_raw_frame_filter(profile, detectors)
+                + ",metadata=print:file="
+                + escape_path_for_ffmpeg_filters(metadata_file),
+                "-an",
+                "-f",
+                "rawvideo",
+                "pipe:1",
+            ]
+            logger.debug(
+                "Running ffmpeg command: " + " ".join([shlex.quote(c) for c in cmd])
+            )
+
+            proc = subprocess.Popen(
+                cmd,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=f,
+                bufsize=0,
+            )
+            assert proc.stdout is not None
+            self.stats.add_ffmpeg_process(proc.pid)
+
+            batches = []
+            frames = 0
+            score_time = 0.0
+            completed = False
+            try:
+                with tqdm(total=100, position=1, disable=not progress) as pbar:
+                    scores = scorer.iter_scores(proc.stdout)
+                    while True:
+                        # CPU time of this thread is spent scoring, not waiting for ffmpeg
+                        score_start = time.thread_time()
+                        batch = next(scores, None)
+                        score_time += time.thread_time() - score_start
+                        if batch is None:
+                            break
+                        batches.append(batch)
+                        frames += len(batch)
+                        if expected_frames and (
+                            (p := int(frames / expected_frames * 100)) > pbar.n
+                        ):
+                            pbar.update(min(p, 100) - pbar.n)
+                    pbar.update(100 - pbar.n)
+                completed = True
+            finally:
+                if not completed and proc.poll() is None:
+                    proc.kill()
+                # read before waiting, as the process is gone afterwards
+                input_bytes = read_process_io_bytes(proc.pid)
+                proc.wait()
+                proc.stdout.close()
+                self.stats.add_frames(frames, input_bytes)
+                self.stats.add_stage("score", score_time, score_time)
+
+            if proc.returncode != 0:
+                f.seek(0)
+                stderr = f.read().decode("utf-8", errors="replace")
+                raise RuntimeError(f"Error running command {cmd}: " + stderr.strip())
+
+            timeline = parse_metadata_file(
+                metadata_file, frame_step=frame_step, metadata=metadata
+            )
+
+        if frames != len(timeline):
+            raise RuntimeError(
+                f"Got {frames} frames, but {len(timeline)} timestamps from ffmpeg"
+            )
+        # the timestamps were parsed with placeholder scores
+        if batches:
+            timeline.scores = array("d", np.concatenate(batches).tobytes())
+        if time_range is not None:
+            return self._select_time_range(timeline, time_range)
+        return timeline
+
+    def _get_raw_frame_filter(
+        self,
+        profile: Optional[AnalysisProfile] = None,
+        detectors: Optional[DetectorOptions] = None,
+    ) -> str:
+        """
+        Get the filter chain that creates the raw frames for the NumPy backends.
+
+        Args:
+            profile (AnalysisProfile, optional): Analysis profile
+            detectors (DetectorOptions, optional): Detectors to run on the raw frames
+
+        Returns:
+            str: the filter chain, to be followed by `metadata=print`
+        """
+        width, height = get_raw_frame_size(profile)
+        # the frame size and format are fixed, so only frame decimation and
+        # cropping are taken from the profile
+        reduced_profile: AnalysisProfile = {}
+        if "frame_step" in (profile or {}):
+            reduced_profile["frame_step"] = (profile or {})["frame_step"]
+        if "crop" in (profile or {}):
+            reduced_profile["crop"] = (profile or {})["crop"]
+        return ",".join(
+            [
+                *get_profile_filters(reduced_profile),
+                f"scale=w={width}:h={height}:flags=area",
+                "format=gray",
+                *get_detector_filters(detectors or {}),
+                # a placeholder score on every frame, so that the timestamps of all
+                # frames are printed like with the ffmpeg backend
+                "metadata=add:key=lavfi.scene_score:value=0",
+            ]
+        )
+
+    def _get_score_filter(
+        self,
+        profile: Optional[AnalysisProfile] = None,
+        detectors: Optional[DetectorOptions] = None,
+        difference: bool = False,
+    ) -> str:
+        """
+        Get the filter chain that calculates the scene scores.
+
+        Args:
+            profile (AnalysisProfile, optional): Analysis profile
+            detectors (DetectorOptions, optional): Detectors to run on the scored frames
+            difference (bool, optional): Also attach the mean absolute difference to the previous
+                frame (from 0 to 100) as `lavfi.scd.mafd` metadata. Unlike the scene score, it is
+                high for every cut, even if the previous frame was a cut as well.
+
+        Returns:
+            str: the filter chain
+        """
+        # detectors come last, so that a pixel format conversion they may need
+        # does not change the scores
+        return ",".join(
+            [
+                *get_profile_filters(profile or {}),
+                *([self.DIFFERENCE_FILTER] if difference else []),
+                self.SCORE_FILTER,
+                *get_detector_filters(detectors or {}),
+            ]
+        )
+
+    def _get_score_command(
+        self,
+        input_args: Optional[list[str]] = None,
+        profile: Optional[AnalysisProfile] = None,
+        live: bool = False,
+        detectors: Optional[DetectorOptions] = None,
+        frame_output: Optional[tuple[str, list[str]]] = None,
+        difference: bool = False,
+        stream: Optional[int] = None,
+    ) -> list[str]:
+        """
+        Get the ffmpeg command that prints the scene score of each frame to stdout.
+
+        Args:
+            input_args (list[str], optional): Additional ffmpeg input options
+            profile (AnalysisProfile, optional): Analysis profile
+            live (bool, optional): Print each frame immediately instead of buffering the output
+            detectors (DetectorOptions, optional): Detectors to run on the same frames
+            frame_output (tuple[str, list[str]], optional): A filter chain that is applied to a copy
+                of the analyzed frames (with their scores as metadata), and the ffmpeg options of the
+                output it is written to, e.g. to write images of some frames in the same process
+            difference (bool, optional): Also print the difference to the previous frame, see `_get_score_filter()`
+            stream (int, optional): Index of the video stream to analyze. Defaults to the stream ffmpeg selects.
+
+        Returns:
+            list[str]: the command
+        """
+        # the colon needs to be escaped for both the filtergraph and the option parser
+        score_filter = (
+            self._get_score_filter(profile, detectors, difference)
+            + r",metadata=print:file=pipe\\:1"
+            + (":direct=1" if live else "")
+        )
+        if frame_output is None:
+            filter_args = [
+                *(["-map", f"0:v:{stream}"] if stream is not None else []),
+                "-vf",
+                score_filter,
+            ]
+            output_args: list[str] = []
+        else:
+            frame_filter, output_args = frame_output
+            filter_args = [
+                "-filter_complex",
+                f"[0:v:{stream or 0}]{score_filter},split[scores][frames];"
+                f"[frames]{frame_filter}[frames_out]",
+                "-map",
+                "[scores]",
+            ]
+            output_args = ["-map", "[frames_out]", *output_args]
+        return [
+            self.ffmpeg_path,
+            "-nostdin",
+            "-loglevel",
+            "error",
+            "-y",
+            *(input_args or []),
+            "-i",
+            self.input_file,
+            *filter_args,
+            "-an",
+            "-f",
+            "null",
+            os.devnull,
+            *output_args,
+        ]
+
+    def _iter_frame_scores(
+        self,
+        input_args: Optional[list[str]] = None,
+        profile: Optional[AnalysisProfile] = None,
+        live: bool = False,
+    ) -> Iterator[tuple[int, float, float, float]]:
+        """
+        Run ffmpeg and yield the scene score of each frame as soon as it is printed.
+
+        Args:
+            input_args (list[str], optional): Additional ffmpeg input options
+            profile (AnalysisProfile, optional): Analysis profile
+            live (bool, optional): Read each frame as soon as it has been analyzed
+
+        Yields:
+            tuple[int, float, float, float]: frame number, pts, pts_time and score
+        """
+        for chunk in self._iter_frame_score_chunks(input_args, profile, live):
+            yield from zip(chunk.frames, chunk.pts, chunk.pts_time, chunk.scores)
+
+    def _iter_frame_score_chunks(
+        self,
+        input_args: Optional[list[str]] = None,
+        profile: Optional[AnalysisProfile] = None,
+        live: bool = False,
+        detectors: Optional[DetectorOptions] = None,
+        metadata: Optional[list[tuple[str, str]]] = None,
+        frame_output: Optional[tuple[str, list[str]]] = None,
+        difference: bool = False,
+        stream: Optional[int] = None,
+    ) -> Iterator[ScoreTimeline]:
+        """
+        Run ffmpeg and yield the scene scores of all frames that have been printed so far.
+
+        The metadata is read from a pipe, so no temporary files are needed, and parsed
+        in bulk with a `MetadataParser`. Frame numbers refer to the original input,
+        even if the analysis profile drops frames.
+
+        Args:
+            input_args (list[str], optional): Additional ffmpeg input options
+            profile (AnalysisProfile, optional): Analysis profile
+            live (bool, optional): Read each frame as soon as it has been analyzed
+            detectors (DetectorOptions, optional): Detectors to run on the same frames
+            metadata (list[tuple[str, str]], optional): List to append the metadata of the detectors to
+            frame_output (tuple[str, list[str]], optional): Filter chain and output options to also
+                write the analyzed frames with, see `_get_score_command()`
+            difference (bool, optional): Also append the difference to the previous frame to `metadata`,
+                see `_get_score_filter()`
+            stream (int, optional): Index of the video stream to analyze
+
+        Yields:
+            ScoreTimeline: the scores of the frames that have been printed since the last chunk
+        """
+        cmd = self._get_score_command(
+            input_args, profile, live, detectors, frame_output, difference, stream
+        )
+
+        logger.debug(
+            "Running ffmpeg command: " + " ".join([shlex.quote(c) for c in cmd])
+        )
+
+        proc = subprocess.Popen(
+            cmd,
+            stdin=None if self._reads_stdin() else subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        assert proc.stdout is not None and proc.stderr is not None
+        self.stats.add_ffmpeg_process(proc.pid)
+
+        # drain stderr in the background so that ffmpeg never blocks on it,
+        # keeping only the last lines so that memory stays bounded on long runs
+        stderr_chunks: deque[bytes] = deque(maxlen=self.STDERR_LINES)
+        stderr_thread = threading.Thread(
+            target=lambda: stderr_chunks.extend(proc.stderr or []), daemon=True
+        )
+        stderr_thread.start()
+
+        parser = MetadataParser(
+            frame_step=(profile or {}).get("frame_step", 1), metadata=metadata
+        )
+
+        # CPU time of this thread is spent parsing, not waiting for ffmpeg
+        parse_time = 0.0
+        frames = 0
+        completed = False
+        try:
+            while True:
+                # returns as soon as any output is available
+                data = os.read(proc.stdout.fileno(), self.READ_SIZE)
+                parse_start = time.thread_time()
+                if data:
+                    parser.feed(data)
+                else:
+                    parser.close()
+                parse_time += time.thread_time() - parse_start
+
+                if len(parser.timeline):
+                    frames += len(parser.timeline)
+                    yield parser.timeline
+                    parser.timeline = ScoreTimeline()
+                if not data:
+                    break
+            completed = True
+        finally:
+            if not completed and proc.poll() is None:
+                proc.kill()
+            # read before waiting, as the process is gone afterwards
+            input_bytes = read_process_io_bytes(proc.pid)
+            proc.wait()
+            stderr_thread.join()
+            proc.stdout.close()
+            proc.stderr.close()
+            self.stats.add_frames(frames, input_bytes)
+            self.stats.add_stage("parse", parse_time, parse_time)
+
+        if proc.returncode != 0:
+            stderr = b"".join(stderr_chunks).decode("utf-8", errors="replace")
+            raise RuntimeError(f"Error running command {cmd}: " + stderr.strip())
+
+    def extract_scenes(
+        self,
+        output_directory: str,
+        no_copy: bool = False,
+        progress: bool = False,
+        output_extension: Optional[str] = None,
+        single_pass: bool = True,
+        workers: int = 1,
+        threads: Optional[int] = None,
+        smart_cut: bool = False,
+    ):
+        """
+        Extract all scenes to individual files.
+
+        Args:
+            output_directory (str): Output directory.
+            no_copy (bool, optional): Do not copy the streams, reencode them. Defaults to False.
+            progress (bool, optional): Show progress bar. Defaults to False.
+            output_extension (str, optional): Output file extension (e.g., ".mp4"). Defaults to input file extension.
+            single_pass (bool, optional): When stream-copying, split the input with a single ffmpeg process
+                instead of running one process per scene. Defaults to True.
+            workers (int, optional): Number of scenes to extract in parallel. Defaults to 1.
+            threads (int, optional): Number of threads per ffmpeg process. Defaults to ffmpeg's choice.
+            smart_cut (bool, optional): Cut frame-accurately, re-encoding only the frames before the first
+                and after the last keyframe of each scene; see `smart_cut_part_from_file()`. Defaults to False.
+
+        Raises:
+            ValueError: if both `no_copy` and `smart_cut` are set
+            RuntimeError: if extracting one or more scenes failed (all other scenes are still extracted)
+        """
+        if self.scenecuts is None:
+            raise RuntimeError("No scene cuts calculated yet")
+
+        if smart_cut:
+            if no_copy:
+                raise ValueError("Smart cutting and re-encoding are mutually exclusive")
+            codec = self.get_keyframe_index().codec
+            if codec not in SMART_CUT_ENCODERS:
+                logger.warning(
+                    f"Smart cutting is not supported for {codec} video, re-encoding scenes"
+                )
+                smart_cut, no_copy = False, True
+
+        with self.stats.stage("extract", ffmpeg=True):
+            self._extract_scenes(
+                output_directory,
+                no_copy,
+                progress,
+                output_extension,
+                single_pass,
+                workers,
+                threads,
+                smart_cut,
+            )
+
+    def _extract_scenes(
+        self,
+        output_directory: str,
+        no_copy: bool,
+        progress: bool,
+        output_extension: Optional[str],
+        single_pass: bool,
+        workers: int,
+        threads: Optional[int],
+        smart_cut: bool = False,
+    ):
+        """
+        Extract all scenes to individual files; see `extract_scenes()` for the arguments.
+        """
+        cut_times = self._get_cut_times()
+
+        if not os.path.exists(output_directory):
+            os.makedirs(output_directory, exist_ok=True)
+
+        if (
+            not no_copy
+            and not smart_cut
+            and single_pass
+            and len(cut_times) > 1
+            and self._split_scenes_single_pass(
+                output_directory,
+                cut_times,
+                progress,
+                output_extension,
+            )
+        ):
+            return
+
+        if workers > 1:
+            self._extract_scenes_parallel(
+                output_directory,
+                list(zip(cut_times, cut_times[1:])),
+                no_copy,
+                progress,
+                output_extension,
+                workers,
+                threads,
+                smart_cut,
+            )
+            return
+
+        for start, end in zip(cut_times, cut_times[1:]):
+            self._cut_scene(
+                output_directory,
+                start,
+                end,
+                no_copy,
+                smart_cut,
+                progress,
+                output_extension,
+                threads,
+            )
+
+    def _get_cut_times(self) -> list[float]:
+        """
+        Get the start times of all scenes to extract, and the end time of the last one.
+
+        Scenes start at the beginning of the input, or of the analyzed time range,
+        and the last one ends at the last cut, or at the end of the time range.
+
+        Returns:
+            list[float]: the cut times
+        """
+        assert self.scenecuts is not None
+
+        start, end = self.time_range or (0.0, None)
+        # a cut at the first frame of the range would be an empty scene
+        cut_times = [start] + [
+            t for t in self.scenecuts.pts_time.tolist() if t > start + TIME_TOLERANCE
+        ]
+        if end is not None:
+            cut_times.append(end)
+        return cut_times
+
+    def _cut_scene(
+        self,
+        output_directory: str,
+        start: float,
+        end: float,
+        no_copy: bool,
+        smart_cut: bool,
+        progress: bool,
+        output_extension: Optional[str],
+        threads: Optional[int],
+        progress_callback: Optional[Callable[[float], None]] = None,
+    ) -> None:
+        """
+        Extract a single scene with `cut_part_from_file()` or `smart_cut_part_from_file()`.
+        """
+        if smart_cut:
+            self.smart_cut_part_from_file(
+                output_directory,
+                start,
+                end,
+                progress,
+                output_extension,
+                threads,
+                progress_callback,
+            )
+            return
+
+        cmd = self._get_cut_command(
+            self.input_file,
+            output_directory,
+            start,
+            end,
+            no_copy,
+            self.ffmpeg_path,
+            output_extension,
+            threads,
+        )
+        self._run_ffmpeg(cmd, progress, progress_callback)
+
+    def _run_ffmpeg(
+        self,
+        cmd: list[str],
+        progress: bool = False,
+        progress_callback: Optional[Callable[[float], None]] = None,
+    ) -> None:
+        """
+        Run an ffmpeg command with `FfmpegProgress`, counting the process once it has started.
+
+        The process is counted with its PID, so that stats hooks can stop it, e.g.
+        when a job of the service is cancelled.
+
+        Args:
+            cmd (list[str]): the command
+            progress (bool, optional): Show progress bar. Defaults to False.
+            progress_callback (Callable[[float], None], optional): Called with the progress in percent.
+
+        Raises:
+            RuntimeError: if ffmpeg fails
+        """
+        cmd_q = " ".join([shlex.quote(c) for c in cmd])
+        logger.debug("Running ffmpeg command: {}".format(cmd_q))
+
+        ff = FfmpegProgress(cmd)
+        started = False
+        with tqdm(total=100, position=1, disable=not progress) as pbar:
+            for p in ff.run_command_with_progress():
+                if not started:
+                    # the process exists from the first progress update on
+                    started = True
+                    self.stats.add_ffmpeg_process(
+                        ff.process.pid if ff.process is not None else None
+                    )
+                pbar.update(p - pbar.n)
+                if progress_callback is not None:
+                    progress_callback(p)
+
+    def _extract_scenes_parallel(
+        self,
+        output_directory: str,
+        scenes: list[tuple[float, float]],
+        no_copy: bool,
+        progress: bool,
+        output_extension: Optional[str],
+        workers: int,
+        threads: Optional[int],
+        smart_cut: bool = False,
+    ):
+        """
+        Extract scenes with a bounded pool of ffmpeg processes.
+
+        The longest scenes are scheduled first, so that no long scene is left
+        running on its own at the end. A failing scene does not stop the others.
+
+        Args:
+            output_directory (str): Output directory.
+            scenes (list[tuple[float, float]]): Start and end time of each scene.
+            no_copy (bool): Do not copy the streams, reencode them.
+            progress (bool): Show a single progress bar for all scenes.
+            output_extension (str, optional): Output file extension (e.g., ".mp4").
+            workers (int): Number of scenes to extract in parallel.
+            threads (int, optional): Number of threads per ffmpeg process.
+            smart_cut (bool, optional): Cut frame-accurately with `smart_cut_part_from_file()`.
+
+        Raises:
+            RuntimeError: if extracting one or more scenes failed
+        """
+        scenes = sorted(scenes, key=lambda scene: scene[1] - scene[0], reverse=True)
+        total_duration = sum(end - start for start, end in scenes)
+
+        lock = threading.Lock()
+        failures: list[tuple[float, float, Exception]] = []
+
+        with tqdm(
+            total=round(total_duration, 3), position=1, unit="s", disable=not progress
+        ) as pbar:
+
+            def extract_scene(start: float, end: float) -> None:
+                done = 0.0
+
+                def on_progress(p: float) -> None:
+                    nonlocal done
+                    with lock:
+                        seconds = (end - start) * p / 100
+                        pbar.update(seconds - done)
+                        done = seconds
+
+                try:
+                    self._cut_scene(
+                        output_directory,
+                        start,
+                        end,
+                        no_copy,
+                        smart_cut,
+                        False,
+                        output_extension,
+                        threads,
+                        on_progress,
+                    )
+                except Exception as e:
+                    logger.error(f"Failed to extract scene {start:.3f}-{end:.3f}: {e}")
+                    with lock:
+                        failures.append((start, end, e))
+                finally:
+                    on_progress(100)
+
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for start, end in scenes:
+                    executor.submit(extract_scene, start, end)
+
+        if failures:
+            raise RuntimeError(
+                f"Failed to extract {len(failures)} of {len(scenes)} scenes: "
+                + ", ".join(f"{start:.3f}-{end:.3f}" for start, end, _ in failures)
+            )
+
+    def smart_cut_part_from_file(
+        self,
+        output_directory: str,
+        start: float,
+        end: float,
+        progress: bool = False,
+        output_extension: Optional[str] = None,
+        threads: Optional[int] = None,
+        progress_callback: Optional[Callable[[float], None]] = None,
+    ) -> None:
+        """
+        Cut a part of the input frame-accurately, re-encoding as few frames as possible.
+
+        Using the keyframe index (see `get_keyframe_index()`), the frames from the start
+        to the first keyframe and from the last keyframe to the end are re-encoded, and the
+        complete GOPs in between are stream-copied. The parts are then joined, and the audio
+        is stream-copied from the input. Only the first video stream and the audio streams
+        are kept. Requires closed GOPs, which most encoders produce by default.
+
+        Args:
+            output_directory (str): Output directory.
+            start (float): Start time.
+            end (float): End time.
+            progress (bool, optional): Show progress bar. Defaults to False.
+            output_extension (str, optional): Output file extension (e.g., ".mp4"). Defaults to input file extension.
+            threads (int, optional): Number of threads ffmpeg may use. Defaults to ffmpeg's choice.
+            progress_callback (Callable[[float], None], optional): Called with the progress in percent.
+
+        Raises:
+            ValueError: if the codec of the input is not supported
+            RuntimeError: if ffmpeg fails
+        """
+        with tempfile.TemporaryDirectory(dir=output_directory) as temp_dir:
+            cmds = self._get_smart_cut_commands(
+                self.get_keyframe_index(),
+                output_directory,
+                temp_dir,
+                start,
+                end,
+                output_extension,
+                threads,
+            )
+            with tqdm(total=100, position=1, disable=not progress) as pbar:
+                for i, cmd in enumerate(cmds):
+
+                    def on_progress(p: float, i: int = i) -> None:
+                        total = (i * 100 + p) / len(cmds)
+                        pbar.update(total - pbar.n)
+                        if progress_callback is not None:
+                            progress_callback(total)
+
+                    self._run_ffmpeg(cmd, progress_callback=on_progress)
+
+    def _get_smart_cut_commands(
+        self,
+        keyframe_index: KeyframeIndex,
+        output_directory: str,
+        temp_dir: str,
+        start: float,
+        end: float,
+        output_extension: Optional[str] = None,
+        threads: Optional[int] = None,
+    ) -> list[list[str]]:
+        """
+        Get the ffmpeg commands that smart-cut a part of the input.
+
+        Writes the list of parts for the concat demuxer to `temp_dir`. The commands
+        must be run in order; the parts are written to `temp_dir` as well.
+
+        Args:
+            keyframe_index (KeyframeIndex): Keyframe index of the input.
+            output_directory (str): Output directory.
+            temp_dir (str): Directory for the parts.
+            start (float): Start time.
+            end (float): End time.
+            output_extension (str, optional): Output file extension (e.g., ".mp4").
+            threads (int, optional): Number of threads ffmpeg may use.
+
+        Returns:
+            list[list[str]]: the commands for each part, and the command that joins them
+
+        Raises:
+            ValueError: if the codec of the input is not supported
+            RuntimeError: if there are no frames between start and end
+        """
+        if keyframe_index.codec not in SMART_CUT_ENCODERS:
+            raise ValueError(
+                f"Smart cutting is not supported for {keyframe_index.codec} video"
+            )
+        parts = keyframe_index.plan(start, end)
+        if not parts:
+            raise RuntimeError(f"No frames between {start:.3f} and {end:.3f}")
+
+        cmds = []
+        part_files = []
+        for i, part in enumerate(parts):
+            if part["copy"]:
+                # ffmpeg starts copying at the last keyframe before the seek position
+                seek = part["start"] + TIME_TOLERANCE / 2
+                codec_args = ["-c", "copy"]
+            else:
+                # ffmpeg decodes from the last keyframe, but only keeps frames after the seek position
+                seek = max(0.0, part["start"] - TIME_TOLERANCE / 2)
+                codec_args = [
+                    *SMART_CUT_ENCODERS[keyframe_index.codec],
+                    *(["-threads", str(threads)] if threads else []),
+                ]
+            part_file = f"part_{i:06d}.mkv"
+            part_files.append(part_file)
+            cmds.append(
+                [
+                    self.ffmpeg_path,
+                    "-hide_banner",
+                    "-y",
+                    "-ss",
+                    str(seek),
+                    "-i",
+                    self.input_file,
+                    "-map",
+                    "0:v:0",
+                    "-frames:v",
+                    str(part["frames"]),
+                    *codec_args,
+                    os.path.join(temp_dir, part_file),
+                ]
+            )
+
+        # relative paths are resolved against the directory of the list
+        list_file = os.path.join(temp_dir, "parts.txt")
+        with open(list_file, "w") as f:
+            f.writelines(f"file '{part_file}'\n" for part_file in part_files)
+
+        cmds.append(
+            [
+                self.ffmpeg_path,
+                "-hide_banner",
+                "-y",
+                "-f",
+                "concat",
+                "-safe",
+                "0",
+                "-i",
+                list_file,
+                "-ss",
+                str(start),
+                "-t",
+                str(end - start),
+                "-i",
+                self.input_file,
+                "-map",
+                "0:v",
+                "-map",
+                "1:a?",
+                "-c",
+                "copy",
+                self.get_scene_file_path(
+                    self.input_file, output_directory, start, end, output_extension
+                ),
+            ]
+        )
+        return cmds
+
+    def _split_scenes_single_pass(
+        self,
+        output_directory: str,
+        cut_times: list[float],
+        progress: bool = False,
+        output_extension: Optional[str] = None,
+    ) -> bool:
+        """
+        Split the input at all cut times with one ffmpeg process using the segment muxer.
+
+        The segment muxer can only split on keyframes, at the first keyframe at or
+        after each cut time. Unlike `cut_part_from_file()` in copy mode, which starts
+        at the keyframe before the cut, a scene would therefore start late, or take
+        the place of the next one if there is no keyframe between two cuts. So the
+        scenes are only kept if each one starts exactly at its cut time, i.e. if
+        all cuts are on keyframes; otherwise, or if there are too many cuts to pass
+        to ffmpeg, the input should be split per scene instead.
+
+        Args:
+            output_directory (str): Output directory.
+            cut_times (list[float]): Start times of all scenes, and the end time of the last scene.
+            progress (bool, optional): Show progress bar. Defaults to False.
+            output_extension (str, optional): Output file extension (e.g., ".mp4"). Defaults to input file extension.
+
+        Returns:
+            bool: True if all scenes were written, False if the input should be split per scene instead
+        """
+        output_files = [
+            self.get_scene_file_path(
+                self.input_file, output_directory, start, end, output_extension
+            )
+            for start, end in zip(cut_times, cut_times[1:])
+        ]
+        segment_extension = os.path.splitext(output_files[0])[1]
+
+        with tempfile.TemporaryDirectory(dir=output_directory) as temp_dir:
+            cmd = self._get_split_command(
+                cut_times,
+                os.path.join(temp_dir, "scene_%06d" + segment_extension),
+                os.path.join(temp_dir, self.SEGMENT_LIST),
+            )
+            if cmd is None:
+                return False
+
+            self._run_ffmpeg(cmd, progress)
+
+            return self._move_split_scenes(temp_dir, output_files, cut_times)
+
+    def _get_split_command(
+        self, cut_times: list[float], segment_pattern: str, segment_list: str
+    ) -> Optional[list[str]]:
+        """
+        Get the ffmpeg command that splits the input at all cut times with the segment muxer.
+
+        The timestamps of the input are kept (starting at zero, like those of the
+        analysis), so that the segment list holds the presentation time of the
+        first frame of each segment.
+
+        Args:
+            cut_times (list[float]): Start times of all scenes, and the end time of the last scene.
+            segment_pattern (str): Output file pattern for the segments, e.g. `scene_%06d.mp4`.
+            segment_list (str): Path of the CSV segment list to write.
+
+        Returns:
+            list[str], optional: the command, or None if the cut times are too long for a command line argument
+        """
+        # also split at the start of a time range, and discard the segment before it
+        segment_times = ",".join(
+            str(t) for t in (cut_times[:-1] if cut_times[0] > 0 else cut_times[1:-1])
+        )
+        if len(segment_times) > self.MAX_ARGUMENT_LENGTH:
+            logger.warning(
+                f"Too many scenes ({len(cut_times) - 1}) to split in a single pass, "
+                "extracting each scene separately"
+            )
+            return None
+
+        return [
+            self.ffmpeg_path,
+            "-hide_banner",
+            "-y",
+            "-copyts",
+            "-start_at_zero",
+            "-i",
+            self.input_file,
+            "-t",
+            str(cut_times[-1]),
+            "-c",
+            "copy",
+            "-map",
+            "0",
+            # otherwise, timestamps are shifted by the delay of B-frames
+            "-avoid_negative_ts",
+            "disabled",
+            "-f",
+            "segment",
+            "-segment_times",
+            segment_times,
+            "-segment_list",
+            segment_list,
+            "-segment_list_type",
+            "csv",
+            "-reset_timestamps",
+            "1",
+            segment_pattern,
+        ]
+
+    @classmethod
+    def _move_split_scenes(
+        cls, temp_dir: str, output_files: list[str], cut_times: list[float]
+    ) -> bool:
+        """
+        Move the segments written by the segment muxer to their final paths.
+
+        Args:
+            temp_dir (str): Directory containing the segments and the segment list.
+            output_files (list[str]): Final path of each scene.
+            cut_times (list[float]): Start times of all scenes, and the end time of the last scene.
+
+        Returns:
+            bool: True if all scenes were moved, False if the segments do not start at the cut times
+        """
+        with open(os.path.join(temp_dir, cls.SEGMENT_LIST), newline="") as f:
+            segments = [(row[0], float(row[1])) for row in csv.reader(f) if row]
+        if cut_times[0] > 0:
+            # the segment before the start of the time range
+            segments = segments[1:]
+
+        if len(segments) != len(output_files) or any(
+            abs(start - cut_time) > TIME_TOLERANCE
+            for (_, start), cut_time in zip(segments, cut_times)
+        ):
+            # happens if a cut is not on a keyframe
+            logger.warning(
+                "Not all scene cuts are on keyframes, "
+                "falling back to extracting each scene separately"
+            )
+            return False
+
+        for (segment_file, _), output_file in zip(segments, output_files):
+            os.replace(os.path.join(temp_dir, segment_file), output_file)
+
+        return True
+
+    def extract_thumbnails(
+        self,
+        output_directory: str,
+        positions: Optional[Iterable[str]] = None,
+        width: Optional[int] = None,
+        image_format: str = "jpg",
+        progress: bool = False,
+    ) -> list[str]:
+        """
+        Write still images of all scenes, decoding the input once.
+
+        ffmpeg selects the frames of all scenes in a single pass and writes them as
+        images, which are then named after their scene; see `get_thumbnail_file_path()`.
+        To write the images of the first frames while calculating the scene cuts,
+        pass `thumbnails` to `calculate_scenecuts()` instead.
+
+        Args:
+            output_directory (str): Output directory.
+            positions (Iterable[str], optional): Frames of each scene to write, out of
+                `THUMBNAIL_POSITIONS`. Defaults to the first frame.
+            width (int, optional): Downscale the images to this width. Defaults to the input width.
+            image_format (str, optional): Image format, one of `THUMBNAIL_FORMATS`. Defaults to "jpg".
+            progress (bool, optional): Show progress bar. Defaults to False.
+
+        Returns:
+            list[str]: the written files, per scene and position
+
+        Raises:
+            ValueError: if an option is invalid
+            RuntimeError: if no scene cuts have been calculated yet, they were calculated for a
+                time range or stream, or ffmpeg fails
+        """
+        if self.scenecuts is None:
+            raise RuntimeError("No scene cuts calculated yet")
+        if self.time_range is not None or self.stream is not None:
+            # frame numbers count from the start of the range, but the images are
+            # selected by their number in the default stream of the whole input
+            raise RuntimeError(
+                "Thumbnails are not supported for scene cuts of a time range or stream"
+            )
+
+        options: ThumbnailOptions = {
+            "output_directory": output_directory,
+            "image_format": image_format,
+        }
+        if positions is not None:
+            options["positions"] = list(positions)
+        if width is not None:
+            options["width"] = width
+        options = resolve_thumbnail_options(options)
+        os.makedirs(output_directory, exist_ok=True)
+
+        plan = self._get_thumbnail_plan(self.get_timeline(), self.scenecuts, options)
+        with self.stats.stage("thumbnails", ffmpeg=True):
+            return self._extract_thumbnails(plan, options, progress)
+
+    def _extract_thumbnails(
+        self,
+        plan: list[tuple[int, str]],
+        options: ThumbnailOptions,
+        progress: bool = False,
+    ) -> list[str]:
+        """
+        Write the images of the given frames with one ffmpeg process.
+
+        Args:
+            plan (list[tuple[int, str]]): Frame numbers and the paths of their images
+            options (ThumbnailOptions): Resolved thumbnail options
+            progress (bool, optional): Show progress bar. Defaults to False.
+
+        Returns:
+            list[str]: the written files
+
+        Raises:
+            RuntimeError: if ffmpeg fails or writes another number of images
+        """
+        frames = sorted({frame for frame, _ in plan})
+        if not frames:
+            return []
+
+        with tempfile.TemporaryDirectory(dir=options["output_directory"]) as temp_dir:
+            # the expression grows with the number of frames, and would exceed the
+            # maximum length of a single command line argument for many frames
+            filter_file = os.path.join(temp_dir, "filter.txt")
+            with open(filter_file, "w") as f:
+                f.write(
+                    ",".join(
+                        [
+                            "select=" + get_frame_select_expr(frames),
+                            *get_thumbnail_filters(options.get("width")),
+                        ]
+                    )
+                )
+            # keep the images apart, so that only they are counted
+            image_dir = os.path.join(temp_dir, "images")
+            os.mkdir(image_dir)
+            cmd = [
+                self.ffmpeg_path,
+                "-hide_banner",
+                "-y",
+                "-i",
+                self.input_file,
+                "-filter_script:v",
+                filter_file,
+                "-an",
+                *self._get_thumbnail_output_args(options["image_format"], image_dir),
+            ]
+
+            self._run_ffmpeg(cmd, progress)
+
+            written = self._move_thumbnails(image_dir, frames, plan)
+            if written is None:
+                raise RuntimeError(
+                    f"Could not write the images of {len(frames)} frames"
+                )
+            return written
+
+    @staticmethod
+    def _get_thumbnail_output_args(
+        image_format: str, output_directory: str
+    ) -> list[str]:
+        """
+        Get the ffmpeg output options that write each frame as a numbered image.
+
+        Args:
+            image_format (str): Image format, one of `THUMBNAIL_FORMATS`
+            output_directory (str): Directory to write the images to
+
+        Returns:
+            list[str]: the output options, including the output file pattern
+        """
+        return [
+            # one image per selected frame, without duplicating or dropping any
+            "-fps_mode",
+            "passthrough",
+            *THUMBNAIL_FORMATS[image_format],
+            os.path.join(output_directory, "thumbnail_%06d." + image_format),
+        ]
+
+    def _get_thumbnail_plan(
+        self,
+        timeline: ScoreTimeline,
+        scenecuts: ScenecutTable,
+        options: ThumbnailOptions,
+    ) -> list[tuple[int, str]]:
+        """
+        Get the frames to write as images, and the paths of the images.
+
+        Args:
+            timeline (ScoreTimeline): the scores of all frames
+            scenecuts (ScenecutTable): the scene cuts
+            options (ThumbnailOptions): Resolved thumbnail options
+
+        Returns:
+            list[tuple[int, str]]: frame numbers and the paths of their images, per scene and position
+        """
+        # positions of the first frames of all scenes in the timeline
+        starts = sorted(
+            {0, *(bisect_left(timeline.frames, frame) for frame in scenecuts.frames)}
+        )
+        plan: list[tuple[int, str]] = []
+        for start, end in zip(starts, [*starts[1:], len(timeline)]):
+            if start >= end:
+                continue
+            indices = {"start": start, "middle": (start + end - 1) // 2, "end": end - 1}
+            for position in options["positions"]:
+                plan.append(
+                    (
+                        timeline.frames[indices[position]],
+                        self.get_thumbnail_file_path(
+                            self.input_file,
+                            options["output_directory"],
+                            timeline.pts_time[start],
+                            position,
+                            options["image_format"],
+                        ),
+                    )
+                )
+        return plan
+
+    @staticmethod
+    def _move_thumbnails(
+        temp_dir: str, frames: list[int], plan: list[tuple[int, str]]
+    ) -> Optional[list[str]]:
+        """
+        Move the images written by ffmpeg to their final paths.
+
+        Args:
+            temp_dir (str): Directory containing only the images, one per frame in `frames`.
+            frames (list[int]): Frame numbers of the images, in order.
+            plan (list[tuple[int, str]]): Frame numbers and the final paths of their images.
+
+        Returns:
+            list[str], optional: the final paths, or None if the number of images does not match
+        """
+        image_files = sorted(os.listdir(temp_dir))
+        if len(image_files) != len(frames):
+            logger.warning(
+                f"Expected {len(frames)} images, but ffmpeg wrote {len(image_files)}"
+            )
+            return None
+
+        images = dict(zip(frames, image_files))
+        for frame, output_file in plan:
+            # the same frame can be the image of several positions in short scenes
+            shutil.copyfile(os.path.join(temp_dir, images[frame]), output_file)
+        return [output_file for _, output_file in plan]
+
+    @staticmethod
+    def get_scene_file_path(
+        input_file: str,
+        output_directory: str,
+        start: float,
+        end: Union[float, Literal[""]],
+        output_extension: Optional[str] = None,
+    ) -> str:
+        """
+        Get the path of the file that a scene is extracted to.
+
+        Args:
+            input_file (str): Input file.
+            output_directory (str): Output directory.
+            start (float): Start time.
+            end (Union[float, Literal[""]]): End time.
+            output_extension (str, optional): Output file extension (e.g., ".mp4"). Defaults to input file extension.
+
+        Returns:
+            str: the output file path, named `<prefix>_<start>-<end><ext>`
+        """
+        # Use provided extension or default to input file's extension
+        if output_extension is None:
+            output_extension = os.path.splitext(input_file)[1]
+        elif not output_extension.startswith("."):
+            output_extension = "." + output_extension
 
         prefix = os.path.splitext(os.path.basename(input_file))[0]
         suffix = f"{start:.3f}-{end:.3f}{output_extension}"
-        output_file = os.path.join(output_directory, f"{prefix}_{suffix}")
+        return os.path.join(output_directory, f"{prefix}_{suffix}")
+
+    @staticmethod
+    def get_thumbnail_file_path(
+        input_file: str,
+        output_directory: str,
+        start: float,
+        position: str,
+        image_format: str = "jpg",
+    ) -> str:
+        """
+        Get the path of the image of a scene.
+
+        Args:
+            input_file (str): Input file.
+            output_directory (str): Output directory.
+            start (float): Start time of the scene.
+            position (str): Position of the frame in the scene, one of `THUMBNAIL_POSITIONS`.
+            image_format (str, optional): Image format. Defaults to "jpg".
 
-        cmd = [
+        Returns:
+            str: the output file path, named `<prefix>_<start>_<position>.<format>`
+        """
+        prefix = os.path.splitext(os.path.basename(input_file))[0]
+        return os.path.join(
+            output_directory, f"{prefix}_{start:.3f}_{position}.{image_format}"
+        )
+
+    @staticmethod
+    def _get_cut_command(
+        input_file: str,
+        output_directory: str,
+        start: Union[float, None] = None,
+        end: Union[float, None, Literal[""]] = None,
+        no_copy: bool = False,
+        ffmpeg_path: str = "ffmpeg",
+        output_extension: Optional[str] = None,
+        threads: Optional[int] = None,
+    ) -> list[str]:
+        """
+        Get the ffmpeg command that cuts a part of a video.
+
+        See `cut_part_from_file()` for the arguments.
+
+        Returns:
+            list[str]: the command
+        """
+        if start is None:
+            start = 0
+
+        if end is not None and end != "":
+            to_args = ["-t", str(end - start)]
+        else:
+            end = ""
+            to_args = []
+
+        if no_copy:
+            codec_args = ["-c:v", "libx264", "-c:a", "aac"]
+        else:
+            codec_args = ["-c", "copy"]
+
+        output_file = ScenecutExtractor.get_scene_file_path(
+            input_file, output_directory, start, end, output_extension
+        )
+
+        return [
             ffmpeg_path,
             "-hide_banner",
             "-y",
@@ -313,11 +2734,53 @@ class ScenecutExtractor:
             input_file,
             *to_args,
             *codec_args,
+            *(["-threads", str(threads)] if threads else []),
             "-map",
             "0",
             output_file,
         ]
 
+    @staticmethod
+    def cut_part_from_file(
+        input_file: str,
+        output_directory: str,
+        start: Union[float, None] = None,
+        end: Union[float, None, Literal[""]] = None,
+        no_copy: bool = False,
+        progress: bool = False,
+        ffmpeg_path: str = "ffmpeg",
+        output_extension: Optional[str] = None,
+        threads: Optional[int] = None,
+        progress_callback: Optional[Callable[[float], None]] = None,
+    ):
+        """
+        Cut a part of a video.
+
+        Args:
+            input_file (str): Input file.
+            output_directory (str): Output directory.
+            start (Union[float, None], optional): Start time. Defaults to None.
+            end (Union[float, None, Literal[""]], optional): End time. Defaults to None.
+            no_copy (bool, optional): Do not copy the streams, reencode them. Defaults to False.
+            progress (bool, optional): Show progress bar. Defaults to False.
+            ffmpeg_path (str, optional): Path to ffmpeg executable. Defaults to "ffmpeg".
+            output_extension (str, optional): Output file extension (e.g., ".mp4"). Defaults to input file extension.
+            threads (int, optional): Number of threads ffmpeg may use. Defaults to ffmpeg's choice.
+            progress_callback (Callable[[float], None], optional): Called with the progress in percent.
+
+        FIXME: This has been copy-pasted from ffmpeg-black-split.
+        """
+        cmd = ScenecutExtractor._get_cut_command(
+            input_file,
+            output_directory,
+            start,
+            end,
+            no_copy,
+            ffmpeg_path,
+            output_extension,
+            threads,
+        )
+
         cmd_q = " ".join([shlex.quote(c) for c in cmd])
         logger.debug("Running ffmpeg command: {}".format(cmd_q))
 
@@ -327,5 +2790,6 @@ class ScenecutExtractor:
                 for p in ff.run_command_with_progress():
                     pbar.update(p - pbar.n)
         else:
-            for _ in ff.run_command_with_progress():
-                pass
+            for p in ff.run_command_with_progress():
+                if progress_callback is not None:
+                    progress_callback(p)
@@ -0,0 +1,656 @@
+from __future__ import annotations
+
+import hmac
+import itertools
+import json
+import logging
+import os
+import queue
+import signal
+import socket
+import socketserver
+import stat
+import threading
+import time
+import uuid
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import TYPE_CHECKING, Any, Optional, TypedDict, Union
+from urllib.parse import parse_qs, urlsplit
+
+from ._detectors import DetectorEvent
+from ._scenecut_extractor import ScenecutExtractor, ScenecutInfo
+
+if TYPE_CHECKING:
+    from ._cache import ScoreCache
+
+logger = logging.getLogger("scenecut-extractor")
+
+JOB_TYPES = ("detect", "extract")
+"""Job types: `detect` calculates the scene cuts, `extract` also extracts the scenes"""
+
+# keyword arguments that jobs may pass to calculate_scenecuts() and extract_scenes();
+# not `workers`, so that each job runs one ffmpeg process at a time
+CALCULATE_OPTIONS = {
+    "threshold",
+    "min_scene_length",
+    "profile",
+    "detectors",
+    "backend",
+    "postprocessing",
+    "thumbnails",
+    "two_pass",
+    "start",
+    "end",
+    "stream",
+}
+EXTRACT_OPTIONS = {
+    "output_directory",
+    "no_copy",
+    "output_extension",
+    "single_pass",
+    "threads",
+    "smart_cut",
+}
+
+
+class JobInfo(TypedDict):
+    id: str
+    """The job ID"""
+    type: str
+    """The job type, one of `JOB_TYPES`"""
+    input: str
+    """The input file"""
+    priority: int
+    """Jobs with a higher priority run first"""
+    status: str
+    """One of `queued`, `running`, `done`, `failed` or `cancelled`"""
+    submitted: float
+    """Submission time, as a Unix timestamp"""
+    started: Optional[float]
+    """Start time, as a Unix timestamp"""
+    finished: Optional[float]
+    """End time, as a Unix timestamp"""
+    error: Optional[str]
+    """The error message, if the job failed"""
+    scenecuts: Optional[list[ScenecutInfo]]
+    """The scene cuts, as returned by `get_as_json()`, once the job is done"""
+    events: Optional[dict[str, list[DetectorEvent]]]
+    """The events of the detectors, if any were run"""
+    stats: Optional[dict[str, Any]]
+    """Timing and resource usage, see `RunStats`"""
+
+
+class JobCancelledError(RuntimeError):
+    """Raised in a job that was cancelled while it was running."""
+
+
+class Job:
+    """
+    A detect or extract job, and its state.
+    """
+
+    def __init__(
+        self,
+        job_type: str,
+        input_file: str,
+        priority: int = 0,
+        calculate_args: Optional[dict[str, Any]] = None,
+        extract_args: Optional[dict[str, Any]] = None,
+    ) -> None:
+        """
+        Create a new Job instance.
+
+        Args:
+            job_type (str): One of `JOB_TYPES`
+            input_file (str): the input file
+            priority (int, optional): Jobs with a higher priority run first. Defaults to 0.
+            calculate_args (dict, optional): Arguments for `ScenecutExtractor.calculate_scenecuts()`.
+            extract_args (dict, optional): Arguments for `ScenecutExtractor.extract_scenes()`.
+        """
+        self.info: JobInfo = {
+            "id": uuid.uuid4().hex,
+            "type": job_type,
+            "input": input_file,
+            "priority": priority,
+            "status": "queued",
+            "submitted": time.time(),
+            "started": None,
+            "finished": None,
+            "error": None,
+            "scenecuts": None,
+            "events": None,
+            "stats": None,
+        }
+        self.calculate_args = calculate_args or {}
+        self.extract_args = extract_args
+        self.done = threading.Event()
+        """Set when the job has finished, failed or was cancelled"""
+        self.cancelled = False
+        self._pids: set[int] = set()
+        self._lock = threading.Lock()
+
+    @property
+    def id(self) -> str:
+        return self.info["id"]
+
+    def cancel(self) -> None:
+        """
+        Cancel the job, stopping the ffmpeg processes it is running.
+        """
+        with self._lock:
+            self.cancelled = True
+            pids = list(self._pids)
+        for pid in pids:
+            _kill(pid)
+
+    def on_stats_event(self, event: str, data: dict[str, Any]) -> None:
+        """
+        Track the ffmpeg processes of the job, see `StatsHook`.
+
+        Raises:
+            JobCancelledError: if an ffmpeg process without a known PID is started after the job was cancelled
+        """
+        if event != "ffmpeg":
+            return
+        pid = data.get("pid")
+        with self._lock:
+            if pid is not None and not self.cancelled:
+                self._pids.add(pid)
+                return
+        if not self.cancelled:
+            return
+        if pid is None:
+            # the process is only started after the event
+            raise JobCancelledError("Job was cancelled")
+        _kill(pid)
+
+    def finish(self) -> None:
+        """
+        Mark the job as done and forget its processes.
+        """
+        with self._lock:
+            self._pids.clear()
+        self.done.set()
+
+
+def _kill(pid: int) -> None:
+    try:
+        os.kill(pid, signal.SIGTERM)
+    except OSError:
+        # already finished
+        pass
+
+
+class JobQueue:
+    """
+    Runs detect and extract jobs on a bounded pool of worker threads.
+
+    Jobs wait in a priority queue; among jobs of the same priority, the oldest
+    runs first. Each worker runs one job at a time, and jobs can not set their own
+    `workers`, so `workers` bounds the number of concurrent ffmpeg processes.
+    Finished jobs are kept for `history` jobs, so that their results can be
+    retrieved.
+    """
+
+    DEFAULT_WORKERS: int = 2
+    DEFAULT_MAX_QUEUE: int = 1000
+    DEFAULT_HISTORY: int = 1000
+    THROUGHPUT_WINDOW: float = 60.0
+
+    def __init__(
+        self,
+        workers: int = DEFAULT_WORKERS,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        ffmpeg_path: str = "ffmpeg",
+        cache: Optional[ScoreCache] = None,
+        history: int = DEFAULT_HISTORY,
+    ) -> None:
+        """
+        Create a new JobQueue instance.
+
+        Args:
+            workers (int, optional): Number of jobs that run at the same time. Defaults to 2.
+            max_queue (int, optional): Maximum number of waiting jobs. Defaults to 1000.
+            ffmpeg_path (str, optional): Path to ffmpeg executable. Defaults to "ffmpeg".
+            cache (ScoreCache, optional): Cache for per-frame scores, shared by all jobs.
+            history (int, optional): Number of finished jobs to keep. Defaults to 1000.
+
+        Raises:
+            ValueError: if `workers` or `max_queue` is less than 1
+        """
+        if workers < 1 or max_queue < 1:
+            raise ValueError("workers and max_queue must be at least 1")
+        self.workers = workers
+        self.max_queue = max_queue
+        self.ffmpeg_path = ffmpeg_path
+        self.cache = cache
+        self.jobs: dict[str, Job] = {}
+        self._queue: queue.PriorityQueue[tuple[int, int, Optional[Job]]] = (
+            queue.PriorityQueue()
+        )
+        self._sequence = itertools.count()
+        self._finished: deque[str] = deque()
+        self._history = history
+        # end time and number of decoded frames of recently finished jobs
+        self._recent: deque[tuple[float, int]] = deque()
+        self._counts = dict.fromkeys(
+            ("queued", "running", "done", "failed", "cancelled"), 0
+        )
+        self._lock = threading.Lock()
+        self._threads: list[threading.Thread] = []
+        self._started = time.monotonic()
+
+    def start(self) -> None:
+        """
+        Start the worker threads.
+        """
+        self._started = time.monotonic()
+        for i in range(self.workers):
+            thread = threading.Thread(
+                target=self._work, name=f"scenecut-worker-{i}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self) -> None:
+        """
+        Cancel all queued and running jobs, and wait for the workers to exit.
+        """
+        with self._lock:
+            jobs = [job for job in self.jobs.values() if not job.done.is_set()]
+        for job in jobs:
+            self.cancel(job.id)
+        for _ in self._threads:
+            # sorts after all jobs
+            self._queue.put((1, 0, None))
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def submit(self, request: dict[str, Any]) -> Job:
+        """
+        Validate a job request and queue the job.
+
+        The request has the keys `type` (see `JOB_TYPES`, defaults to `detect`), `input`,
+        `priority` (defaults to 0), `options` (arguments for `calculate_scenecuts()`)
+        and, for `extract` jobs, `extract` (arguments for `extract_scenes()`,
+        including the `output_directory`).
+
+        Args:
+            request (dict): the job request
+
+        Returns:
+            Job: the queued job
+
+        Raises:
+            ValueError: if the request is invalid
+            RuntimeError: if the queue is full
+        """
+        if not isinstance(request, dict):
+            raise ValueError("Job request must be an object")
+        job_type = request.get("type", "detect")
+        if job_type not in JOB_TYPES:
+            raise ValueError(
+                f"No such job type: {job_type}, must be one of {', '.join(JOB_TYPES)}"
+            )
+        input_file = request.get("input")
+        if not isinstance(input_file, str) or not os.path.isfile(input_file):
+            raise ValueError(f"No such input file: {input_file}")
+        priority = request.get("priority", 0)
+        if not isinstance(priority, int):
+            raise ValueError("priority must be an integer")
+
+        calculate_args = _get_options(request, "options", CALCULATE_OPTIONS)
+        extract_args = None
+        if job_type == "extract":
+            extract_args = _get_options(request, "extract", EXTRACT_OPTIONS)
+            if "output_directory" not in extract_args:
+                raise ValueError("extract jobs require an output_directory")
+
+        job = Job(
+            job_type,
+            os.path.abspath(input_file),
+            priority,
+            calculate_args,
+            extract_args,
+        )
+        with self._lock:
+            if self._counts["queued"] >= self.max_queue:
+                raise RuntimeError("Queue is full")
+            self._counts["queued"] += 1
+            self.jobs[job.id] = job
+        self._queue.put((-priority, next(self._sequence), job))
+        logger.debug(f"Queued job {job.id} for {input_file}")
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """
+        Get a job by its ID.
+
+        Args:
+            job_id (str): the job ID
+
+        Returns:
+            Job, optional: the job, or None if it does not exist (anymore)
+        """
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """
+        Cancel a job. Queued jobs are removed, running jobs are stopped.
+
+        Args:
+            job_id (str): the job ID
+
+        Returns:
+            Job, optional: the job, or None if it does not exist (anymore)
+        """
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if job is None or job.done.is_set() or job.cancelled:
+                return job
+            if job.info["status"] == "queued":
+                # the worker that takes it from the queue skips it
+                self._set_status(job, "cancelled")
+                job.info["finished"] = time.time()
+                job.cancelled = True
+                self._retire(job)
+                job.finish()
+                return job
+        job.cancel()
+        return job
+
+    def get_stats(self) -> dict[str, Any]:
+        """
+        Get the queue depth and throughput.
+
+        Returns:
+            dict: the number of jobs per status, the number of workers, the uptime in
+                seconds, and the jobs per minute and decoded frames per second of the
+                jobs that were done within the last minute
+        """
+        now = time.monotonic()
+        with self._lock:
+            while self._recent and self._recent[0][0] < now - self.THROUGHPUT_WINDOW:
+                self._recent.popleft()
+            window = min(self.THROUGHPUT_WINDOW, now - self._started) or 1.0
+            return {
+                **self._counts,
+                "workers": self.workers,
+                "uptime": now - self._started,
+                "jobs_per_minute": len(self._recent) * 60 / window,
+                "frames_per_second": sum(frames for _, frames in self._recent) / window,
+            }
+
+    def _set_status(self, job: Job, status: str) -> None:
+        # must be called with the lock held
+        self._counts[job.info["status"]] -= 1
+        self._counts[status] += 1
+        job.info["status"] = status
+
+    def _retire(self, job: Job) -> None:
+        # must be called with the lock held; forget the oldest finished jobs
+        self._finished.append(job.id)
+        while len(self._finished) > self._history:
+            self.jobs.pop(self._finished.popleft(), None)
+
+    def _work(self) -> None:
+        while True:
+            _, _, job = self._queue.get()
+            if job is None:
+                return
+            with self._lock:
+                if job.info["status"] != "queued":
+                    continue
+                self._set_status(job, "running")
+                job.info["started"] = time.time()
+            self._run(job)
+
+    def _run(self, job: Job) -> None:
+        se = ScenecutExtractor(
+            job.info["input"], ffmpeg_path=self.ffmpeg_path, cache=self.cache
+        )
+        se.stats.add_hook(job.on_stats_event)
+        status, error = "done", None
+        try:
+            se.calculate_scenecuts(**job.calculate_args)
+            if job.extract_args is not None:
+                se.extract_scenes(**job.extract_args)
+            job.info["scenecuts"] = se.get_scenecut_table().to_list()
+            job.info["events"] = se.events
+        except Exception as e:
+            status, error = ("cancelled", None) if job.cancelled else ("failed", str(e))
+            if status == "failed":
+                logger.error(f"Job {job.id} failed: {e}")
+
+        with self._lock:
+            self._set_status(job, status)
+            job.info["error"] = error
+            job.info["finished"] = time.time()
+            job.info["stats"] = se.stats.to_dict()
+            if status == "done":
+                self._recent.append((time.monotonic(), se.stats.frames))
+            self._retire(job)
+        job.finish()
+
+
+def _get_options(
+    request: dict[str, Any], key: str, allowed: set[str]
+) -> dict[str, Any]:
+    options = request.get(key) or {}
+    if not isinstance(options, dict):
+        raise ValueError(f"{key} must be an object")
+    unknown = set(options) - allowed
+    if unknown:
+        raise ValueError(f"Unsupported {key}: {', '.join(sorted(unknown))}")
+    return options
+
+
+class JobRequestHandler(BaseHTTPRequestHandler):
+    """
+    JSON API of a `JobQueue`:
+
+    - `POST /jobs`: submit a job (see `JobQueue.submit()`), returns the job
+    - `GET /jobs`: all known jobs, without their results
+    - `GET /jobs/<id>`: a job; with `?wait=<seconds>`, wait for it to finish first
+    - `DELETE /jobs/<id>`: cancel a job
+    - `GET /stats`: queue depth and throughput, see `JobQueue.get_stats()`
+
+    Jobs must be submitted with a `Content-Type: application/json` header, so
+    that web pages can not submit them with a simple cross-origin request. If
+    the server has a token, all requests must send it as
+    `Authorization: Bearer <token>`.
+    """
+
+    server: Union[JobHTTPServer, JobUnixServer]
+
+    def do_GET(self) -> None:
+        if not self._authorize():
+            return
+        url = urlsplit(self.path)
+        parts = url.path.strip("/").split("/")
+        jobs = self.server.jobs
+        if parts == ["stats"]:
+            self._send(200, jobs.get_stats())
+        elif parts == ["jobs"]:
+            with jobs._lock:
+                infos = [job.info for job in jobs.jobs.values()]
+            self._send(
+                200,
+                [
+                    {k: v for k, v in info.items() if k not in ("scenecuts", "events")}
+                    for info in infos
+                ],
+            )
+        elif len(parts) == 2 and parts[0] == "jobs":
+            job = jobs.get(parts[1])
+            if job is None:
+                self._send(404, {"error": "No such job"})
+                return
+            wait = parse_qs(url.query).get("wait")
+            if wait:
+                try:
+                    job.done.wait(float(wait[0]))
+                except ValueError:
+                    self._send(400, {"error": "wait must be a number"})
+                    return
+            self._send(200, job.info)
+        else:
+            self._send(404, {"error": "Not found"})
+
+    def do_POST(self) -> None:
+        if not self._authorize():
+            return
+        if urlsplit(self.path).path.strip("/") != "jobs":
+            self._send(404, {"error": "Not found"})
+            return
+        content_type = self.headers.get("Content-Type", "")
+        if content_type.split(";")[0].strip().lower() != "application/json":
+            self._send(415, {"error": "Content-Type must be application/json"})
+            return
+        length = self.headers.get("Content-Length", "0")
+        if not length.isdigit():
+            self._send(400, {"error": "Content-Length must be a non-negative integer"})
+            return
+        try:
+            request = json.loads(self.rfile.read(int(length)) or b"{}")
+            job = self.server.jobs.submit(request)
+        except ValueError as e:
+            self._send(400, {"error": str(e)})
+            return
+        except RuntimeError as e:
+            self._send(503, {"error": str(e)})
+            return
+        self._send(202, job.info)
+
+    def do_DELETE(self) -> None:
+        if not self._authorize():
+            return
+        parts = urlsplit(self.path).path.strip("/").split("/")
+        if len(parts) != 2 or parts[0] != "jobs":
+            self._send(404, {"error": "Not found"})
+            return
+        job = self.server.jobs.cancel(parts[1])
+        if job is None:
+            self._send(404, {"error": "No such job"})
+            return
+        self._send(200, job.info)
+
+    def _authorize(self) -> bool:
+        token = self.server.token
+        if token is None or hmac.compare_digest(
+            self.headers.get("Authorization", ""), f"Bearer {token}"
+        ):
+            return True
+        self._send(401, {"error": "Missing or invalid token"})
+        return False
+
+    def _send(self, code: int, data: Any) -> None:
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self) -> str:
+        # Unix sockets have no client address
+        if isinstance(self.server, JobUnixServer):
+            return "unix"
+        return super().address_string()
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug(f"{self.address_string()} - {format % args}")
+
+
+class JobHTTPServer(ThreadingHTTPServer):
+    """HTTP server on a TCP port, for a `JobQueue`."""
+
+    daemon_threads = True
+
+    def __init__(
+        self, address: tuple[str, int], jobs: JobQueue, token: Optional[str] = None
+    ) -> None:
+        self.jobs = jobs
+        self.token = token
+        super().__init__(address, JobRequestHandler)
+
+
+class JobUnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """HTTP server on a Unix socket, for a `JobQueue`."""
+
+    daemon_threads = True
+
+    def __init__(
+        self, socket_path: str, jobs: JobQueue, token: Optional[str] = None
+    ) -> None:
+        self.jobs = jobs
+        self.token = token
+        super().__init__(socket_path, JobRequestHandler)
+
+
+def _remove_stale_socket(socket_path: str) -> None:
+    """
+    Remove a Unix socket left over from an earlier run.
+
+    Args:
+        socket_path (str): the socket path
+
+    Raises:
+        RuntimeError: if the path exists, but is not a socket, or another server is listening on it
+    """
+    try:
+        mode = os.stat(socket_path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise RuntimeError(f"{socket_path} exists and is not a socket")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        try:
+            client.connect(socket_path)
+        except OSError:
+            # nobody is listening anymore
+            os.remove(socket_path)
+            return
+    raise RuntimeError(f"Another server is listening on {socket_path}")
+
+
+def serve(
+    jobs: JobQueue,
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    socket_path: Optional[str] = None,
+    token: Optional[str] = None,
+) -> None:
+    """
+    Run the job queue and serve its API until interrupted.
+
+    Args:
+        jobs (JobQueue): the job queue
+        host (str, optional): Address to listen on. Defaults to localhost.
+        port (int, optional): Port to listen on. Defaults to 8765.
+        socket_path (str, optional): Listen on this Unix socket instead of a TCP port.
+        token (str, optional): Require this token in the `Authorization` header of all requests.
+
+    Raises:
+        RuntimeError: if the socket path is taken by another server or a file that is not a socket
+    """
+    server: Union[JobHTTPServer, JobUnixServer]
+    if socket_path is not None:
+        _remove_stale_socket(socket_path)
+        server = JobUnixServer(socket_path, jobs, token)
+        logger.info(f"Listening on {socket_path}")
+    else:
+        server = JobHTTPServer((host, port), jobs, token)
+        logger.info(f"Listening on http://{host}:{server.server_address[1]}")
+
+    jobs.start()
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        jobs.stop()
+        if socket_path is not None and os.path.exists(socket_path):
+            os.remove(socket_path)
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left, bisect_right
+from fractions import Fraction
+from typing import Any, Iterable, Optional, TypedDict
+
+# encoder arguments for re-encoding the frames around the stream-copied part,
+# per codec of the input; other codecs can not be smart-cut
+SMART_CUT_ENCODERS: dict[str, list[str]] = {
+    "h264": ["-c:v", "libx264", "-crf", "16"],
+}
+
+# timestamps closer than this (in seconds) are considered equal
+TIME_TOLERANCE = 0.001
+
+
+class SmartCutPart(TypedDict):
+    copy: bool
+    """Whether the part is stream-copied (True) or re-encoded (False)"""
+    start: float
+    """The PTS in seconds of the first frame"""
+    frames: int
+    """The number of frames"""
+
+
+class KeyframeIndex:
+    """
+    Timestamps of all video frames of an input, and which of them are keyframes.
+
+    The index is created from the packets of the first video stream, without
+    decoding them (see `get_keyframe_index_command()`), and is used to plan a
+    smart cut: only the frames between a cut and the next keyframe (and between
+    the last keyframe and the end of the scene) are re-encoded, the complete
+    GOPs in between are stream-copied.
+    """
+
+    def __init__(
+        self,
+        pts_time: Optional[Iterable[float]] = None,
+        keyframes: Optional[Iterable[int]] = None,
+        codec: Optional[str] = None,
+    ) -> None:
+        """
+        Create a new KeyframeIndex instance.
+
+        Args:
+            pts_time (Iterable[float], optional): PTS in seconds of all frames, in presentation order.
+            keyframes (Iterable[int], optional): Positions of the keyframes in `pts_time`.
+            codec (str, optional): Codec name of the video stream.
+        """
+        self.pts_time = array("d", pts_time if pts_time is not None else [])
+        self.keyframes = array("q", keyframes if keyframes is not None else [])
+        self.codec = codec
+
+    def __len__(self) -> int:
+        return len(self.pts_time)
+
+    @staticmethod
+    def get_keyframe_index_command(
+        input_file: str, ffmpeg_path: str = "ffmpeg"
+    ) -> list[str]:
+        """
+        Get the ffmpeg command that prints the timestamps and flags of all video packets.
+
+        The packets are stream-copied to the `framecrc` muxer, so nothing is decoded.
+
+        Args:
+            input_file (str): the input file
+            ffmpeg_path (str, optional): Path to ffmpeg executable. Defaults to "ffmpeg".
+
+        Returns:
+            list[str]: the command
+        """
+        return [
+            ffmpeg_path,
+            "-nostdin",
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            "-i",
+            input_file,
+            "-map",
+            "0:v:0",
+            "-c",
+            "copy",
+            "-f",
+            "framecrc",
+            "-",
+        ]
+
+    @classmethod
+    def from_framecrc(cls, lines: Iterable[str]) -> KeyframeIndex:
+        """
+        Parse the output of the `framecrc` muxer.
+
+        Args:
+            lines (Iterable[str]): the lines printed by ffmpeg
+
+        Returns:
+            KeyframeIndex: the index
+
+        Raises:
+            RuntimeError: if a line is wrongly formatted
+        """
+        time_base = Fraction(1)
+        codec = None
+        packets: list[tuple[int, bool]] = []
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("#"):
+                if line.startswith("#tb 0:"):
+                    time_base = Fraction(line.split(":", 1)[1].strip())
+                elif line.startswith("#codec_id 0:"):
+                    codec = line.split(":", 1)[1].strip()
+                continue
+
+            # stream, dts, pts, duration, size, checksum[, F=flags]
+            fields = [f.strip() for f in line.split(",")]
+            if len(fields) < 6:
+                raise RuntimeError("Wrongly formatted line: " + line)
+            try:
+                pts = int(fields[2])
+                flags = int(fields[6][2:], 16) if len(fields) > 6 else 1
+            except ValueError:
+                raise RuntimeError("Wrongly formatted line: " + line)
+            packets.append((pts, bool(flags & 1)))
+
+        packets.sort()
+        return cls(
+            [float(pts * time_base) for pts, _ in packets],
+            [i for i, (_, key) in enumerate(packets) if key],
+            codec,
+        )
+
+    def position(self, time: float) -> int:
+        """
+        Get the position of the first frame at or after a time.
+
+        Args:
+            time (float): Time in seconds
+
+        Returns:
+            int: the position, or the number of frames if the time is after the last frame
+        """
+        return bisect_left(self.pts_time, time - TIME_TOLERANCE)
+
+    def plan(self, start: float, end: Optional[float] = None) -> list[SmartCutPart]:
+        """
+        Split a scene into parts that are stream-copied or re-encoded.
+
+        Args:
+            start (float): Start time in seconds
+            end (float, optional): End time in seconds (exclusive). Defaults to the end of the input.
+
+        Returns:
+            list[SmartCutPart]: the parts, in presentation order
+        """
+        first = self.position(start)
+        last = len(self) if end is None else self.position(end)
+        if first >= last:
+            return []
+
+        # the first keyframe at or after the start, and the last one at or before the end
+        i = bisect_left(self.keyframes, first)
+        j = bisect_right(self.keyframes, last) - 1
+        bounds = [first, last]
+        copy = None
+        if i < len(self.keyframes) and j >= 0 and self.keyframes[i] < self.keyframes[j]:
+            copy = (self.keyframes[i], self.keyframes[j])
+            bounds = sorted({first, *copy, last})
+
+        return [
+            {
+                "copy": (a, b) == copy,
+                "start": self.pts_time[a],
+                "frames": b - a,
+            }
+            for a, b in zip(bounds, bounds[1:])
+        ]
+
+    def to_dict(self) -> dict[str, Any]:
+        """
+        Serialize the index to a JSON-compatible dict.
+
+        Returns:
+            dict: the index
+        """
+        return {
+            "pts_time": self.pts_time.tolist(),
+            "keyframes": self.keyframes.tolist(),
+            "codec": self.codec,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> KeyframeIndex:
+        """
+        Deserialize an index from a dict created with `to_dict()`.
+
+        Args:
+            data (dict): the index
+
+        Returns:
+            KeyframeIndex: the index
+        """
+        return cls(data["pts_time"], data["keyframes"], data.get("codec"))
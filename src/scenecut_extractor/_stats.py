@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Generator, Optional, TypedDict
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore[assignment]
+
+StatsHook = Callable[[str, dict[str, Any]], None]
+"""
+Called with an event name and its data:
+
+- `"stage"` when a stage has finished, with `stage`, `wall_time` and `cpu_time` (seconds)
+- `"ffmpeg"` when an ffmpeg process is started, with its `pid` and the total number of `ffmpeg_processes`
+"""
+
+
+class StageStats(TypedDict):
+    wall_time: float
+    """Total wall time in seconds"""
+    cpu_time: float
+    """Total CPU time in seconds"""
+    calls: int
+    """Number of times the stage ran"""
+
+
+def _children_cpu_time() -> float:
+    if resource is None:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _max_rss(who: int) -> Optional[int]:
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(who).ru_maxrss
+    # bytes on macOS, KiB elsewhere
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def read_process_io_bytes(pid: int) -> Optional[int]:
+    """
+    Get the number of bytes a process has read so far.
+
+    Only supported on Linux; the process must not have been reaped yet.
+
+    Args:
+        pid (int): the process ID
+
+    Returns:
+        Optional[int]: the number of bytes, or None if unknown
+    """
+    try:
+        with open(f"/proc/{pid}/io", "r") as f:
+            for line in f:
+                if line.startswith("rchar:"):
+                    return int(line.split(":")[1])
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+class RunStats:
+    """
+    Timing and resource usage of the work done by a `ScenecutExtractor`.
+
+    Stages are:
+
+    - `decode`: running ffmpeg to calculate the scores; the CPU time is the one used by ffmpeg
+    - `parse`: parsing the scores printed by ffmpeg; this happens while ffmpeg is decoding,
+      so its wall time is the CPU time of the parsing thread
+    - `score`: scoring raw frames with a NumPy backend, while ffmpeg is decoding; its
+      wall time is the CPU time of the scoring thread
+    - `cache`: reading and writing the score cache
+    - `threshold`: selecting the scene cuts from the scores
+    - `serialize`: formatting the scene cuts as JSON or CSV
+    - `refine`: the second pass of a two-pass analysis, part of `decode`; the CPU time is the one used by ffmpeg
+    - `index`: creating the keyframe index for smart cutting or two-pass analysis; the CPU time is the one used by ffmpeg
+    - `extract`: extracting the scenes; the CPU time is the one used by ffmpeg
+    - `thumbnails`: writing the images of the scenes in a separate pass; the CPU time is the one used by ffmpeg
+
+    The CPU time of ffmpeg and the peak memory usage are only available on
+    Unix-like systems, and the number of bytes read only on Linux. The peak
+    memory usage is the maximum over the lifetime of the Python process (and
+    of all ffmpeg processes it waited for), not only of the recorded runs.
+    """
+
+    def __init__(self) -> None:
+        """
+        Create a new RunStats instance.
+        """
+        self.stages: dict[str, StageStats] = {}
+        self.frames = 0
+        self.input_bytes: Optional[int] = None
+        self.ffmpeg_processes = 0
+        self.hooks: list[StatsHook] = []
+        self._lock = threading.Lock()
+
+    def add_hook(self, hook: StatsHook) -> None:
+        """
+        Register a callback that receives all stats events, e.g. to feed a metrics system.
+
+        Args:
+            hook (StatsHook): the callback
+        """
+        self.hooks.append(hook)
+
+    def _emit(self, event: str, data: dict[str, Any]) -> None:
+        for hook in self.hooks:
+            hook(event, data)
+
+    def add_stage(self, stage: str, wall_time: float, cpu_time: float) -> None:
+        """
+        Record a run of a stage.
+
+        Args:
+            stage (str): the stage name
+            wall_time (float): Wall time in seconds
+            cpu_time (float): CPU time in seconds
+        """
+        with self._lock:
+            stats = self.stages.setdefault(
+                stage, {"wall_time": 0.0, "cpu_time": 0.0, "calls": 0}
+            )
+            stats["wall_time"] += wall_time
+            stats["cpu_time"] += cpu_time
+            stats["calls"] += 1
+        self._emit(
+            "stage", {"stage": stage, "wall_time": wall_time, "cpu_time": cpu_time}
+        )
+
+    @contextmanager
+    def stage(self, stage: str, ffmpeg: bool = False) -> Generator[None, None, None]:
+        """
+        Measure the wall and CPU time of a block of code.
+
+        Args:
+            stage (str): the stage name
+            ffmpeg (bool, optional): Measure the CPU time of the ffmpeg processes
+                that finish within the block instead of the CPU time of this process.
+        """
+        cpu_time = _children_cpu_time if ffmpeg else time.process_time
+        start_wall, start_cpu = time.perf_counter(), cpu_time()
+        try:
+            yield
+        finally:
+            self.add_stage(
+                stage, time.perf_counter() - start_wall, cpu_time() - start_cpu
+            )
+
+    def add_ffmpeg_process(self, pid: Optional[int] = None) -> None:
+        """
+        Count a started ffmpeg process.
+
+        Args:
+            pid (int, optional): the process ID
+        """
+        with self._lock:
+            self.ffmpeg_processes += 1
+            count = self.ffmpeg_processes
+        self._emit("ffmpeg", {"ffmpeg_processes": count, "pid": pid})
+
+    def add_frames(self, frames: int, input_bytes: Optional[int] = None) -> None:
+        """
+        Record the result of an ffmpeg analysis.
+
+        Args:
+            frames (int): Number of decoded frames
+            input_bytes (int, optional): Number of bytes read by ffmpeg, if known
+        """
+        with self._lock:
+            self.frames += frames
+            if input_bytes is not None:
+                self.input_bytes = (self.input_bytes or 0) + input_bytes
+
+    def to_dict(self) -> dict[str, Any]:
+        """
+        Get the stats as a JSON-compatible dict.
+
+        Returns:
+            dict: the stats
+        """
+        decode_time = self.stages.get("decode", {}).get("wall_time", 0.0)
+        return {
+            "stages": {name: dict(stats) for name, stats in self.stages.items()},
+            "frames": self.frames,
+            "fps": self.frames / decode_time if decode_time > 0 else None,
+            "input_bytes": self.input_bytes,
+            "ffmpeg_processes": self.ffmpeg_processes,
+            "peak_rss": _max_rss(resource.RUSAGE_SELF) if resource else None,
+            "ffmpeg_peak_rss": _max_rss(resource.RUSAGE_CHILDREN) if resource else None,
+        }
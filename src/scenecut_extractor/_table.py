@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+from array import array
+from collections.abc import Mapping, Sequence
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, Optional, Union, overload
+
+if TYPE_CHECKING:
+    import numpy as np
+
+    from ._scenecut_extractor import ScenecutInfo
+
+# keys of a ScenecutInfo, and the table columns that hold their values
+COLUMNS = {
+    "frame": "frames",
+    "pts": "pts",
+    "pts_time": "pts_time",
+    "score": "scores",
+}
+
+
+class ScenecutRow(Mapping):
+    """
+    Read-only view of a single row of a `ScenecutTable`.
+
+    Behaves like a `ScenecutInfo` dict (e.g. `row["pts_time"]`, `dict(row)`,
+    comparison with dicts), but does not copy any values.
+    """
+
+    __slots__ = ("_table", "_index")
+
+    def __init__(self, table: ScenecutTable, index: int) -> None:
+        self._table = table
+        self._index = index
+
+    def __getitem__(self, key: str) -> Union[int, float]:
+        return getattr(self._table, COLUMNS[key])[self._index]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(COLUMNS)
+
+    def __len__(self) -> int:
+        return len(COLUMNS)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
+class ScenecutTable(Sequence):
+    """
+    Frames and their scene scores, stored column by column as compact typed arrays.
+
+    Each row takes 32 bytes instead of the several hundred bytes of a dict.
+    Indexing and iterating gives lightweight `ScenecutRow` views, slicing gives a
+    new table. The columns (`frames`, `pts`, `pts_time` and `scores`) are
+    `array.array` objects that support the buffer protocol, so they can be passed
+    to other libraries without copying; see `to_numpy()`.
+    """
+
+    def __init__(
+        self,
+        frames: Optional[Iterable[int]] = None,
+        pts: Optional[Iterable[float]] = None,
+        pts_time: Optional[Iterable[float]] = None,
+        scores: Optional[Iterable[float]] = None,
+    ) -> None:
+        """
+        Create a new ScenecutTable instance.
+
+        Args:
+            frames (Iterable[int], optional): Frame numbers.
+            pts (Iterable[float], optional): PTS values.
+            pts_time (Iterable[float], optional): PTS values in seconds.
+            scores (Iterable[float], optional): Scene scores.
+
+        Raises:
+            ValueError: if the columns have different lengths
+        """
+        self.frames = array("q", frames if frames is not None else [])
+        self.pts = array("d", pts if pts is not None else [])
+        self.pts_time = array("d", pts_time if pts_time is not None else [])
+        self.scores = array("d", scores if scores is not None else [])
+        self._check_lengths()
+
+    def _check_lengths(self) -> None:
+        if not (
+            len(self.frames) == len(self.pts) == len(self.pts_time) == len(self.scores)
+        ):
+            raise ValueError("All columns must have the same length")
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    @overload
+    def __getitem__(self, index: int) -> ScenecutRow: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> ScenecutTable: ...
+
+    def __getitem__(
+        self, index: Union[int, slice]
+    ) -> Union[ScenecutRow, ScenecutTable]:
+        if isinstance(index, slice):
+            return ScenecutTable(
+                self.frames[index],
+                self.pts[index],
+                self.pts_time[index],
+                self.scores[index],
+            )
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("ScenecutTable index out of range")
+        return ScenecutRow(self, index)
+
+    def __iter__(self) -> Iterator[ScenecutRow]:
+        return (ScenecutRow(self, i) for i in range(len(self)))
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, ScenecutTable):
+            return (
+                self.frames == other.frames
+                and self.pts == other.pts
+                and self.pts_time == other.pts_time
+                and self.scores == other.scores
+            )
+        if isinstance(other, Sequence) and not isinstance(other, (str, bytes)):
+            return len(self) == len(other) and all(
+                row == other_row for row, other_row in zip(self, other)
+            )
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({len(self)} rows)"
+
+    def take(self, indices: Iterable[int]) -> ScenecutTable:
+        """
+        Get a new table with the rows at the given indices.
+
+        Args:
+            indices (Iterable[int]): the row indices
+
+        Returns:
+            ScenecutTable: the selected rows
+        """
+        indices = list(indices)
+        return ScenecutTable(
+            array("q", map(self.frames.__getitem__, indices)),
+            array("d", map(self.pts.__getitem__, indices)),
+            array("d", map(self.pts_time.__getitem__, indices)),
+            array("d", map(self.scores.__getitem__, indices)),
+        )
+
+    def row(self, index: int) -> ScenecutInfo:
+        """
+        Get a copy of a single row as a dict.
+
+        Args:
+            index (int): the row index
+
+        Returns:
+            ScenecutInfo: the row
+        """
+        return {
+            "frame": self.frames[index],
+            "pts": self.pts[index],
+            "pts_time": self.pts_time[index],
+            "score": self.scores[index],
+        }
+
+    def rows(self, indices: Iterable[int]) -> list[ScenecutInfo]:
+        """
+        Get copies of multiple rows as dicts.
+
+        Args:
+            indices (Iterable[int]): the row indices
+
+        Returns:
+            list[ScenecutInfo]: the rows
+        """
+        return [self.row(i) for i in indices]
+
+    def to_list(self) -> list[ScenecutInfo]:
+        """
+        Get copies of all rows as dicts.
+
+        Returns:
+            list[ScenecutInfo]: the rows
+        """
+        return [
+            {"frame": frame, "pts": pts, "pts_time": pts_time, "score": score}
+            for frame, pts, pts_time, score in zip(
+                self.frames, self.pts, self.pts_time, self.scores
+            )
+        ]
+
+    def to_numpy(self) -> dict[str, np.ndarray]:
+        """
+        Get the columns as NumPy arrays, without copying them.
+
+        The arrays share memory with the table; while they exist, no rows can be
+        added to the table. Requires NumPy to be installed.
+
+        Returns:
+            dict[str, np.ndarray]: the columns, keyed like a `ScenecutInfo`
+
+        Raises:
+            ImportError: if NumPy is not installed
+        """
+        import numpy as np
+
+        return {
+            key: np.frombuffer(
+                getattr(self, column),
+                dtype=np.int64 if key == "frame" else np.float64,
+            )
+            for key, column in COLUMNS.items()
+        }
+
+    def to_dict(self) -> dict[str, Any]:
+        """
+        Serialize the table to a JSON-compatible dict.
+
+        Returns:
+            dict: the columns
+        """
+        return {
+            "frame": self.frames.tolist(),
+            "pts": self.pts.tolist(),
+            "pts_time": self.pts_time.tolist(),
+            "score": self.scores.tolist(),
+        }
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from typing import Optional, TypedDict
+
+THUMBNAIL_POSITIONS = ("start", "middle", "end")
+"""Frames of a scene that thumbnails can be written for"""
+
+# encoder options per image format
+THUMBNAIL_FORMATS: dict[str, list[str]] = {
+    "jpg": ["-q:v", "2"],
+    "png": [],
+    "webp": ["-quality", "90"],
+}
+
+# frame numbers per leaf of the select expression; see `get_frame_select_expr()`
+SELECT_LEAF_SIZE = 8
+
+
+class ThumbnailOptions(TypedDict, total=False):
+    """
+    Where and how to write the thumbnails of the scenes.
+
+    Only `output_directory` is required.
+    """
+
+    output_directory: str
+    """Directory to write the images to"""
+    positions: list[str]
+    """Frames of each scene to write, out of `THUMBNAIL_POSITIONS`; defaults to the first frame"""
+    width: int
+    """Downscale the images to this width, keeping the aspect ratio; defaults to the input width"""
+    image_format: str
+    """Image format, one of `THUMBNAIL_FORMATS`; defaults to `jpg`"""
+
+
+def resolve_thumbnail_options(options: ThumbnailOptions) -> ThumbnailOptions:
+    """
+    Validate thumbnail options and fill in the defaults.
+
+    Args:
+        options (ThumbnailOptions): the options
+
+    Returns:
+        ThumbnailOptions: the options, with all keys set except `width`
+
+    Raises:
+        ValueError: if an option is invalid
+    """
+    if not options.get("output_directory"):
+        raise ValueError("No output directory for thumbnails given")
+    resolved: ThumbnailOptions = {"positions": ["start"], "image_format": "jpg"}
+    resolved.update(options)
+
+    for position in resolved["positions"]:
+        if position not in THUMBNAIL_POSITIONS:
+            raise ValueError(
+                f"No such thumbnail position: {position}, "
+                f"must be one of {', '.join(THUMBNAIL_POSITIONS)}"
+            )
+    if not resolved["positions"]:
+        raise ValueError("No thumbnail positions given")
+    image_format = resolved["image_format"].lstrip(".").lower()
+    if image_format == "jpeg":
+        image_format = "jpg"
+    if image_format not in THUMBNAIL_FORMATS:
+        raise ValueError(
+            f"No such image format: {image_format}, "
+            f"must be one of {', '.join(THUMBNAIL_FORMATS)}"
+        )
+    resolved["image_format"] = image_format
+    if resolved.get("width", 2) < 2:
+        raise ValueError("width must be at least 2")
+    return resolved
+
+
+def get_frame_select_expr(frames: list[int]) -> str:
+    """
+    Get an expression for ffmpeg's `select` filter that is true for the given frame numbers.
+
+    The expression is a balanced tree of `if(lt(n, ...))` conditions, so that
+    ffmpeg only evaluates a few comparisons per frame, even for many frames.
+
+    Args:
+        frames (list[int]): the frame numbers, sorted and unique
+
+    Returns:
+        str: the expression, with commas escaped for the filtergraph
+    """
+
+    def subtree(lo: int, hi: int) -> str:
+        if hi - lo <= SELECT_LEAF_SIZE:
+            return "+".join(f"eq(n\\,{frame})" for frame in frames[lo:hi]) or "0"
+        mid = (lo + hi) // 2
+        return f"if(lt(n\\,{frames[mid]})\\,{subtree(lo, mid)}\\,{subtree(mid, hi)})"
+
+    return subtree(0, len(frames))
+
+
+def get_thumbnail_filters(width: Optional[int] = None) -> list[str]:
+    """
+    Get the ffmpeg filters that prepare the selected frames for writing.
+
+    Args:
+        width (int, optional): Downscale to this width, keeping the aspect ratio
+
+    Returns:
+        list[str]: the filters, to be joined with commas
+    """
+    if not width:
+        return []
+    # never upscale; unlike for scoring, the quality of the images matters
+    return [f"scale=w=min(iw\\,{width}):h=-2:flags=bicubic"]
@@ -0,0 +1,361 @@
+from __future__ import annotations
+
+import heapq
+import math
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import deque
+from functools import partial
+from itertools import accumulate, compress
+from operator import le, lt, mul
+from typing import Any, Iterable, Optional
+
+from ._postprocess import PostProcessing, resolve_postprocessing
+from ._table import ScenecutTable
+
+
+def _import_numpy() -> Any:
+    """
+    Get the NumPy module, which is optional for the timeline queries.
+
+    Returns:
+        module: the `numpy` module, or None if it is not installed
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        return None
+    return np
+
+
+class ScoreTimeline(ScenecutTable):
+    """
+    Scene scores of all analyzed frames, stored as compact typed arrays.
+
+    All queries operate on the stored scores and do not require running ffmpeg
+    again. Frames are expected to be in presentation order.
+
+    If NumPy is installed, the queries that look at every frame run as NumPy
+    operations on the arrays, without copying them. Otherwise, they iterate over
+    the arrays in Python, with the same results.
+    """
+
+    def append(self, frame: int, pts: float, pts_time: float, score: float) -> None:
+        """
+        Append the score of a frame.
+
+        Args:
+            frame (int): the frame number
+            pts (float): the PTS of the frame
+            pts_time (float): the PTS in seconds
+            score (float): the scene score
+        """
+        self.frames.append(frame)
+        self.pts.append(pts)
+        self.pts_time.append(pts_time)
+        self.scores.append(score)
+
+    def extend(
+        self,
+        frames: Iterable[int],
+        pts: Iterable[float],
+        pts_time: Iterable[float],
+        scores: Iterable[float],
+    ) -> None:
+        """
+        Append the scores of multiple frames.
+
+        Args:
+            frames (Iterable[int]): Frame numbers.
+            pts (Iterable[float]): PTS values.
+            pts_time (Iterable[float]): PTS values in seconds.
+            scores (Iterable[float]): Scene scores.
+
+        Raises:
+            ValueError: if the columns have different lengths
+        """
+        self.frames.extend(frames)
+        self.pts.extend(pts)
+        self.pts_time.extend(pts_time)
+        self.scores.extend(scores)
+        self._check_lengths()
+
+    def threshold_indices(self, threshold: float) -> list[int]:
+        """
+        Get the indices of all frames whose score is at or above a threshold.
+
+        Args:
+            threshold (float): Threshold (between 0 and 1)
+
+        Returns:
+            list[int]: the indices, in presentation order
+        """
+        return self._threshold_indices_between(threshold, 0, len(self))
+
+    def _threshold_indices_between(
+        self, threshold: float, lo: int, hi: int
+    ) -> list[int]:
+        """
+        Get the indices from `lo` to `hi` (exclusive) whose score is at or above a threshold.
+
+        Args:
+            threshold (float): Threshold (between 0 and 1)
+            lo (int): the first index
+            hi (int): the index after the last one
+
+        Returns:
+            list[int]: the indices, in presentation order
+        """
+        np = _import_numpy()
+        if np is None:
+            return list(
+                compress(range(lo, hi), map(partial(le, threshold), self.scores[lo:hi]))
+            )
+        scores = np.frombuffer(self.scores, dtype=np.float64)[lo:hi]
+        return (np.flatnonzero(scores >= threshold) + lo).tolist()
+
+    def rethreshold(
+        self,
+        threshold: float,
+        min_scene_length: float = 0,
+        postprocessing: Optional[PostProcessing] = None,
+    ) -> ScenecutTable:
+        """
+        Get all frames whose score is at or above a threshold.
+
+        The post-processing rules are applied in this order: adaptive threshold,
+        non-maximum suppression, minimum scene length.
+
+        Args:
+            threshold (float): Threshold (between 0 and 1)
+            min_scene_length (float, optional): Minimum scene length in seconds. Defaults to 0.
+            postprocessing (PostProcessing, optional): Rules to suppress false cuts.
+
+        Returns:
+            ScenecutTable: the scene cuts
+
+        Raises:
+            ValueError: if a post-processing rule is invalid
+        """
+        indices = self.threshold_indices(threshold)
+        rules = resolve_postprocessing(postprocessing)
+        if rules.get("adaptive_window", 0) > 0:
+            indices = self.adaptive_threshold_indices(
+                indices, rules["adaptive_window"], rules["adaptive_k"]
+            )
+        if rules.get("nms_window", 0) > 0:
+            indices = self.non_maximum_suppression_indices(indices, rules["nms_window"])
+        if min_scene_length > 0:
+            indices = self.min_scene_length_indices(indices, min_scene_length)
+        return self.take(indices)
+
+    def top_k(self, n: int, min_scene_length: float = 0) -> ScenecutTable:
+        """
+        Get the frames with the `n` highest scores.
+
+        Args:
+            n (int): the number of frames
+            min_scene_length (float, optional): Minimum scene length in seconds. Defaults to 0.
+
+        Returns:
+            ScenecutTable: the scene cuts, in presentation order
+        """
+        np = _import_numpy()
+        if np is None or not 0 < n < len(self):
+            indices = sorted(
+                heapq.nlargest(n, range(len(self)), key=self.scores.__getitem__)
+            )
+        else:
+            scores = np.frombuffer(self.scores, dtype=np.float64)
+            # the n-th highest score, found in linear time
+            kth = np.partition(scores, len(self) - n)[len(self) - n]
+            above = np.flatnonzero(scores > kth)
+            # like heapq.nlargest(), earlier frames win ties
+            ties = np.flatnonzero(scores == kth)[: n - len(above)]
+            indices = np.sort(np.concatenate((above, ties))).tolist()
+        if min_scene_length > 0:
+            indices = self.min_scene_length_indices(indices, min_scene_length)
+        return self.take(indices)
+
+    def cuts_in_range(
+        self, start: float, end: float, threshold: float = 0
+    ) -> ScenecutTable:
+        """
+        Get all frames within a time range whose score is at or above a threshold.
+
+        Args:
+            start (float): Start time in seconds (inclusive)
+            end (float): End time in seconds (exclusive)
+            threshold (float, optional): Threshold (between 0 and 1). Defaults to 0.
+
+        Returns:
+            ScenecutTable: the scene cuts
+        """
+        lo = bisect_left(self.pts_time, start)
+        hi = bisect_left(self.pts_time, end, lo=lo)
+        return self.take(self._threshold_indices_between(threshold, lo, hi))
+
+    def min_scene_length_indices(
+        self, indices: Iterable[int], min_scene_length: float
+    ) -> list[int]:
+        """
+        Drop cuts that would result in scenes shorter than a minimum length.
+
+        A cut is kept if it is at least `min_scene_length` seconds after the
+        previously kept cut (or the start of the file).
+
+        Args:
+            indices (Iterable[int]): indices of the candidate cuts, in presentation order
+            min_scene_length (float): Minimum scene length in seconds
+
+        Returns:
+            list[int]: the indices of the kept cuts
+        """
+        kept: list[int] = []
+        last_cut_time = 0.0
+        for i in indices:
+            if self.pts_time[i] - last_cut_time >= min_scene_length:
+                kept.append(i)
+                last_cut_time = self.pts_time[i]
+        return kept
+
+    def adaptive_threshold_indices(
+        self, indices: Iterable[int], window: float, k: float
+    ) -> list[int]:
+        """
+        Only keep cuts that stand out from the scores around them.
+
+        A cut is kept if its score is at least the mean plus `k` standard
+        deviations of the scores of the other frames within `window / 2` seconds
+        before and after it. The sums are taken from running totals over the whole
+        timeline, so this is linear in the number of frames. With NumPy, the
+        running totals and the windows of all cuts are computed as array operations.
+
+        Args:
+            indices (Iterable[int]): indices of the candidate cuts, in presentation order
+            window (float): Window length in seconds
+            k (float): Number of standard deviations
+
+        Returns:
+            list[int]: the indices of the kept cuts
+        """
+        indices = list(indices)
+        if not indices:
+            return indices
+
+        np = _import_numpy()
+        if np is not None:
+            return self._adaptive_threshold_indices_numpy(np, indices, window, k)
+
+        scores = self.scores
+        pts_time = self.pts_time
+        sums = array("d", accumulate(scores, initial=0.0))
+        squares = array("d", accumulate(map(mul, scores, scores), initial=0.0))
+
+        kept: list[int] = []
+        half = window / 2
+        for i in indices:
+            score = scores[i]
+            lo = bisect_left(pts_time, pts_time[i] - half)
+            hi = bisect_right(pts_time, pts_time[i] + half)
+            # the frame itself does not count towards its window
+            n = hi - lo - 1
+            if n < 1:
+                kept.append(i)
+                continue
+            mean = (sums[hi] - sums[lo] - score) / n
+            variance = (squares[hi] - squares[lo] - score * score) / n - mean * mean
+            if score >= mean + k * math.sqrt(max(variance, 0.0)):
+                kept.append(i)
+        return kept
+
+    def _adaptive_threshold_indices_numpy(
+        self, np: Any, indices: list[int], window: float, k: float
+    ) -> list[int]:
+        """
+        Like `adaptive_threshold_indices()`, computed with NumPy.
+
+        Args:
+            np (module): the `numpy` module
+            indices (list[int]): indices of the candidate cuts, in presentation order
+            window (float): Window length in seconds
+            k (float): Number of standard deviations
+
+        Returns:
+            list[int]: the indices of the kept cuts
+        """
+        scores = np.frombuffer(self.scores, dtype=np.float64)
+        pts_time = np.frombuffer(self.pts_time, dtype=np.float64)
+        # cumsum() adds up in order, so the totals equal those of accumulate()
+        sums = np.concatenate(([0.0], np.cumsum(scores)))
+        squares = np.concatenate(([0.0], np.cumsum(scores * scores)))
+
+        cuts = np.asarray(indices, dtype=np.intp)
+        score = scores[cuts]
+        half = window / 2
+        lo = np.searchsorted(pts_time, pts_time[cuts] - half, side="left")
+        hi = np.searchsorted(pts_time, pts_time[cuts] + half, side="right")
+        # the frame itself does not count towards its window
+        n = hi - lo - 1
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = (sums[hi] - sums[lo] - score) / n
+            variance = (squares[hi] - squares[lo] - score * score) / n - mean * mean
+            keep = (n < 1) | (score >= mean + k * np.sqrt(np.maximum(variance, 0.0)))
+        return cuts[keep].tolist()
+
+    def non_maximum_suppression_indices(
+        self, indices: Iterable[int], window: float
+    ) -> list[int]:
+        """
+        Only keep cuts with the highest score among the cuts close to them.
+
+        A cut is dropped if another cut less than `window` seconds before it has
+        the same or a higher score, or one less than `window` seconds after it has
+        a higher score. Each direction is one pass with a sliding window maximum,
+        so this is linear in the number of cuts.
+
+        Args:
+            indices (Iterable[int]): indices of the candidate cuts, in presentation order
+            window (float): Window length in seconds
+
+        Returns:
+            list[int]: the indices of the kept cuts
+        """
+        indices = list(indices)
+        scores = self.scores
+        pts_time = self.pts_time
+        suppressed = [False] * len(indices)
+
+        # earlier cuts with the same score win, so ties only suppress later cuts
+        forward = (range(len(indices)), le)
+        backward = (range(len(indices) - 1, -1, -1), lt)
+        for order, dominated in (forward, backward):
+            # positions of the cuts in the window, with decreasing scores
+            window_max: deque[int] = deque()
+            for pos in order:
+                i = indices[pos]
+                while (
+                    window_max
+                    and abs(pts_time[i] - pts_time[indices[window_max[0]]]) >= window
+                ):
+                    window_max.popleft()
+                if window_max and dominated(scores[i], scores[indices[window_max[0]]]):
+                    suppressed[pos] = True
+                while window_max and scores[indices[window_max[-1]]] <= scores[i]:
+                    window_max.pop()
+                window_max.append(pos)
+
+        return list(compress(indices, (not s for s in suppressed)))
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> ScoreTimeline:
+        """
+        Deserialize a timeline from a dict created with `to_dict()`.
+
+        Args:
+            data (dict): the timeline columns
+
+        Returns:
+            ScoreTimeline: the timeline
+        """
+        return cls(data["frame"], data["pts"], data["pts_time"], data["score"])
@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+from bisect import bisect_right
+from typing import Optional, Sequence, TypedDict
+
+from ._profile import AnalysisProfile
+from ._smartcut import KeyframeIndex
+from ._timeline import ScoreTimeline
+
+COARSE_MODES = ("decimate", "keyframes")
+"""Frames scored in the first pass of a two-pass analysis"""
+
+DEFAULT_COARSE_FRAME_STEP = 5
+DEFAULT_COARSE_WIDTH = 320
+# the candidate threshold, relative to the threshold of the scene cuts
+DEFAULT_CANDIDATE_RATIO = 0.5
+
+# the score of a frame depends on the two frames before it
+CONTEXT_FRAMES = 2
+
+
+class TwoPassOptions(TypedDict, total=False):
+    """
+    How to find the frames to analyze in a two-pass (coarse-to-fine) analysis.
+
+    All keys are optional.
+    """
+
+    coarse: str
+    """Frames scored in the first pass, one of `COARSE_MODES`: every n-th frame
+    (`decimate`, the default), or only the keyframes, which skips decoding all other frames"""
+    frame_step: int
+    """With `decimate`, score every n-th frame in the first pass; defaults to 5"""
+    width: int
+    """Downscale the frames of the first pass to this width; defaults to 320"""
+    candidate_threshold: float
+    """Frames of the first pass whose mean absolute difference to the previous frame of the
+    first pass (from 0 to 1) is at least this are analyzed again, together with the frames
+    since the previous frame of the first pass; defaults to half the threshold"""
+
+
+def resolve_two_pass(options: TwoPassOptions, threshold: float) -> TwoPassOptions:
+    """
+    Validate two-pass options and fill in the defaults.
+
+    Args:
+        options (TwoPassOptions): the options
+        threshold (float): the threshold of the scene cuts
+
+    Returns:
+        TwoPassOptions: the options, with all keys set
+
+    Raises:
+        ValueError: if an option is invalid
+    """
+    resolved: TwoPassOptions = {
+        "coarse": "decimate",
+        "frame_step": DEFAULT_COARSE_FRAME_STEP,
+        "width": DEFAULT_COARSE_WIDTH,
+        "candidate_threshold": threshold * DEFAULT_CANDIDATE_RATIO,
+    }
+    resolved.update(options)
+
+    if resolved["coarse"] not in COARSE_MODES:
+        raise ValueError(
+            f"No such coarse mode: {resolved['coarse']}, "
+            f"must be one of {', '.join(COARSE_MODES)}"
+        )
+    if resolved["frame_step"] < 1:
+        raise ValueError("frame_step must be at least 1")
+    if resolved["width"] < 2:
+        raise ValueError("width must be at least 2")
+    if not (0 <= resolved["candidate_threshold"] <= 1):
+        raise ValueError("candidate_threshold must be between 0 and 1")
+    return resolved
+
+
+def get_coarse_profile(options: TwoPassOptions) -> AnalysisProfile:
+    """
+    Get the analysis profile of the first pass.
+
+    Args:
+        options (TwoPassOptions): the resolved options
+
+    Returns:
+        AnalysisProfile: the profile
+    """
+    profile: AnalysisProfile = {"width": options["width"], "gray": True}
+    if options["coarse"] == "decimate":
+        profile["frame_step"] = options["frame_step"]
+    return profile
+
+
+def get_coarse_input_args(options: TwoPassOptions) -> list[str]:
+    """
+    Get the ffmpeg input options of the first pass.
+
+    Args:
+        options (TwoPassOptions): the resolved options
+
+    Returns:
+        list[str]: the options
+    """
+    if options["coarse"] == "keyframes":
+        return ["-skip_frame", "nokey"]
+    return []
+
+
+def renumber_frames(
+    timeline: ScoreTimeline,
+    index: KeyframeIndex,
+    scores: Optional[Sequence[float]] = None,
+) -> ScoreTimeline:
+    """
+    Set the frame numbers of a timeline from the position of its frames in a keyframe index.
+
+    This works for any subset of the frames of the input, e.g. only the keyframes,
+    or the frames of an analysis that started after seeking.
+
+    Args:
+        timeline (ScoreTimeline): the timeline
+        index (KeyframeIndex): the keyframe index of the input
+        scores (Sequence[float], optional): Replace the scores by these. Defaults to the scores of the timeline.
+
+    Returns:
+        ScoreTimeline: a timeline with the new frame numbers
+
+    Raises:
+        ValueError: if the number of scores does not match the timeline
+    """
+    renumbered = ScoreTimeline()
+    renumbered.extend(
+        [nearest_position(index, t) for t in timeline.pts_time],
+        timeline.pts,
+        timeline.pts_time,
+        timeline.scores if scores is None else scores,
+    )
+    return renumbered
+
+
+def get_differences(metadata: list[tuple[str, str]]) -> list[float]:
+    """
+    Get the differences of the frames to their previous frame from the metadata of a first pass.
+
+    Args:
+        metadata (list[tuple[str, str]]): the metadata printed with `difference` enabled,
+            see `ScenecutExtractor._get_score_filter()`
+
+    Returns:
+        list[float]: the mean absolute difference of each frame, from 0 to 1
+    """
+    return [float(value) / 100 for key, value in metadata if key == "scd.mafd"]
+
+
+def nearest_position(index: KeyframeIndex, time: float) -> int:
+    """
+    Get the position of the frame closest to a time.
+
+    Unlike `KeyframeIndex.position()`, this tolerates the rounding of the
+    timestamps printed by ffmpeg.
+
+    Args:
+        index (KeyframeIndex): the keyframe index
+        time (float): Time in seconds
+
+    Returns:
+        int: the position
+    """
+    i = index.position(time)
+    if i >= len(index) or (
+        i > 0 and time - index.pts_time[i - 1] < index.pts_time[i] - time
+    ):
+        return i - 1
+    return i
+
+
+def get_candidate_windows(
+    coarse: ScoreTimeline,
+    candidate_threshold: float,
+    keyframes: Sequence[int] = (),
+    total_frames: Optional[int] = None,
+) -> list[tuple[int, int]]:
+    """
+    Get the ranges of frames to analyze again in the second pass.
+
+    A frame of the first pass whose score is at or above the candidate threshold
+    may be preceded by a cut at any frame since the previous frame of the first
+    pass. The frames after the last frame of the first pass are not covered by
+    any score, so they are always analyzed again. Since seeking to a range means
+    decoding from the keyframe before it, a range is merged with the previous one
+    if that keyframe (or the context frames the score of the first frame depends
+    on) is not after the end of the previous range: decoding on is never slower
+    than seeking back.
+
+    Args:
+        coarse (ScoreTimeline): the scores of the first pass, with frame numbers of the input
+        candidate_threshold (float): the candidate threshold
+        keyframes (Sequence[int], optional): The frame numbers of the keyframes, in order
+        total_frames (int, optional): The number of frames of the input
+
+    Returns:
+        list[tuple[int, int]]: the first and last frame number (exclusive) of each range, in order
+    """
+    ranges = [
+        (coarse.frames[i - 1] + 1 if i > 0 else 0, coarse.frames[i] + 1)
+        for i in coarse.threshold_indices(candidate_threshold)
+    ]
+    tail = coarse.frames[-1] + 1 if len(coarse) else 0
+    if total_frames is not None and tail < total_frames:
+        ranges.append((tail, total_frames))
+
+    windows: list[tuple[int, int]] = []
+    for first, last in ranges:
+        decode_from = first - CONTEXT_FRAMES
+        k = bisect_right(keyframes, decode_from) - 1
+        if k >= 0:
+            decode_from = keyframes[k]
+        if windows and decode_from <= windows[-1][1]:
+            windows[-1] = (windows[-1][0], last)
+        else:
+            windows.append((first, last))
+    return windows
+
+
+def merge_refined(
+    coarse: ScoreTimeline,
+    windows: list[tuple[int, int]],
+    refined: list[ScoreTimeline],
+) -> ScoreTimeline:
+    """
+    Replace the frames of the first pass within the candidate windows by those of the second pass.
+
+    Args:
+        coarse (ScoreTimeline): the scores of the first pass
+        windows (list[tuple[int, int]]): the candidate windows, see `get_candidate_windows()`
+        refined (list[ScoreTimeline]): the scores of the second pass, one timeline per window
+
+    Returns:
+        ScoreTimeline: the merged scores, in presentation order
+    """
+    timeline = ScoreTimeline()
+    i = 0
+    for (first, last), window in zip(windows, refined):
+        while i < len(coarse) and coarse.frames[i] < first:
+            timeline.append(
+                coarse.frames[i], coarse.pts[i], coarse.pts_time[i], coarse.scores[i]
+            )
+            i += 1
+        for j in range(len(window)):
+            if first <= window.frames[j] < last:
+                timeline.append(
+                    window.frames[j],
+                    window.pts[j],
+                    window.pts_time[j],
+                    window.scores[j],
+                )
+        while i < len(coarse) and coarse.frames[i] < last:
+            i += 1
+    timeline.extend(
+        coarse.frames[i:], coarse.pts[i:], coarse.pts_time[i:], coarse.scores[i:]
+    )
+    return timeline
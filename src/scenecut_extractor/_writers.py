@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import json
+from itertools import islice
+from typing import IO, TYPE_CHECKING, Iterable, Iterator, Union
+
+from ._table import ScenecutTable
+
+if TYPE_CHECKING:
+    from ._scenecut_extractor import ScenecutInfo
+
+Scenecuts = Union[ScenecutTable, Iterable["ScenecutInfo"]]
+
+BATCH_SIZE = 1000
+"""Number of rows that are formatted at once"""
+
+
+def _batched(
+    scenecuts: Scenecuts, batch_size: int = BATCH_SIZE
+) -> Iterator[list[ScenecutInfo]]:
+    if isinstance(scenecuts, ScenecutTable):
+        # only create the dicts of one batch at a time
+        for start in range(0, len(scenecuts), batch_size):
+            yield scenecuts[start : start + batch_size].to_list()
+        return
+    iterator = iter(scenecuts)
+    while batch := list(islice(iterator, batch_size)):
+        yield batch
+
+
+def write_json(scenecuts: Scenecuts, f: IO[str]) -> None:
+    """
+    Write scene cuts as a JSON array, a batch of rows at a time.
+
+    The output is identical to `json.dumps(list(scenecuts), indent=2)`.
+
+    Args:
+        scenecuts (Union[ScenecutTable, Iterable[ScenecutInfo]]): the scene cuts
+        f (IO[str]): the file object to write to
+    """
+    separator = "[\n"
+    for batch in _batched(scenecuts):
+        f.write(separator)
+        # strip the brackets of the batch
+        f.write(json.dumps(batch, indent=2)[2:-2])
+        separator = ",\n"
+    f.write("[]" if separator == "[\n" else "\n]")
+
+
+def write_csv(scenecuts: Scenecuts, f: IO[str]) -> None:
+    """
+    Write scene cuts as CSV with a header, a batch of rows at a time.
+
+    Like `ScenecutExtractor.get_as_csv()`, nothing is written if there are no
+    scene cuts, and the last row is not terminated by a newline.
+
+    Args:
+        scenecuts (Union[ScenecutTable, Iterable[ScenecutInfo]]): the scene cuts
+        f (IO[str]): the file object to write to
+    """
+    separator = None
+    for batch in _batched(scenecuts):
+        if separator is None:
+            f.write(",".join(batch[0].keys()) + "\n")
+            separator = ""
+        f.write(separator)
+        f.write("\n".join([",".join([str(r) for r in row.values()]) for row in batch]))
+        separator = "\n"
+
+
+def write_ndjson(scenecuts: Scenecuts, f: IO[str]) -> None:
+    """
+    Write scene cuts as JSON Lines (NDJSON): one JSON object per line.
+
+    Args:
+        scenecuts (Union[ScenecutTable, Iterable[ScenecutInfo]]): the scene cuts
+        f (IO[str]): the file object to write to
+    """
+    for batch in _batched(scenecuts):
+        f.write("".join([json.dumps(row) + "\n" for row in batch]))
@@ -1,9 +1,37 @@
 #!/usr/bin/env pytest
 
+import asyncio
+import http.client
+import io
 import json
 import os
 import shutil
 import subprocess
+import tempfile
+import threading
+import time
+import urllib.request
+
+import pytest
+
+from scenecut_extractor import (
+    AsyncScenecutExtractor,
+    JobQueue,
+    ScenecutExtractor,
+    ScenecutInfo,
+    ScenecutTable,
+    ScoreCache,
+    ScoreTimeline,
+    _timeline,
+)
+from scenecut_extractor._parser import MetadataParser, parse_metadata_lines
+from scenecut_extractor._server import (
+    JobHTTPServer,
+    JobUnixServer,
+    _remove_stale_socket,
+)
+from scenecut_extractor._twopass import get_candidate_windows
+from scenecut_extractor._writers import write_csv, write_json
 
 TEST_FILE = os.path.abspath(os.path.join(os.path.dirname(__file__), "test.mp4"))
 
@@ -192,3 +220,1376 @@ class TestOutput:
         finally:
             if os.path.exists(output_file):
                 os.remove(output_file)
+
+
+class TestCache:
+    def test_cache_rethreshold(self, tmp_path):
+        """
+        Test that cached scores are reused for another threshold
+        """
+        cache_dir = str(tmp_path / "cache")
+        stdout, _ = run_command(
+            [
+                "python3",
+                "-m",
+                "scenecut_extractor",
+                TEST_FILE,
+                "--cache",
+                "--cache-dir",
+                cache_dir,
+            ]
+        )
+        assert len(json.loads(stdout)) == 7
+        assert len(os.listdir(cache_dir)) == 1
+
+        # a non-existing ffmpeg proves that the second run does not decode
+        stdout, _ = run_command(
+            [
+                "python3",
+                "-m",
+                "scenecut_extractor",
+                TEST_FILE,
+                "--cache",
+                "--cache-dir",
+                cache_dir,
+                "--ffmpeg-path",
+                "does-not-exist",
+                "-t",
+                "0",
+                "-o",
+                "frames",
+            ]
+        )
+        assert len(stdout.splitlines()) == 199
+
+    def test_cache_prune(self, tmp_path):
+        """
+        Test LRU eviction of cache entries
+        """
+        cache = ScoreCache(cache_dir=str(tmp_path))
+        timeline = ScoreTimeline([0], [0.0], [0.0], [0.0])
+        for i in range(3):
+            cache.put(f"key{i}", timeline)
+            os.utime(tmp_path / f"key{i}.json", (i, i))
+
+        assert cache.get("key0") is not None
+        cache.prune(max_size=cache.size() - 1)
+
+        assert cache.get("key1") is None
+        assert cache.get("key0") is not None
+        assert cache.clear() == 2
+
+    def test_cache_concurrent_eviction(self, tmp_path, monkeypatch):
+        """
+        Test that an entry evicted by another process after reading it is still a hit
+        """
+        cache = ScoreCache(cache_dir=str(tmp_path))
+        cache.put("key", ScoreTimeline([0], [0.0], [0.0], [0.0]))
+        utime = os.utime
+
+        def evict_and_utime(path, *args, **kwargs):
+            os.remove(path)
+            utime(path, *args, **kwargs)
+
+        monkeypatch.setattr(os, "utime", evict_and_utime)
+        timeline = cache.get("key")
+        assert timeline is not None and len(timeline) == 1
+
+
+class TestCheckpoint:
+    def test_resume_matches_uninterrupted(self, tmp_path, monkeypatch):
+        """
+        Test that resuming an interrupted analysis gives the same scores as an uninterrupted one
+        """
+        se = ScenecutExtractor(TEST_FILE)
+        se.calculate_scenecuts()
+        expected = se.get_timeline()
+
+        def interrupted_chunks(*args, **kwargs):
+            yield expected[:100]
+            raise KeyboardInterrupt
+
+        checkpoint_file = str(tmp_path / "checkpoint")
+        se = ScenecutExtractor(TEST_FILE)
+        monkeypatch.setattr(se, "_iter_frame_score_chunks", interrupted_chunks)
+        with pytest.raises(KeyboardInterrupt):
+            se.calculate_scenecuts(checkpoint_file=checkpoint_file)
+        # an incomplete line written by a crash is ignored
+        with open(checkpoint_file, "a") as f:
+            f.write('{"frame": [10')
+
+        se = ScenecutExtractor(TEST_FILE)
+        se.calculate_scenecuts(checkpoint_file=checkpoint_file)
+
+        assert se.get_timeline() == expected
+        assert se.get_scenecuts() == expected.rethreshold(0.3)
+        # only the remaining frames (and a few before them) were decoded
+        assert se.stats.frames < len(expected) - 90
+        assert not os.path.exists(checkpoint_file)
+
+
+class TestTimeline:
+    def test_rethreshold(self):
+        """
+        Test querying the per-frame scores without running ffmpeg again
+        """
+        se = ScenecutExtractor(TEST_FILE)
+        se.calculate_scenecuts()
+        assert len(se.get_timeline()) == 199
+        assert len(se.get_scenecuts()) == 7
+
+        # "does-not-exist" proves that no further ffmpeg calls are made
+        se.ffmpeg_path = "does-not-exist"
+        assert len(se.rethreshold(0)) == 199
+        assert [s["frame"] for s in se.top_k(2)] == [24, 49]
+        assert [s["frame"] for s in se.cuts_in_range(1.96, 3.96)] == [49, 74]
+        assert [s["frame"] for s in se.rethreshold(0.3, min_scene_length=1.5)] == [
+            49,
+            99,
+            149,
+        ]
+        assert se.get_scenecuts() == se.rethreshold(0.3, min_scene_length=1.5)
+
+    def test_postprocessing(self):
+        """
+        Test that the adaptive threshold and non-maximum suppression drop bursts of cuts
+        """
+        # a burst of motion with one real cut (frame 6), then an isolated cut (frame 15)
+        scores = [0.0, 0.4, 0.5, 0.4, 0.5, 0.45, 1.0, 0.4, 0.5, 0.4]
+        scores += [0.0, 0.0, 0.0, 0.0, 0.0, 0.6, 0.0, 0.0, 0.0, 0.0]
+        timeline = ScoreTimeline(
+            range(20), range(20), [i * 0.1 for i in range(20)], scores
+        )
+
+        assert len(timeline.rethreshold(0.3)) == 10
+        assert [
+            s["frame"]
+            for s in timeline.rethreshold(0.3, postprocessing={"adaptive_window": 1})
+        ] == [6, 15]
+        assert [
+            s["frame"]
+            for s in timeline.rethreshold(0.3, postprocessing={"nms_window": 0.25})
+        ] == [2, 6, 15]
+
+        with pytest.raises(ValueError):
+            timeline.rethreshold(0.3, postprocessing={"nms_window": -1})
+
+    def test_without_numpy(self, monkeypatch):
+        """
+        Test that the queries give the same results with and without NumPy
+        """
+        pytest.importorskip("numpy")
+        # repeated scores, so that top_k() has to break ties
+        scores = [((i * 37) % 11) / 10 for i in range(200)]
+        timeline = ScoreTimeline(
+            range(200), range(200), [i * 0.04 for i in range(200)], scores
+        )
+
+        def queries():
+            return [
+                list(timeline.rethreshold(0.5)),
+                list(timeline.rethreshold(0.2, min_scene_length=0.3)),
+                list(
+                    timeline.rethreshold(0.3, postprocessing={"adaptive_window": 0.01})
+                ),
+                list(
+                    timeline.rethreshold(
+                        0.3, postprocessing={"adaptive_window": 0.1, "adaptive_k": 0.5}
+                    )
+                ),
+                list(timeline.top_k(15)),
+                list(timeline.top_k(0)),
+                list(timeline.top_k(300)),
+                list(timeline.cuts_in_range(1.5, 4.5, 0.6)),
+                list(timeline.cuts_in_range(4.5, 1.5)),
+            ]
+
+        with_numpy = queries()
+        monkeypatch.setattr(_timeline, "_import_numpy", lambda: None)
+        assert queries() == with_numpy
+        # 18 frames have the highest score, the earliest 15 of them win
+        assert [s["frame"] for s in timeline.top_k(15)] == list(range(8, 200, 11))[:15]
+
+
+class TestTable:
+    def test_table_rows_and_slices(self):
+        """
+        Test that the columnar table behaves like the list of dicts it replaces
+        """
+        se = ScenecutExtractor(TEST_FILE)
+        se.calculate_scenecuts()
+        table = se.get_scenecut_table()
+        scenecuts = se.get_scenecuts()
+
+        assert isinstance(scenecuts, list)
+        assert table == scenecuts
+        assert dict(table[0]) == scenecuts[0]
+        assert table[-1]["frame"] == 174
+        assert table[2:4] == scenecuts[2:4]
+        assert [row["pts_time"] for row in table] == [s["pts_time"] for s in scenecuts]
+        with pytest.raises(IndexError):
+            table[7]
+
+    def test_table_to_numpy(self):
+        """
+        Test that the columns are exported to NumPy without copying
+        """
+        np = pytest.importorskip("numpy")
+        table = ScenecutTable([24, 49], [12288.0, 25088.0], [0.96, 1.96], [1.0, 0.5])
+        columns = table.to_numpy()
+        assert columns["frame"].dtype == np.int64
+        assert columns["score"].tolist() == [1.0, 0.5]
+        assert np.shares_memory(columns["pts_time"], np.asarray(table.pts_time))
+
+
+class TestParallel:
+    def test_parallel_matches_serial(self):
+        """
+        Test that time-sliced parallel analysis returns the same scores as the serial one
+        """
+        serial = ScenecutExtractor(TEST_FILE)
+        serial.calculate_scenecuts()
+
+        parallel = ScenecutExtractor(TEST_FILE)
+        parallel.MIN_SEGMENT_DURATION = 1
+        parallel.calculate_scenecuts(workers=3)
+
+        assert parallel.get_scenecuts() == serial.get_scenecuts()
+        assert parallel.get_timeline().to_dict() == serial.get_timeline().to_dict()
+
+
+class TestStreaming:
+    def test_iter_scenecuts(self):
+        """
+        Test that streamed scene cuts match the calculated ones
+        """
+        se = ScenecutExtractor(TEST_FILE)
+        se.calculate_scenecuts()
+
+        assert list(ScenecutExtractor(TEST_FILE).iter_scenecuts()) == (
+            se.get_scenecuts()
+        )
+
+    def test_iter_scenecuts_early_stop(self):
+        """
+        Test that stopping the iteration early terminates ffmpeg cleanly
+        """
+        scenecuts = ScenecutExtractor(TEST_FILE).iter_scenecuts()
+        assert next(scenecuts)["frame"] == 24
+        scenecuts.close()
+
+    def test_follow_growing_file(self, tmp_path):
+        """
+        Test that following a file while it is written finds all scene cuts
+        """
+        growing_file = str(tmp_path / "growing.nut")
+        # write the input at four times its real-time rate
+        writer = subprocess.Popen(
+            [
+                "ffmpeg",
+                "-nostdin",
+                "-loglevel",
+                "error",
+                "-readrate",
+                "4",
+                "-i",
+                TEST_FILE,
+                "-c",
+                "copy",
+                "-f",
+                "nut",
+                "-flush_packets",
+                "1",
+                growing_file,
+            ]
+        )
+        try:
+            while not os.path.exists(growing_file):
+                time.sleep(0.01)
+            scenecuts = list(
+                ScenecutExtractor(growing_file).iter_scenecuts(
+                    follow=True, idle_timeout=1
+                )
+            )
+        finally:
+            writer.wait()
+
+        assert [s["frame"] for s in scenecuts] == [24, 49, 74, 99, 124, 149, 174]
+
+    def test_follow_stdin_cli(self):
+        """
+        Test following stdin from the CLI, with a minimum scene length
+        """
+        writer = subprocess.Popen(
+            [
+                "ffmpeg",
+                "-nostdin",
+                "-loglevel",
+                "error",
+                "-i",
+                TEST_FILE,
+                "-c",
+                "copy",
+                "-f",
+                "nut",
+                "-",
+            ],
+            stdout=subprocess.PIPE,
+        )
+        stdout = subprocess.check_output(
+            [
+                "python3",
+                "-m",
+                "scenecut_extractor",
+                "--follow",
+                "-",
+                "-o",
+                "seconds",
+                "--min-scene-length",
+                "1.5",
+            ],
+            stdin=writer.stdout,
+        ).decode("utf-8")
+        writer.wait()
+
+        assert stdout.splitlines() == ["1.96", "3.96", "5.96"]
+
+
+class TestExtraction:
+    def test_single_pass_matches_per_scene(self, tmp_path):
+        """
+        Test that splitting in a single pass creates the same files as cutting per scene
+        """
+        input_file = str(tmp_path / "keyframes.mp4")
+        # with a keyframe at every cut, so that the input can be split in a single pass
+        run_command(
+            [
+                "ffmpeg",
+                "-y",
+                "-i",
+                TEST_FILE,
+                "-force_key_frames",
+                "0.96,1.96,2.96,3.96,4.96,5.96,6.96",
+                "-c:v",
+                "libx264",
+                "-bf",
+                "2",
+                input_file,
+            ]
+        )
+        se = ScenecutExtractor(input_file)
+        se.calculate_scenecuts()
+        processes = se.stats.ffmpeg_processes
+        se.extract_scenes(str(tmp_path / "single"), single_pass=True)
+        assert se.stats.ffmpeg_processes - processes == 1
+
+        # each scene holds exactly the frames from its cut to the next one; in copy
+        # mode, the last scene may end a few frames after the last cut
+        scene_files = sorted(os.listdir(tmp_path / "single"))
+        assert len(scene_files) == 7
+        scene_hashes = [
+            frame_hashes(str(tmp_path / "single" / name)) for name in scene_files
+        ]
+        assert [len(hashes) for hashes in scene_hashes[:-1]] == [24] + [25] * 5
+        assert [h for hashes in scene_hashes for h in hashes][:174] == frame_hashes(
+            input_file
+        )[:174]
+
+        # the cuts of the test file are not on keyframes, so it is split per scene
+        se = ScenecutExtractor(TEST_FILE)
+        se.calculate_scenecuts()
+        processes = se.stats.ffmpeg_processes
+        se.extract_scenes(str(tmp_path / "fallback"), single_pass=True)
+        assert se.stats.ffmpeg_processes - processes == 8
+        se.extract_scenes(str(tmp_path / "per_scene"), single_pass=False)
+
+        single_pass_files = sorted(os.listdir(tmp_path / "fallback"))
+        assert single_pass_files == sorted(os.listdir(tmp_path / "per_scene"))
+        for name in single_pass_files:
+            assert frame_hashes(str(tmp_path / "fallback" / name)) == frame_hashes(
+                str(tmp_path / "per_scene" / name)
+            )
+
+    def test_single_pass_too_many_cuts(self, tmp_path, monkeypatch):
+        """
+        Test that too many cuts for a command line argument are extracted per scene
+        """
+        se = ScenecutExtractor(TEST_FILE)
+        se.calculate_scenecuts()
+        monkeypatch.setattr(ScenecutExtractor, "MAX_ARGUMENT_LENGTH", 10)
+        processes = se.stats.ffmpeg_processes
+        se.extract_scenes(str(tmp_path), single_pass=True)
+
+        assert se.stats.ffmpeg_processes - processes == 7
+        assert len(os.listdir(tmp_path)) == 7
+
+    def test_parallel_reencode(self, tmp_path):
+        """
+        Test extracting re-encoded scenes with a worker pool
+        """
+        se = ScenecutExtractor(TEST_FILE)
+        se.calculate_scenecuts()
+        se.extract_scenes(str(tmp_path), no_copy=True, workers=3, threads=1)
+
+        assert len(os.listdir(tmp_path)) == 7
+
+    def test_parallel_failures(self, tmp_path):
+        """
+        Test that failing scenes are reported after all scenes were attempted
+        """
+        se = ScenecutExtractor(TEST_FILE)
+        se.calculate_scenecuts()
+        se.ffmpeg_path = "does-not-exist"
+
+        with pytest.raises(RuntimeError, match="Failed to extract 7 of 7 scenes"):
+            se.extract_scenes(str(tmp_path), no_copy=True, workers=2)
+
+
+def frame_hashes(input_file):
+    """
+    Get the MD5 hashes of all decoded video frames of a file
+    """
+    stdout, _ = run_command(
+        [
+            "ffmpeg",
+            "-v",
+            "error",
+            "-i",
+            input_file,
+            "-map",
+            "0:v:0",
+            "-f",
+            "framemd5",
+            "-",
+        ]
+    )
+    return [
+        line.split(",")[-1].strip()
+        for line in stdout.splitlines()
+        if not line.startswith("#")
+    ]
+
+
+class TestSmartCut:
+    def test_smart_cut_is_frame_accurate(self, tmp_path):
+        """
+        Test that smart-cut scenes contain exactly the frames of the input between the cuts
+        """
+        # keyframes every 10 frames, independent of the scene cuts
+        input_file = str(tmp_path / "gop.mp4")
+        run_command(
+            [
+                "ffmpeg",
+                "-v",
+                "error",
+                "-i",
+                TEST_FILE,
+                "-c:v",
+                "libx264",
+                "-x264-params",
+                "keyint=10:min-keyint=10:scenecut=0",
+                input_file,
+            ]
+        )
+
+        cache = ScoreCache(cache_dir=str(tmp_path / "cache"))
+        se = ScenecutExtractor(input_file, cache=cache)
+        se.calculate_scenecuts()
+        keyframe_index = se.get_keyframe_index()
+        assert len(keyframe_index) == 199
+        assert keyframe_index.keyframes[:3].tolist() == [0, 10, 20]
+        assert [part["copy"] for part in keyframe_index.plan(0.96, 1.96)] == [
+            False,
+            True,
+            False,
+        ]
+
+        se.extract_scenes(str(tmp_path / "scenes"), smart_cut=True)
+
+        input_hashes = frame_hashes(input_file)
+        cuts = [0] + [s["frame"] for s in se.get_scenecuts()]
+        scene_files = sorted(os.listdir(tmp_path / "scenes"))
+        assert len(scene_files) == 7
+        for scene_file, start, end in zip(scene_files, cuts, cuts[1:]):
+            scene_hashes = frame_hashes(str(tmp_path / "scenes" / scene_file))
+            assert scene_hashes == input_hashes[start:end]
+
+        # the index is cached
+        assert (
+            ScenecutExtractor(input_file, cache=cache).get_keyframe_index().to_dict()
+            == keyframe_index.to_dict()
+        )
+
+    def test_smart_cut_async(self, tmp_path):
+        """
+        Test smart cutting with the asyncio API
+        """
+
+        async def run():
+            se = AsyncScenecutExtractor(TEST_FILE)
+            await se.calculate_scenecuts_async()
+            await se.extract_scenes_async(str(tmp_path), smart_cut=True, workers=2)
+            return se
+
+        se = asyncio.run(run())
+        assert len(os.listdir(tmp_path)) == 7
+        assert se.stats.to_dict()["stages"]["index"]["calls"] == 1
+
+
+class TestThumbnails:
+    def test_thumbnails_in_analysis_pass(self, tmp_path):
+        """
+        Test that thumbnails written while analyzing match those written afterwards
+        """
+        se = ScenecutExtractor(TEST_FILE)
+        se.calculate_scenecuts(
+            min_scene_length=1.5,
+            thumbnails={
+                "output_directory": str(tmp_path / "pass"),
+                "image_format": "png",
+            },
+        )
+        assert se.stats.ffmpeg_processes == 1
+
+        written = se.extract_thumbnails(str(tmp_path / "after"), image_format="png")
+        files = sorted(os.listdir(tmp_path / "pass"))
+        assert files == [
+            "test_0.000_start.png",
+            "test_1.960_start.png",
+            "test_3.960_start.png",
+            "test_5.960_start.png",
+        ]
+        assert files == sorted(os.path.basename(f) for f in written)
+        for name in files:
+            assert frame_hashes(str(tmp_path / "pass" / name)) == frame_hashes(
+                str(tmp_path / "after" / name)
+            )
+
+    def test_thumbnail_positions(self, tmp_path, monkeypatch):
+        """
+        Test writing the first, middle and last frame of each scene in one pass
+        """
+        # no temporary files are left behind
+        system_temp_dir = tmp_path / "tmp"
+        system_temp_dir.mkdir()
+        monkeypatch.setattr(tempfile, "tempdir", str(system_temp_dir))
+        output_dir = tmp_path / "images"
+
+        se = ScenecutExtractor(TEST_FILE)
+        se.calculate_scenecuts()
+        written = se.extract_thumbnails(
+            str(output_dir), positions=["start", "middle", "end"], width=64
+        )
+        assert os.listdir(system_temp_dir) == []
+
+        # 8 scenes, including the one after the last cut
+        assert len(written) == 24
+        assert written[:3] == [
+            str(output_dir / "test_0.000_start.jpg"),
+            str(output_dir / "test_0.000_middle.jpg"),
+            str(output_dir / "test_0.000_end.jpg"),
+        ]
+        assert sorted(os.listdir(output_dir)) == sorted(
+            os.path.basename(f) for f in written
+        )
+
+    def test_thumbnails_of_many_frames(self, tmp_path):
+        """
+        Test that the images of more frames than fit into a command line argument are written
+        """
+        input_file = str(tmp_path / "many.mp4")
+        run_command(
+            [
+                "ffmpeg",
+                "-y",
+                "-f",
+                "lavfi",
+                "-i",
+                "testsrc=size=32x32:rate=100:duration=120",
+                "-c:v",
+                "libx264",
+                "-preset",
+                "ultrafast",
+                input_file,
+            ]
+        )
+        se = ScenecutExtractor(input_file)
+        # every frame is a cut
+        se.calculate_scenecuts(threshold=0)
+        assert len(se.get_scenecuts()) == 12000
+
+        written = se.extract_thumbnails(str(tmp_path / "images"))
+        assert len(written) == 12000
+        assert len(os.listdir(tmp_path / "images")) == 12000
+
+
+class TestTwoPass:
+    def test_two_pass_matches_full(self):
+        """
+        Test that a two-pass analysis finds the same cuts as a full analysis
+        """
+        se = ScenecutExtractor(TEST_FILE)
+        se.calculate_scenecuts()
+
+        two_pass = ScenecutExtractor(TEST_FILE)
+        two_pass.calculate_scenecuts(two_pass={"frame_step": 10}, workers=2)
+        assert two_pass.get_scenecuts() == se.get_scenecuts()
+        assert two_pass.timeline is not None and se.timeline is not None
+        assert len(two_pass.timeline) < len(se.timeline)
+
+        with pytest.raises(ValueError):
+            two_pass.calculate_scenecuts(two_pass={}, detectors=["black"])
+        with pytest.raises(ValueError):
+            two_pass.calculate_scenecuts(two_pass={"coarse": "nope"})
+
+    def test_candidate_windows(self):
+        """
+        Test that candidate windows are merged unless seeking to them is cheaper
+        """
+        coarse = ScoreTimeline()
+        for i, score in enumerate([0, 0.5, 0, 0, 0.5, 0, 0, 0, 0, 0.5]):
+            coarse.append(i * 10, i * 10, i * 0.4, score)
+
+        assert get_candidate_windows(coarse, 0.3) == [(1, 11), (31, 41), (81, 91)]
+        # the keyframe before the second window is within the first one
+        assert get_candidate_windows(coarse, 0.3, [0, 10, 60]) == [
+            (1, 41),
+            (81, 91),
+        ]
+        # frames after the last frame of the first pass are always analyzed
+        assert get_candidate_windows(coarse, 0.3, [0, 10, 60], 100) == [
+            (1, 41),
+            (81, 100),
+        ]
+
+
+class TestProfile:
+    def test_fastest_profile(self):
+        """
+        Test that a reduced-cost profile maps results back to the original timeline
+        """
+        se = ScenecutExtractor(TEST_FILE)
+        se.calculate_scenecuts(profile="fastest")
+
+        # with every second frame, cuts are found at most one frame late
+        assert [s["frame"] for s in se.get_scenecuts()] == [
+            24,
+            50,
+            74,
+            100,
+            124,
+            150,
+            174,
+        ]
+        assert se.get_scenecuts()[1]["pts_time"] == 2.0
+
+    def test_custom_profile_cli(self):
+        """
+        Test custom profile options on the command line
+        """
+        stdout, _ = run_command(
+            [
+                "python3",
+                "-m",
+                "scenecut_extractor",
+                TEST_FILE,
+                "--analysis-width",
+                "64",
+                "--analysis-gray",
+                "--crop",
+                "iw/2:ih/2:0:0",
+                "-o",
+                "seconds",
+            ]
+        )
+        assert stdout.split() == [
+            "0.96",
+            "1.96",
+            "2.96",
+            "3.96",
+            "4.96",
+            "5.96",
+            "6.96",
+        ]
+
+
+class _ExitWorker:
+    """Ends the worker process that receives it"""
+
+    def __reduce__(self):
+        return (os._exit, (1,))
+
+
+class TestBatch:
+    def test_batch_cli(self, tmp_path):
+        """
+        Test that a failing input does not abort a batch
+        """
+        input_list = tmp_path / "inputs.txt"
+        input_list.write_text(str(tmp_path / "missing.mp4") + "\n")
+        process = subprocess.run(
+            [
+                "python3",
+                "-m",
+                "scenecut_extractor",
+                TEST_FILE,
+                "--input-list",
+                str(input_list),
+            ],
+            capture_output=True,
+        )
+        assert process.returncode == 1
+
+        records = {r["input"]: r for r in map(json.loads, process.stdout.splitlines())}
+        assert len(records) == 2
+        assert len(records[TEST_FILE]["scenecuts"]) == 7
+        assert records[TEST_FILE]["error"] is None
+        assert records[str(tmp_path / "missing.mp4")]["error"] is not None
+
+    def test_batch_workers(self, tmp_path):
+        """
+        Test that a process pool gives the same results as a single process
+        """
+        shutil.copy(TEST_FILE, tmp_path / "a.mp4")
+        shutil.copy(TEST_FILE, tmp_path / "b.mp4")
+        input_files = [str(tmp_path / "a.mp4"), str(tmp_path / "b.mp4")]
+
+        results = list(ScenecutExtractor.batch(input_files, workers=2))
+        assert sorted(r["input"] for r in results) == input_files
+        for result in results:
+            assert result["error"] is None
+            assert result["scenecuts"] is not None
+            assert len(result["scenecuts"]) == 7
+
+    def test_batch_worker_failure(self, tmp_path):
+        """
+        Test that a job that fails outside of the worker does not abort a batch
+        """
+        input_files = [str(tmp_path / "a.mp4"), str(tmp_path / "b.mp4")]
+
+        # the arguments can not be sent to the worker processes
+        results = list(
+            ScenecutExtractor.batch(
+                input_files, workers=2, calculate_args={"threshold": lambda: 0}
+            )
+        )
+        assert sorted(r["input"] for r in results) == input_files
+        for result in results:
+            assert result["error"] is not None
+            assert result["scenecuts"] is None
+
+        # a worker process dies
+        results = list(
+            ScenecutExtractor.batch(
+                input_files, workers=2, calculate_args={"threshold": _ExitWorker()}
+            )
+        )
+        assert sorted(r["input"] for r in results) == input_files
+        assert all(r["error"] is not None for r in results)
+
+
+class TestAsync:
+    def test_async_matches_sync(self):
+        """
+        Test concurrent async analyses on one event loop with async progress callbacks
+        """
+        se = ScenecutExtractor(TEST_FILE)
+        se.calculate_scenecuts()
+
+        progress: list[float] = []
+
+        async def on_progress(p: float) -> None:
+            progress.append(p)
+
+        async def run() -> list[AsyncScenecutExtractor]:
+            semaphore = asyncio.Semaphore(2)
+            extractors = [
+                AsyncScenecutExtractor(TEST_FILE, semaphore=semaphore) for _ in range(3)
+            ]
+            await asyncio.gather(
+                *(
+                    e.calculate_scenecuts_async(progress_callback=on_progress)
+                    for e in extractors
+                )
+            )
+            return extractors
+
+        for e in asyncio.run(run()):
+            assert e.get_scenecuts() == se.get_scenecuts()
+        assert progress.count(100) == 3
+
+    def test_async_options(self):
+        """
+        Test that the async analysis supports detectors, time ranges and streams like the sync one
+        """
+        se = ScenecutExtractor(TEST_FILE)
+        se.calculate_scenecuts(detectors=["freeze"], start=1.5, end=5.5, stream=0)
+
+        async def run() -> AsyncScenecutExtractor:
+            e = AsyncScenecutExtractor(TEST_FILE)
+            await e.calculate_scenecuts_async(
+                detectors=["freeze"], start=1.5, end=5.5, stream=0
+            )
+            return e
+
+        e = asyncio.run(run())
+        assert e.get_scenecuts() == se.get_scenecuts()
+        assert e.get_events() == se.get_events()
+        assert e.time_range == (1.5, 5.5)
+
+        # the inherited methods stay synchronous
+        assert e.get_keyframe_index().keyframes == se.get_keyframe_index().keyframes
+
+    def test_async_cancel(self, monkeypatch):
+        """
+        Test that cancelling an analysis kills ffmpeg
+        """
+        processes = []
+        create_subprocess_exec = asyncio.create_subprocess_exec
+
+        async def spy(*args, **kwargs):
+            proc = await create_subprocess_exec(*args, **kwargs)
+            processes.append(proc)
+            return proc
+
+        monkeypatch.setattr(asyncio, "create_subprocess_exec", spy)
+
+        async def run() -> None:
+            started = asyncio.Event()
+
+            def on_progress(p: float) -> None:
+                if p > 0:
+                    started.set()
+
+            se = AsyncScenecutExtractor(TEST_FILE)
+            task = asyncio.ensure_future(
+                se.calculate_scenecuts_async(progress_callback=on_progress)
+            )
+            await started.wait()
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(run())
+        assert len(processes) == 1
+        assert processes[0].returncode is not None
+
+    def test_async_extract(self, tmp_path):
+        """
+        Test extracting scenes concurrently
+        """
+
+        async def run() -> None:
+            se = AsyncScenecutExtractor(TEST_FILE)
+            await se.calculate_scenecuts_async()
+            await se.extract_scenes_async(str(tmp_path), no_copy=True, workers=2)
+
+        asyncio.run(run())
+        assert len(os.listdir(tmp_path)) == 7
+
+
+class TestServer:
+    def test_detect_job(self):
+        """
+        Test submitting a detect job over HTTP and waiting for its result
+        """
+        jobs = JobQueue(workers=1)
+        server = JobHTTPServer(("127.0.0.1", 0), jobs)
+        jobs.start()
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+        try:
+            request = urllib.request.Request(
+                f"{url}/jobs",
+                data=json.dumps({"input": TEST_FILE}).encode("utf-8"),
+                headers={"Content-Type": "application/json"},
+                method="POST",
+            )
+            with urllib.request.urlopen(request) as response:
+                assert response.status == 202
+                job_id = json.load(response)["id"]
+
+            with urllib.request.urlopen(f"{url}/jobs/{job_id}?wait=30") as response:
+                job = json.load(response)
+            assert job["status"] == "done"
+            se = ScenecutExtractor(TEST_FILE)
+            se.calculate_scenecuts()
+            assert job["scenecuts"] == se.get_scenecut_table().to_list()
+
+            with urllib.request.urlopen(f"{url}/stats") as response:
+                stats = json.load(response)
+            assert stats["done"] == 1
+            assert stats["queued"] == 0
+            assert stats["frames_per_second"] > 0
+        finally:
+            server.shutdown()
+            server.server_close()
+            jobs.stop()
+
+    def test_queue(self):
+        """
+        Test validation and cancellation of queued jobs
+        """
+        jobs = JobQueue(workers=1, max_queue=2)
+        with pytest.raises(ValueError):
+            jobs.submit({"type": "extract", "input": TEST_FILE})
+        with pytest.raises(ValueError):
+            jobs.submit({"input": TEST_FILE, "options": {"checkpoint_file": "x"}})
+        with pytest.raises(ValueError):
+            # would start more ffmpeg processes than the number of workers of the queue
+            jobs.submit({"input": TEST_FILE, "options": {"workers": 8}})
+
+        low = jobs.submit({"input": TEST_FILE})
+        high = jobs.submit({"input": TEST_FILE, "priority": 1})
+        with pytest.raises(RuntimeError):
+            jobs.submit({"input": TEST_FILE})
+
+        jobs.cancel(low.id)
+        assert low.info["status"] == "cancelled"
+        assert jobs.get_stats()["queued"] == 1
+
+        jobs.start()
+        assert high.done.wait(30)
+        jobs.stop()
+        assert high.info["status"] == "done"
+        assert low.info["started"] is None
+
+    def test_cancel_running_extract(self, tmp_path):
+        """
+        Test that cancelling a running extract job stops its ffmpeg processes
+        """
+        input_file = str(tmp_path / "long.mp4")
+        run_command(
+            [
+                "ffmpeg",
+                "-y",
+                "-f",
+                "lavfi",
+                "-i",
+                "testsrc=size=640x480:rate=25:duration=30",
+                "-c:v",
+                "libx264",
+                "-preset",
+                "ultrafast",
+                input_file,
+            ]
+        )
+        jobs = JobQueue(workers=1)
+        jobs.start()
+        # one scene until the end of the range, re-encoded
+        job = jobs.submit(
+            {
+                "type": "extract",
+                "input": input_file,
+                "options": {"end": 30},
+                "extract": {
+                    "output_directory": str(tmp_path / "scenes"),
+                    "no_copy": True,
+                },
+            }
+        )
+        # the analysis and the extraction
+        deadline = time.monotonic() + 30
+        while len(job._pids) < 2 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        pids = list(job._pids)
+        assert len(pids) == 2
+
+        jobs.cancel(job.id)
+        assert job.done.wait(30)
+        jobs.stop()
+        assert job.info["status"] == "cancelled"
+        for pid in pids:
+            with pytest.raises(ProcessLookupError):
+                os.kill(pid, 0)
+
+    def test_lazy_import(self):
+        """
+        Test that the service is only imported when it is used
+        """
+        code = (
+            "import sys, scenecut_extractor; "
+            "assert 'http.server' not in sys.modules; "
+            "scenecut_extractor.JobQueue; "
+            "assert 'http.server' in sys.modules"
+        )
+        subprocess.run(["python3", "-c", code], check=True)
+
+    def test_socket_path(self, tmp_path):
+        """
+        Test that only stale sockets are removed before listening on a Unix socket
+        """
+        regular_file = tmp_path / "file.sock"
+        regular_file.write_text("keep")
+        with pytest.raises(RuntimeError, match="not a socket"):
+            _remove_stale_socket(str(regular_file))
+        assert regular_file.read_text() == "keep"
+
+        socket_path = str(tmp_path / "live.sock")
+        jobs = JobQueue(workers=1)
+        server = JobUnixServer(socket_path, jobs)
+        with pytest.raises(RuntimeError, match="Another server"):
+            _remove_stale_socket(socket_path)
+        server.server_close()
+
+        # the socket file is left behind without a listener
+        assert os.path.exists(socket_path)
+        _remove_stale_socket(socket_path)
+        assert not os.path.exists(socket_path)
+
+    def test_request_checks(self):
+        """
+        Test that requests without the token, JSON content type or a valid length are rejected
+        """
+        jobs = JobQueue(workers=1)
+        server = JobHTTPServer(("127.0.0.1", 0), jobs, token="secret")
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        body = json.dumps({"input": TEST_FILE})
+        json_type = {"Content-Type": "application/json"}
+        auth = {"Authorization": "Bearer secret"}
+        try:
+            for headers, status in [
+                (json_type, 401),
+                ({**json_type, "Authorization": "Bearer wrong"}, 401),
+                # a simple cross-origin request, which needs no preflight
+                ({**auth, "Content-Type": "text/plain"}, 415),
+                ({**auth, **json_type, "Content-Length": "x"}, 400),
+                ({**auth, **json_type}, 202),
+            ]:
+                connection = http.client.HTTPConnection(
+                    "127.0.0.1", server.server_address[1]
+                )
+                connection.putrequest("POST", "/jobs")
+                headers = {"Content-Length": str(len(body)), **headers}
+                for name, value in headers.items():
+                    connection.putheader(name, value)
+                connection.endheaders(body.encode("utf-8"))
+                assert connection.getresponse().status == status
+                connection.close()
+            assert len(jobs.jobs) == 1
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+class TestStats:
+    def test_stats(self):
+        """
+        Test that stats are recorded and reported to hooks
+        """
+        events = []
+        se = ScenecutExtractor(TEST_FILE)
+        se.stats.add_hook(lambda event, data: events.append(event))
+        se.calculate_scenecuts()
+        se.get_as_json()
+
+        stats = se.stats.to_dict()
+        assert stats["frames"] == 199
+        assert stats["ffmpeg_processes"] == 1
+        assert set(stats["stages"]) == {"decode", "parse", "threshold", "serialize"}
+        assert stats["stages"]["decode"]["calls"] == 1
+        assert events.count("ffmpeg") == 1
+        assert events.count("stage") == 4
+
+    def test_stats_cli(self):
+        """
+        Test that --stats prints JSON to stderr
+        """
+        stdout, stderr = run_command(
+            ["python3", "-m", "scenecut_extractor", TEST_FILE, "--stats"]
+        )
+        assert len(json.loads(stdout)) == 7
+        # the stats follow the log messages
+        assert json.loads(stderr[stderr.index("{") :])["frames"] == 199
+
+
+class TestParser:
+    METADATA = (
+        "frame:0    pts:0       pts_time:0\n"
+        "lavfi.scene_score=0.000000\n"
+        "frame:1    pts:512     pts_time:0.04\n"
+        "lavfi.scene_score=0.250000\n"
+        "frame:2    pts:1024    pts_time:0.08\n"
+        "lavfi.scene_score=1.000000\n"
+    )
+
+    def test_chunked_matches_line_by_line(self):
+        """
+        Test that the bulk parser gives the same results for any chunk size
+        """
+        expected = list(parse_metadata_lines(self.METADATA.splitlines()))
+        data = self.METADATA.encode()
+        for chunk_size in [1, 7, 64, len(data)]:
+            parser = MetadataParser()
+            for i in range(0, len(data), chunk_size):
+                parser.feed(data[i : i + chunk_size])
+            parser.close()
+            timeline = parser.timeline
+            assert (
+                list(
+                    zip(
+                        timeline.frames,
+                        timeline.pts,
+                        timeline.pts_time,
+                        timeline.scores,
+                    )
+                )
+                == expected
+            )
+
+    def test_malformed_line(self):
+        """
+        Test that malformed lines are reported like before
+        """
+        parser = MetadataParser()
+        with pytest.raises(RuntimeError, match="Wrongly formatted line: frame:1"):
+            parser.feed(self.METADATA.replace("pts:512", "pts:x"))
+            parser.close()
+
+
+class TestDetectors:
+    def test_detectors_in_same_pass(self, tmp_path):
+        """
+        Test that black and freeze detection runs alongside the scene score
+        """
+        # one second each of a test pattern, black, a still image and another pattern
+        input_file = str(tmp_path / "detectors.mkv")
+        run_command(
+            [
+                "ffmpeg",
+                "-f",
+                "lavfi",
+                "-i",
+                "testsrc=d=1:r=25:s=160x120[a];color=black:d=1:r=25:s=160x120[b];"
+                "testsrc=d=1:r=25:s=160x120,trim=end_frame=1,loop=loop=24:size=1,setpts=N/25/TB[c];"
+                "testsrc2=d=1:r=25:s=160x120[d];[a][b][c][d]concat=n=4",
+                "-c:v",
+                "ffv1",
+                input_file,
+            ]
+        )
+
+        se = ScenecutExtractor(input_file)
+        se.calculate_scenecuts(detectors={"black": {"d": 0.5}, "freeze": {"d": 0.5}})
+        events = se.get_events()
+
+        assert events["black"] == [{"start": 1.0, "end": 2.0, "duration": 1.0}]
+        assert [(e["start"], e["end"]) for e in events["freeze"]] == [
+            (1.0, 2.0),
+            (2.0, 3.0),
+        ]
+        assert se.stats.frames == 100
+
+        se_without = ScenecutExtractor(input_file)
+        se_without.calculate_scenecuts()
+        assert se.get_timeline() == se_without.get_timeline()
+
+    def test_parser_collects_other_metadata(self):
+        """
+        Test that metadata of other filters is collected without affecting the scores
+        """
+        metadata: list[tuple[str, str]] = []
+        parser = MetadataParser(metadata=metadata)
+        parser.feed(
+            TestParser.METADATA.replace(
+                "pts_time:0.04\n", "pts_time:0.04\nlavfi.black_start=0.04\n"
+            )
+        )
+        parser.close()
+
+        assert metadata == [("black_start", "0.04")]
+        assert list(parser.timeline.scores) == [0.0, 0.25, 1.0]
+
+
+class TestBackends:
+    @pytest.mark.parametrize("backend", ["numpy-mad", "numpy-histogram"])
+    def test_numpy_backend_finds_same_cuts(self, backend):
+        """
+        Test that the NumPy backends find the same cuts as ffmpeg's scene score
+        """
+        pytest.importorskip("numpy")
+        se = ScenecutExtractor(TEST_FILE)
+        se.calculate_scenecuts(backend=backend)
+        se_ffmpeg = ScenecutExtractor(TEST_FILE)
+        se_ffmpeg.calculate_scenecuts()
+
+        assert se.timeline is not None and se_ffmpeg.timeline is not None
+        assert list(se.timeline.pts_time) == list(se_ffmpeg.timeline.pts_time)
+        assert [(s["frame"], s["pts_time"]) for s in se.get_scenecuts()] == [
+            (s["frame"], s["pts_time"]) for s in se_ffmpeg.get_scenecuts()
+        ]
+        assert all(0 <= score <= 1 for score in se.timeline.scores)
+
+    def test_invalid_backend(self):
+        """
+        Test that an unknown backend is rejected
+        """
+        se = ScenecutExtractor(TEST_FILE)
+        with pytest.raises(ValueError):
+            se.calculate_scenecuts(backend="opencv")
+
+
+class TestWriters:
+    def test_writers_match_previous_output(self):
+        """
+        Test that the streaming writers give the same output as before, across batches
+        """
+        scenecuts: list[ScenecutInfo] = [
+            {"frame": i, "pts": i * 512.0, "pts_time": i * 0.04, "score": 0.5}
+            for i in range(2500)
+        ]
+        for rows in [scenecuts, scenecuts[:1], []]:
+            output = io.StringIO()
+            write_json(rows, output)
+            assert output.getvalue() == json.dumps(rows, indent=2)
+
+        output = io.StringIO()
+        write_csv(scenecuts, output)
+        assert output.getvalue() == "frame,pts,pts_time,score\n" + "\n".join(
+            ",".join(str(v) for v in row.values()) for row in scenecuts
+        )
+
+    def test_ndjson_output(self):
+        """
+        Test JSON Lines output
+        """
+        stdout, _ = run_command(
+            ["python3", "-m", "scenecut_extractor", TEST_FILE, "-of", "ndjson"]
+        )
+        lines = stdout.splitlines()
+        assert len(lines) == 7
+        assert json.loads(lines[0]) == {
+            "frame": 24,
+            "pts": 12288.0,
+            "pts_time": 0.96,
+            "score": 1.0,
+        }
+
+
+class TestColumnar:
+    def test_npz_timeline(self):
+        """
+        Test that the npz output holds all frames with a cut mask and metadata
+        """
+        np = pytest.importorskip("numpy")
+        se = ScenecutExtractor(TEST_FILE)
+        se.calculate_scenecuts(threshold=0.3)
+        output = io.BytesIO()
+        se.write_as_npz(output, timeline=True)
+        output.seek(0)
+
+        data = np.load(output)
+        assert len(data["frame"]) == 199
+        assert data["frame"][data["cut"]].tolist() == [24, 49, 74, 99, 124, 149, 174]
+        metadata = json.loads(data["scenecut_extractor"][()])
+        assert metadata["input"] == TEST_FILE
+        assert metadata["threshold"] == 0.3
+        assert metadata["frames"] == 199
+
+    def test_arrow_and_parquet(self, tmp_path):
+        """
+        Test that Arrow and Parquet output match the scene cuts
+        """
+        pa = pytest.importorskip("pyarrow")
+        pq = pytest.importorskip("pyarrow.parquet")
+        arrow_file = str(tmp_path / "cuts.arrow")
+        run_command(
+            [
+                "python3",
+                "-m",
+                "scenecut_extractor",
+                TEST_FILE,
+                "-of",
+                "arrow",
+                "-O",
+                arrow_file,
+            ]
+        )
+        table = pa.ipc.open_file(pa.memory_map(arrow_file)).read_all()
+        se = ScenecutExtractor(TEST_FILE)
+        se.calculate_scenecuts(threshold=0.3)
+        assert table.to_pylist() == se.get_scenecuts()
+        assert json.loads(table.schema.metadata[b"scenecut_extractor"])["version"]
+
+        output = io.BytesIO()
+        se.top_k(2)
+        se.write_as_parquet(output)
+        output.seek(0)
+        table = pq.read_table(output)
+        assert table.num_rows == 2
+        assert json.loads(table.schema.metadata[b"scenecut_extractor"])["top_k"] == 2
+
+
+class TestTimeRange:
+    def test_time_range_matches_full_analysis(self):
+        """
+        Test that a time range gives the cuts of the full analysis within it, with absolute timestamps
+        """
+        se = ScenecutExtractor(TEST_FILE)
+        se.calculate_scenecuts()
+        expected = se.cuts_in_range(1.5, 5.5)
+
+        se = ScenecutExtractor(TEST_FILE)
+        se.calculate_scenecuts(start=1.5, end=5.5)
+        scenecuts = se.get_scenecut_table()
+        assert scenecuts.pts.tolist() == expected.pts.tolist()
+        assert scenecuts.pts_time.tolist() == [1.96, 2.96, 3.96, 4.96]
+        assert scenecuts.scores.tolist() == expected.scores.tolist()
+        # frame numbers count from the first frame of the range, at 1.52 seconds
+        assert scenecuts.frames.tolist() == [11, 36, 61, 86]
+
+    def test_time_range_extraction(self, tmp_path):
+        """
+        Test that extracted scenes start and end with the time range
+        """
+        se = ScenecutExtractor(TEST_FILE)
+        se.calculate_scenecuts(start=2.5, end=5.5)
+        se.extract_scenes(str(tmp_path / "range"))
+        assert sorted(os.listdir(tmp_path / "range")) == [
+            "test_2.500-2.960.mp4",
+            "test_2.960-3.960.mp4",
+            "test_3.960-4.960.mp4",
+            "test_4.960-5.500.mp4",
+        ]
+
+        # the cut at the start of the range is on a keyframe, so the input is split in one pass
+        se = ScenecutExtractor(TEST_FILE)
+        se.calculate_scenecuts(start=1.96)
+        se.extract_scenes(str(tmp_path / "single"))
+        assert se.stats.ffmpeg_processes == 2
+        assert sorted(os.listdir(tmp_path / "single")) == [
+            "test_1.960-2.960.mp4",
+            "test_2.960-3.960.mp4",
+            "test_3.960-4.960.mp4",
+            "test_4.960-5.960.mp4",
+            "test_5.960-6.960.mp4",
+        ]
+
+    def test_time_range_thumbnails(self, tmp_path):
+        """
+        Test that thumbnails are rejected for the frame numbers of a time range
+        """
+        se = ScenecutExtractor(TEST_FILE)
+        se.calculate_scenecuts(start=2.5, end=5.5)
+        with pytest.raises(RuntimeError):
+            se.extract_thumbnails(str(tmp_path))
+        assert os.listdir(tmp_path) == []
+
+        # a later analysis of the whole input allows them again
+        se.calculate_scenecuts()
+        assert len(se.extract_thumbnails(str(tmp_path))) == 8
+
+    def test_stream_selection(self):
+        """
+        Test selecting a video stream, and rejecting invalid streams and time ranges
+        """
+        se = ScenecutExtractor(TEST_FILE)
+        se.calculate_scenecuts(stream=0, start=6)
+        assert [cut["pts_time"] for cut in se.get_scenecuts()] == [6.96]
+
+        with pytest.raises(RuntimeError):
+            ScenecutExtractor(TEST_FILE).calculate_scenecuts(stream=1)
+        with pytest.raises(ValueError):
+            ScenecutExtractor(TEST_FILE).calculate_scenecuts(start=2, end=1)